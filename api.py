@@ -0,0 +1,280 @@
+"""HTTP API for scoring push-up clips and landmark arrays
+
+    python api.py --port 8080
+
+Endpoints:
+    GET  /health            Liveness and queue depth
+    POST /score/clip        Body is a video file; landmarks are extracted server-side
+    POST /score/landmarks   Body is JSON {"landmarks": [...]} with one entry per frame
+                            (99 numbers, 33 [x, y, z] triples, or null when no pose
+                            was found), or an .npy array of shape (T, 99) / (T, 33, 3)
+                            with NaN rows for missing frames
+
+Both scoring endpoints accept ?stride=N to score every N-th window and return
+per-window scores with the feedback message from PushupAnalyzer.form_feedback.
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import cv2
+import numpy as np
+from data.data_processor import DataProcessor
+from data.features import track_features
+from data.windows import sliding_windows, window_end_frames
+from models.lstm_model import PushupModel
+from app import form_feedback
+import config
+
+_worker = None  # (DataProcessor, PushupModel) built once per worker process
+_startup_barrier = None
+
+def _init_worker(startup_barrier):
+    global _worker, _startup_barrier
+    cv2.setNumThreads(1)  # Parallelism comes from the pool
+    processor = DataProcessor(use_cache=False)
+    model = PushupModel()
+    # Warm up both graphs so the first request doesn't pay for initialisation
+    processor.extract_landmarks(np.zeros((256, 256, 3), dtype=np.uint8))
+    model.predict(np.zeros((1, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32))
+    _worker = (processor, model)
+    _startup_barrier = startup_barrier
+
+def _ready():
+    # Every worker must be inside this call at once, so each one has finished warming up
+    _startup_barrier.wait()
+    return os.getpid()
+
+def score_track(model, track, detected, stride=1):
+    """Score every ``stride``-th window over the frames with a detected pose
+
+    Args:
+        model: Classifier with ``predict_batch``
+        track: (T, N_LANDMARK_VALUES) raw landmarks
+        detected: (T,) bool mask of frames with a detected pose
+        stride: Frames between scored windows
+
+    Returns:
+        JSON-serialisable dict with per-window scores and a feedback summary
+    """
+    detected_frames = np.flatnonzero(detected)
+    windows = sliding_windows(track_features(track[detected_frames]), config.SEQUENCE_LENGTH, stride)
+    scores = model.predict_batch(windows) if len(windows) else np.empty(0, dtype=np.float32)
+    end_frames = detected_frames[window_end_frames(len(detected_frames), config.SEQUENCE_LENGTH, stride)]
+
+    results = [
+        {"end_frame": int(frame), "score": float(score), "feedback": form_feedback(score)}
+        for frame, score in zip(end_frames, scores)
+    ]
+    summary = {}
+    for result in results:
+        summary[result["feedback"]] = summary.get(result["feedback"], 0) + 1
+    return {
+        "frames": len(track),
+        "frames_with_pose": len(detected_frames),
+        "windows": results,
+        "summary": summary,
+        "mean_score": float(scores.mean()) if len(scores) else None,
+    }
+
+def _score_clip(video_path, stride):
+    processor, model = _worker
+    points, _, detected, fps = processor.extract_track(video_path)
+    result = score_track(model, points.reshape(len(points), config.N_LANDMARK_VALUES), detected, stride)
+    result["fps"] = fps
+    return result
+
+def _parse_landmarks(body, content_type):
+    """Decode a landmark upload into (track (T, N_LANDMARK_VALUES), detected (T,))"""
+    if content_type.startswith('application/json'):
+        payload = json.loads(body)
+        if not isinstance(payload, dict) or not isinstance(payload.get("landmarks"), list):
+            raise ValueError('expected a JSON object with a "landmarks" list')
+        frames = payload["landmarks"]
+        track = np.full((len(frames), config.N_LANDMARK_VALUES), np.nan, dtype=np.float32)
+        for i, frame in enumerate(frames):
+            if frame is not None:
+                track[i] = np.asarray(frame, dtype=np.float32).reshape(config.N_LANDMARK_VALUES)
+    else:
+        track = np.load(io.BytesIO(body), allow_pickle=False)
+        if not isinstance(track, np.ndarray) or track.ndim == 0:
+            raise ValueError(f"expected a (T, {config.N_LANDMARK_VALUES}) .npy array")
+        track = track.astype(np.float32).reshape(len(track), config.N_LANDMARK_VALUES)
+    detected = ~np.isnan(track).any(axis=1)
+    return np.nan_to_num(track), detected
+
+def _score_landmarks(body, content_type, stride):
+    _, model = _worker
+    track, detected = _parse_landmarks(body, content_type)
+    return score_track(model, track, detected, stride)
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 408: "Request Timeout",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class ScoringAPI:
+    def __init__(self, workers=config.API_WORKERS, max_pending=config.API_MAX_PENDING,
+                 max_upload_mb=config.API_MAX_UPLOAD_MB, read_timeout=config.API_READ_TIMEOUT):
+        """Asyncio HTTP front end over a pool of scoring processes
+
+        The event loop only parses HTTP and moves bytes; pose extraction, JSON
+        decoding of landmark arrays and the classifier run in ``workers``
+        processes, each holding a warm Pose graph and model. At most
+        ``max_pending`` scoring requests are running or queued for the pool;
+        beyond that requests are refused with 503 so latency stays bounded.
+
+        Args:
+            workers: Scoring processes
+            max_pending: Scoring requests accepted at once
+            max_upload_mb: Largest accepted request body
+            read_timeout: Seconds allowed to receive a request
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.read_timeout = read_timeout
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+        self._pool = None
+
+    async def start(self, host=config.API_HOST, port=config.API_PORT):
+        """Start the worker pool, wait until every worker is warm, then listen"""
+        # spawn, not fork: MediaPipe graphs and their threads don't survive a fork
+        context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                         initargs=(context.Barrier(self.workers),))
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)))
+        print(f"Warmed up {len(set(pids))} scoring workers")
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def handle(self, reader, writer):
+        try:
+            status, payload = 200, await self._dispatch(reader)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except asyncio.TimeoutError:
+            status, payload = 408, {"error": "Timed out"}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        try:
+            writer.write(head.encode() + b"\r\n" + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise HTTPError(400, "Malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return method, urlsplit(target), headers
+
+    async def _dispatch(self, reader):
+        # Only receiving the request is time-limited; scoring a long clip may take a while
+        method, url, headers = await asyncio.wait_for(self._read_head(reader), self.read_timeout)
+        if method == 'GET' and url.path == '/health':
+            return {"status": "ok", "pending": self.pending, "served": self.served, "rejected": self.rejected}
+        if method != 'POST' or url.path not in ('/score/clip', '/score/landmarks'):
+            raise HTTPError(404, f"No route for {method} {url.path}")
+
+        try:
+            length = int(headers.get('content-length', 0))
+            stride = int(parse_qs(url.query).get('stride', ['1'])[0])
+        except ValueError:
+            raise HTTPError(400, "Content-Length and stride must be integers")
+        if stride < 1:
+            raise HTTPError(400, "stride must be at least 1")
+        if length <= 0:
+            raise HTTPError(400, "Request body required")
+        if length > self.max_upload_bytes:
+            raise HTTPError(413, f"Body larger than {self.max_upload_bytes} bytes")
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy, retry later")
+
+        self.pending += 1
+        try:
+            try:
+                body = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+            except asyncio.IncompleteReadError as e:
+                raise HTTPError(400, f"Body ended after {len(e.partial)} of {length} bytes")
+            if url.path == '/score/clip':
+                result = await self._score_clip(body, stride)
+            else:
+                result = await self._run(_score_landmarks, body, headers.get('content-type', ''), stride)
+        finally:
+            self.pending -= 1
+        self.served += 1
+        return result
+
+    async def _score_clip(self, body, stride):
+        fd, video_path = tempfile.mkstemp(suffix='.mp4')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                await asyncio.to_thread(f.write, body)
+            return await self._run(_score_clip, video_path, stride)
+        finally:
+            os.remove(video_path)
+
+    async def _run(self, func, *args):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPError(400, f"Invalid input: {e}")
+
+async def serve(host, port, workers):
+    api = ScoringAPI(workers)
+    server = await api.start(host, port)
+    print(f"Listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve push-up form scoring over HTTP")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--workers", type=int, default=config.API_WORKERS, help="Scoring processes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        print("Stopped")
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,125 @@
-import cv2
-from models.lstm_model import PushupModel
-from data.data_processor import DataProcessor
-from utils.visualization import PoseVisualizer
+# OpenCV, MediaPipe, SciPy and TensorFlow are imported where they are first
+# used, so `python app.py --help` and batch jobs don't pay for what they skip
+from data.features import FeatureStream, angle_dict, frame_features, track_features
+from data.landmark_buffer import LandmarkBuffer
+from data.track_format import TrackFile, is_track_file
+from data.windows import sliding_windows, window_end_frames, forward_fill
+from utils.metrics import Metrics
 import config
-from datetime import datetime
+from functools import cached_property
+import argparse
 import os
 import numpy as np
 import time
 
+def form_feedback(prediction):
+    """Map a model score (0 = bad form, 1 = good form) to a feedback message"""
+    poor, fair = config.FORM_THRESHOLDS
+    if prediction < poor:
+        return "Poor form - Major corrections needed"
+    elif prediction < fair:
+        return "Fair form - Minor adjustments recommended"
+    else:
+        return "Good form!"
+
 class PushupAnalyzer:
     def __init__(self):
-        self.model = PushupModel()
-        self.processor = DataProcessor()
-        self.visualizer = PoseVisualizer()
-        self.frame_sequence = []
+        """Push-up analysis front end
+
+        The model, the Pose graph and the visualizer are built on first use;
+        call ``warm_up`` to build them up front.
+        """
+        self.landmark_buffer = LandmarkBuffer()  # Holds model input features, one row per frame
+        self.features = FeatureStream()
         self.is_analyzing = False
+        self.metrics = Metrics()  # Exported only by main(), so extra analyzers don't contend for METRICS_PORT
+
+    @cached_property
+    def model(self):
+        from models.lstm_model import PushupModel
+        return PushupModel()
+
+    @cached_property
+    def processor(self):
+        from data.data_processor import DataProcessor
+        return DataProcessor()
+
+    @cached_property
+    def visualizer(self):
+        from utils.visualization import PoseVisualizer
+        return PoseVisualizer()
+
+    @cached_property
+    def stream(self):
+        return self.model.streaming(config.STREAMING_INFERENCE) if config.STREAMING_INFERENCE else None
+
+    def warm_up(self):
+        """Build the model, Pose graph and visualizer and run each once on dummy input
+
+        Keeps initialisation and first-call costs out of the first real frame's latency.
+        """
+        frame = np.zeros((256, 256, 3), dtype=np.uint8)
+        self.processor.extract_landmarks(frame)
+        self.processor.estimator.reset()
+        self.model.predict(np.zeros((1, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32))
+        if self.stream is not None:
+            self.stream.reset()
+        self.visualizer.draw_landmark_array(frame, np.full(config.N_LANDMARK_VALUES, 0.5, dtype=np.float32))
         
-    def analyze_form(self, frame_sequence):
-        """Analyze push-up form from a sequence of frames"""
-        if len(frame_sequence) != config.SEQUENCE_LENGTH:
+
+    def analyze_form(self, sequence_landmarks):
+        """Analyze push-up form from a window of per-frame features
+
+        Args:
+            sequence_landmarks: Array of shape (1, SEQUENCE_LENGTH, N_FEATURES) of
+                ``data.features`` rows, typically the zero-copy view from
+                ``LandmarkBuffer.window()``
+        """
+        if sequence_landmarks is None or sequence_landmarks.shape[1:] != (config.SEQUENCE_LENGTH, config.N_FEATURES):
             return None
-            
-        sequence_landmarks = []
-        for frame in frame_sequence:
-            landmarks, _ = self.processor.extract_landmarks(frame)
-            if landmarks:
-                sequence_landmarks.append(landmarks)
-            else:
-                return None
-        
-        # Convert to numpy array with correct shape
-        sequence_landmarks = np.array(sequence_landmarks)
-        sequence_landmarks = sequence_landmarks.reshape(1, config.SEQUENCE_LENGTH, config.N_FEATURES)
         
-        prediction = self.model.predict(sequence_landmarks)
+        with self.metrics.timer("predict"):
+            prediction = self.model.predict(sequence_landmarks)
+        return self.form_feedback(prediction)
+
+    def update_form(self, landmarks):
+        """Add one frame's landmarks and return feedback for the window ending here
+
+        The landmarks are turned into model features (see ``data.features``). Uses
+        the streaming LSTM when config.STREAMING_INFERENCE is set, otherwise
+        the rolling landmark buffer and the windowed model.
+
+        Returns:
+            Feedback message, or None until a full window has been seen
+        """
+        with self.metrics.timer("window"):
+            features = self.features.step(landmarks)
+            if self.stream is None:
+                self.landmark_buffer.append(features)
+                window = self.landmark_buffer.window()
         
-        if prediction < 0.3:
-            return "Poor form - Major corrections needed"
-        elif prediction < 0.7:
-            return "Fair form - Minor adjustments recommended"
-        else:
-            return "Good form!"
+        if self.stream is not None:
+            with self.metrics.timer("predict"):
+                score = self.stream.step(features)
+            return self.form_feedback(score) if score is not None else None
+
+        return self.analyze_form(window)
+
+    def reset_window(self):
+        """Forget buffered frames, e.g. when analysis restarts"""
+        self.landmark_buffer.clear()
+        self.features.reset()
+        if self.stream is not None:
+            self.stream.reset()
+
+    def form_feedback(self, prediction):
+        """Map a model score (0 = bad form, 1 = good form) to a feedback message"""
+        return form_feedback(prediction)
 
     def countdown(self, frame, count):
         """Display countdown on frame"""
+        import cv2
+        
         height, width = frame.shape[:2]
         font_scale = 4.0
         thickness = 4
@@ -61,100 +137,317 @@ class PushupAnalyzer:
         cv2.putText(frame, text, (x, y), font, font_scale, (0, 255, 0), thickness)
         return frame
 
-    def analyze_video_file(self, video_path):
-        """Analyze a pre-recorded video file"""
+    def analyze_video_file(self, video_path, headless=config.HEADLESS):
+        """Analyze a pre-recorded video file
+
+        Decoding and encoding run on their own threads (see ``VideoPipeline``) so
+        they overlap with pose extraction and the model.
+
+        Args:
+            video_path: Path to the video file
+            headless: Skip the preview window, e.g. on servers without a display
+        """
         if not os.path.exists(video_path):
             print(f"Error: Video file not found: {video_path}")
             return
-            
-        cap = cv2.VideoCapture(video_path)
+        if is_track_file(video_path):
+            self.analyze_video_batch(video_path)  # Landmarks are already extracted
+            return
+        
+        import cv2
+        from utils.video_pipeline import VideoPipeline
+        
+        output_path = video_path.rsplit('.', 1)[0] + '_analyzed.mp4'
+        pipeline = VideoPipeline(video_path, output_path, metrics=self.metrics)
+        self.reset_window()
+        
+        pipeline.run(self._annotate_frame, display=None if headless else self._show_frame)
+        if not headless:
+            cv2.destroyAllWindows()
+        print(f"Analysis complete! Output saved to: {output_path}")
+        self.print_metrics()
+
+    def print_metrics(self):
+        """Print per-stage timings collected so far (no-op unless config.METRICS_ENABLED)"""
+        if not self.metrics.enabled:
+            return
+        snapshot = self.metrics.snapshot()
+        print(f"{'Stage':<20}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for stage, stats in snapshot["stages"].items():
+            print(f"{stage:<20}{stats['count']:>8}{stats['mean_ms']:>10.2f}"
+                  f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+
+    def _annotate_frame(self, frame):
+        """Extract landmarks, update the rolling window and draw feedback on one frame"""
+        import cv2
+        self.metrics.increment("frames")
+        with self.metrics.timer("extract_landmarks"):
+            landmarks, pose_landmarks = self.processor.extract_landmarks(frame)
+        
+        form_feedback = self.update_form(landmarks) if landmarks else None
+        
+        with self.metrics.timer("draw"):
+            if form_feedback:
+                cv2.putText(frame, form_feedback, (10, 30), 
+                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            if pose_landmarks:
+                frame = self.visualizer.draw_pose_landmarks(frame, pose_landmarks)
+                self._draw_angles(frame, landmarks)
+            self._draw_metrics(frame)
+        return frame
+
+    def _draw_angles(self, frame, landmarks):
+        """Overlay the joint angles in config.DISPLAY_ANGLES when config.DRAW_ANGLES is set"""
+        if config.DRAW_ANGLES and landmarks is not None:
+            self.visualizer.draw_angles(frame, angle_dict(landmarks))
+
+    def _draw_metrics(self, frame):
+        """Overlay recent per-stage timings when config.METRICS_OVERLAY is set"""
+        if config.METRICS_OVERLAY and self.metrics.enabled:
+            top = 100 + 30 * len(config.DISPLAY_ANGLES) if config.DRAW_ANGLES else 100  # Below the angles
+            self.visualizer.draw_performance_metrics(frame, self.metrics.overlay(), position=(30, top))
+
+    def _show_frame(self, frame):
+        """Preview a processed frame; returns False when the user presses 'q'"""
+        import cv2
+        cv2.imshow('Analysis', frame)
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
+    def score_video(self, video_path, stride=config.WINDOW_STRIDE, batch_size=config.PREDICT_BATCH_SIZE):
+        """Score every window of a video offline, batching model calls
+
+        Landmarks for the whole video are extracted first; windows are then built
+        as a strided view over the frames with a detected pose (the same frames the
+        live buffer would hold) and scored ``batch_size`` at a time.
+
+        Args:
+            video_path: Path to the video file
+            stride: Score every ``stride``-th window; frames in between reuse the
+                previous score
+            batch_size: Windows per model call
+
+        Returns:
+            points: (T, N_LANDMARKS, 3) landmarks for every frame
+            detected: (T,) bool mask of frames with a detected pose
+            scores: (T,) float32 per-frame scores, NaN where no window is complete
+            fps: Frame rate of the video
+        """
+        points, _, detected, fps = self.processor.extract_track(video_path)
+        scores = np.full(len(points), np.nan, dtype=np.float32)
+        
+        detected_frames = np.flatnonzero(detected)
+        track = frame_features(points, detected)
+        windows = sliding_windows(track[detected_frames], config.SEQUENCE_LENGTH, stride)
+        if len(windows) == 0:
+            return points, detected, scores, fps
+        
+        window_scores = np.full(len(detected_frames), np.nan, dtype=np.float32)
+        window_scores[window_end_frames(len(detected_frames), config.SEQUENCE_LENGTH, stride)] = \
+            self.model.predict_batch(windows, batch_size)
+        scores[detected_frames] = forward_fill(window_scores)
+        return points, detected, scores, fps
+
+    def score_reps(self, video_path, signal=config.REP_SIGNAL):
+        """Detect reps in a video and score each rep with one classifier input
+
+        Each rep's features are resampled to SEQUENCE_LENGTH frames, so the model
+        runs once per rep instead of once per sliding window.
+
+        Returns:
+            points, detected: As from ``score_video``
+            reps: ``RepSegments`` in video frame numbers
+            scores: (n_reps,) float32 score per rep
+            fps: Frame rate of the video
+        """
+        from data.reps import detect_reps, rep_windows
+        
+        points, _, detected, fps = self.processor.extract_track(video_path)
+        detected_frames = np.flatnonzero(detected)
+        reps = detect_reps(points[detected_frames], fps, signal)
+        windows = rep_windows(track_features(points[detected_frames]), reps)
+        scores = self.model.predict_batch(windows) if len(reps) else np.empty(0, dtype=np.float32)
+        return points, detected, reps.in_frames(detected_frames), scores, fps
+
+    @staticmethod
+    def rep_frame_scores(n_frames, reps, rep_scores):
+        """Spread per-rep scores over the frames of each rep (NaN outside reps)"""
+        scores = np.full(n_frames, np.nan, dtype=np.float32)
+        frames = np.arange(n_frames)
+        rep = np.searchsorted(reps.start, frames, side='right') - 1
+        in_rep = (rep >= 0) & (frames <= reps.end[np.maximum(rep, 0)]) if len(reps) else np.zeros(n_frames, dtype=bool)
+        scores[in_rep] = rep_scores[rep[in_rep]]
+        return scores
+
+    def analyze_reps(self, video_path, signal=config.REP_SIGNAL):
+        """Count reps in a video and print timing and form feedback for each"""
+        if not os.path.exists(video_path):
+            print(f"Error: Video file not found: {video_path}")
+            return None, None
         
-        # Get video properties for output
+        _, _, reps, scores, fps = self.score_reps(video_path, signal)
+        print(f"\n{'Rep':>4}{'start s':>9}{'down s':>8}{'up s':>7}{'score':>7}  feedback")
+        for i in range(len(reps)):
+            print(f"{i + 1:>4}{reps.start[i] / fps:>9.1f}{reps.down_seconds[i]:>8.2f}{reps.up_seconds[i]:>7.2f}"
+                  f"{scores[i]:>7.2f}  {self.form_feedback(scores[i])}")
+        summary = reps.summary()
+        print(f"Reps: {summary['reps']}, tempo {summary['mean_down_s']:.2f} s down / {summary['mean_up_s']:.2f} s up, "
+              f"{summary['reps_per_minute']:.1f} reps/min")
+        return reps, scores
+
+    def render_scores(self, video_path, points, detected, scores, output_path=None, reps=None):
+        """Write an annotated copy of a video from precomputed landmarks and scores
+
+        With ``reps`` the running rep count is drawn as well.
+        """
+        import cv2
+        cap = cv2.VideoCapture(video_path)
         frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         fps = int(cap.get(cv2.CAP_PROP_FPS))
         
-        # Create output video writer
-        output_path = video_path.rsplit('.', 1)[0] + '_analyzed.mp4'
-        out = cv2.VideoWriter(output_path, 
+        output_path = output_path or video_path.rsplit('.', 1)[0] + '_analyzed.mp4'
+        out = cv2.VideoWriter(output_path,
                             cv2.VideoWriter_fourcc(*'mp4v'),
                             fps, (frame_width, frame_height))
+        # Reps completed by each frame
+        rep_counts = np.searchsorted(reps.end, np.arange(len(points)), side='right') if reps is not None else None
         
-        while cap.isOpened():
+        frame_index = 0
+        while cap.isOpened() and frame_index < len(points):
             ret, frame = cap.read()
             if not ret:
                 break
-                
-            landmarks, pose_landmarks = self.processor.extract_landmarks(frame)
             
-            if landmarks:
-                self.frame_sequence.append(frame)
-                if len(self.frame_sequence) > config.SEQUENCE_LENGTH:
-                    self.frame_sequence.pop(0)
-                
-                if len(self.frame_sequence) == config.SEQUENCE_LENGTH:
-                    form_feedback = self.analyze_form(self.frame_sequence)
-                    if form_feedback:
-                        cv2.putText(frame, form_feedback, (10, 30), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            if pose_landmarks:
-                frame = self.visualizer.draw_pose_landmarks(frame, pose_landmarks)
+            if not np.isnan(scores[frame_index]):
+                cv2.putText(frame, self.form_feedback(scores[frame_index]), (10, 30),
+                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            if detected[frame_index]:
+                frame = self.visualizer.draw_landmark_array(frame, points[frame_index])
+                self._draw_angles(frame, points[frame_index])
+            if rep_counts is not None:
+                cv2.putText(frame, f"Reps: {rep_counts[frame_index]}", (10, 70),
+                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
             
             out.write(frame)
-            
-            cv2.imshow('Analysis', frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            frame_index += 1
         
         cap.release()
         out.release()
-        cv2.destroyAllWindows()
+        return output_path
+
+    def analyze_video_batch(self, video_path, stride=config.WINDOW_STRIDE, batch_size=config.PREDICT_BATCH_SIZE):
+        """Headless file analysis: batch-score the whole video, then render the output
+
+        ``video_path`` may be a .lmk landmark track; the annotated video is then
+        rendered from the track's source video if that still exists. With
+        config.CLASSIFY_PER_REP each detected rep is scored once instead of
+        every window, and the rep count is drawn.
+        """
+        if not os.path.exists(video_path):
+            print(f"Error: Video file not found: {video_path}")
+            return None
+        
+        reps = None
+        if config.CLASSIFY_PER_REP:
+            points, detected, reps, rep_scores, _ = self.score_reps(video_path)
+            scores = self.rep_frame_scores(len(points), reps, rep_scores)
+            print(f"Reps: {len(reps)}")
+        else:
+            points, detected, scores, _ = self.score_video(video_path, stride, batch_size)
+        render_path = video_path
+        if is_track_file(video_path):
+            render_path = TrackFile(video_path).source.get("path")
+            if not render_path or not os.path.exists(render_path):
+                scored = scores[~np.isnan(scores)]
+                mean = f"{scored.mean():.2f}" if len(scored) else "-"
+                print(f"Analysis complete! {len(scored)} of {len(scores)} frames scored, mean score {mean} "
+                      f"(source video unavailable, nothing rendered)")
+                return scores
+        
+        output_path = self.render_scores(render_path, points, detected, scores, reps=reps)
         print(f"Analysis complete! Output saved to: {output_path}")
+        return scores
 
-    def run_live(self):
-        """Run real-time analysis using webcam"""
-        model_exists = os.path.exists(config.MODEL_PATH)
+    def run_live(self, source=0, classify_every=config.LIVE_CLASSIFY_EVERY, start_analyzing=False):
+        """Run real-time analysis using webcam
 
-        cap = cv2.VideoCapture(0)
+        Pose runs on the newest captured frame only; frames that arrive while the
+        previous one is being processed are dropped rather than queued, so feedback
+        never lags behind the user. The LSTM runs on every ``classify_every``-th
+        analyzed frame and its last verdict stays on screen in between.
+
+        Args:
+            source: Camera index, or a video file played back at its native FPS
+                in place of a camera
+            classify_every: Run the form classifier on every k-th frame (the
+                streaming LSTM, when enabled, advances on every frame instead)
+            start_analyzing: Begin analyzing immediately instead of waiting for 'a'
+        """
+        import cv2
+        from utils.live_capture import LatestFrameCapture, LatencyTracker
+        
+        model_exists = self.model.is_trained
+
+        cap = LatestFrameCapture(source)
+        latency = LatencyTracker()
         
         if not cap.isOpened():
             print("Error: Could not open camera")
             return
             
         print("Camera opened successfully. Position yourself and press 'a' to start analyzing.")
+        self.is_analyzing = start_analyzing
+        self.reset_window()
+        form_feedback = None
+        frames_since_classify = 0
         
         while cap.isOpened():
             ret, frame = cap.read()
             if not ret:
                 print("Error: Can't receive frame")
                 break
+            frame_time = cap.frame_time
+            self.metrics.increment("frames")
                 
             # Get landmarks
-            landmarks, pose_landmarks = self.processor.extract_landmarks(frame)
+            with self.metrics.timer("extract_landmarks"):
+                landmarks, pose_landmarks = self.processor.extract_landmarks(frame)
             
             if landmarks:
                 if self.is_analyzing:
-                    # Add frame to sequence
-                    self.frame_sequence.append(frame)
-                    if len(self.frame_sequence) > config.SEQUENCE_LENGTH:
-                        self.frame_sequence.pop(0)
-                    
-                    # Only analyze if we have enough frames and model exists
-                    if model_exists and len(self.frame_sequence) == config.SEQUENCE_LENGTH:
-                        form_feedback = self.analyze_form(self.frame_sequence)
-                        if form_feedback:
-                            cv2.putText(frame, form_feedback, (10, 30), 
-                                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Draw landmarks using visualizer
-            if pose_landmarks:
-                frame = self.visualizer.draw_pose_landmarks(frame, pose_landmarks)
+                    if self.stream is not None:
+                        # Streaming state must see every frame; each step is already cheap
+                        if model_exists:
+                            form_feedback = self.update_form(landmarks) or form_feedback
+                    else:
+                        # Add this frame's features to the rolling window
+                        with self.metrics.timer("window"):
+                            self.landmark_buffer.append(self.features.step(landmarks))
+                        frames_since_classify += 1
+                        
+                        # Only analyze if we have enough frames, the model exists and it's this frame's turn
+                        if model_exists and self.landmark_buffer.is_full() and frames_since_classify >= classify_every:
+                            form_feedback = self.analyze_form(self.landmark_buffer.window())
+                            frames_since_classify = 0
             
-            # Add status text
-            status = "Analyzing..." if self.is_analyzing else "Press 'a' to start/stop analysis"
-            cv2.putText(frame, status, (10, frame.shape[0] - 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            with self.metrics.timer("draw"):
+                if self.is_analyzing and form_feedback:
+                    cv2.putText(frame, form_feedback, (10, 30), 
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                
+                # Draw landmarks using visualizer
+                if pose_landmarks:
+                    frame = self.visualizer.draw_pose_landmarks(frame, pose_landmarks)
+                    self._draw_angles(frame, landmarks)
+                
+                # Add status text
+                status = "Analyzing..." if self.is_analyzing else "Press 'a' to start/stop analysis"
+                cv2.putText(frame, status, (10, frame.shape[0] - 20), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                frame_latency = latency.record(frame_time)
+                cv2.putText(frame, f"Latency: {frame_latency * 1000:.0f} ms  Dropped: {cap.dropped}",
+                           (10, frame.shape[0] - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                self._draw_metrics(frame)
                 
             cv2.imshow('Push-up Form Analysis', frame)
             
@@ -179,32 +472,105 @@ class PushupAnalyzer:
                                     break
                     
                     self.is_analyzing = True
-                    self.frame_sequence = []  # Clear sequence when starting
+                    self.reset_window()  # Clear sequence when starting
+                    form_feedback = None
                     print("Analysis started")
                 else:
                     self.is_analyzing = False
-                    self.frame_sequence = []  # Clear sequence when stopping
+                    self.reset_window()  # Clear sequence when stopping
+                    form_feedback = None
                     print("Analysis stopped")
         
         cap.release()
         cv2.destroyAllWindows()
+        stats = latency.summary()
+        print(f"Frames captured: {cap.captured}, dropped: {cap.dropped}")
+        print(f"Capture-to-overlay latency: mean {stats['mean_ms']:.0f} ms, "
+              f"p95 {stats['p95_ms']:.0f} ms, max {stats['max_ms']:.0f} ms")
+        self.print_metrics()
 
-if __name__ == "__main__":
-    analyzer = PushupAnalyzer()
-    
+def interactive_menu(analyzer):
+    """Prompt for a mode and a video path, as when app.py is run without a command"""
     print("Choose analysis mode:")
     print("1. Live webcam analysis")
     print("2. Video file analysis")
+    print("3. Batch video file scoring (no preview window)")
+    print("4. Rep counting with per-rep form scores")
     
-    choice = input("Enter your choice (1 or 2): ")
+    choice = input("Enter your choice (1, 2, 3 or 4): ")
     
     if choice == "1":
         analyzer.run_live()
-    elif choice == "2":
+    elif choice in ("2", "3", "4"):
         print("\nExample paths:")
         print("- Full path: C:\\Users\\peter\\Videos\\pushup.mp4")
         print("- Relative path: data/videos/pushup.mp4")
         video_path = input("\nEnter the path to your video file: ")
-        analyzer.analyze_video_file(video_path)
+        if choice == "2":
+            analyzer.analyze_video_file(video_path)
+        elif choice == "3":
+            analyzer.analyze_video_batch(video_path)
+        else:
+            analyzer.analyze_reps(video_path)
     else:
-        print("Invalid choice. Please run again and select 1 or 2.")
\ No newline at end of file
+        print("Invalid choice. Please run again and select 1, 2, 3 or 4.")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Push-up form analysis; without a command, asks for a mode")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Build and exercise the model and Pose graph before starting, so the first frame isn't slow")
+    commands = parser.add_subparsers(dest="command")
+    
+    live = commands.add_parser("live", help="Real-time analysis from a webcam")
+    live.add_argument("--source", default="0", help="Camera index, or a video file played back as a camera")
+    live.add_argument("--classify-every", type=int, default=config.LIVE_CLASSIFY_EVERY)
+    live.add_argument("--start", action="store_true", help="Start analyzing without waiting for 'a'")
+    
+    file = commands.add_parser("file", help="Analyze a video frame by frame with a preview window")
+    file.add_argument("video")
+    file.add_argument("--headless", action=argparse.BooleanOptionalAction, default=config.HEADLESS,
+                      help="Skip the preview window (default from config.HEADLESS)")
+    
+    batch = commands.add_parser("batch", help="Batch-score a video or .lmk track and render the result")
+    batch.add_argument("video")
+    batch.add_argument("--stride", type=int, default=config.WINDOW_STRIDE)
+    batch.add_argument("--batch-size", type=int, default=config.PREDICT_BATCH_SIZE)
+    
+    reps = commands.add_parser("reps", help="Count reps and score each one")
+    reps.add_argument("video")
+    reps.add_argument("--signal", choices=["elbow_angle", "shoulder_height"], default=config.REP_SIGNAL)
+    
+    # Everything after "train" is left unparsed here and handed to train.main
+    commands.add_parser("train", help="Train the classifier; arguments are passed to train.py", add_help=False)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "train":
+        import train
+        return train.main(extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    
+    analyzer = PushupAnalyzer()
+    analyzer.metrics.start_export()
+    if args.warmup:
+        started = time.perf_counter()
+        analyzer.warm_up()
+        print(f"Warm-up took {time.perf_counter() - started:.2f} s")
+    
+    if args.command is None:
+        interactive_menu(analyzer)
+    elif args.command == "live":
+        source = int(args.source) if args.source.isdigit() else args.source
+        analyzer.run_live(source, args.classify_every, start_analyzing=args.start)
+    elif args.command == "file":
+        analyzer.analyze_video_file(args.video, headless=args.headless)
+    elif args.command == "batch":
+        analyzer.analyze_video_batch(args.video, args.stride, args.batch_size)
+    else:
+        analyzer.analyze_reps(args.video, args.signal)
+
+if __name__ == "__main__":
+    main()
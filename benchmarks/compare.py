@@ -0,0 +1,53 @@
+import argparse
+import json
+import sys
+
+def compare_results(current, baseline, threshold=0.1):
+    """Compare a benchmark run against a stored baseline
+
+    A benchmark regresses when its throughput drops, or its median latency or
+    the run's peak RSS grows, by more than ``threshold`` (a fraction).
+
+    Returns:
+        List of human-readable regression messages (empty if none)
+    """
+    regressions = []
+    print(f"{'benchmark':<28}{'baseline/s':>14}{'current/s':>14}{'change':>9}")
+    for name, base in baseline["benchmarks"].items():
+        result = current["benchmarks"].get(name)
+        if result is None:
+            print(f"{name:<28}{'missing from current run':>37}")
+            continue
+
+        base_rate = base["items_per_sec"]
+        rate = result["items_per_sec"]
+        change = (rate - base_rate) / base_rate if base_rate else 0.0
+        print(f"{name:<28}{base_rate:>14.1f}{rate:>14.1f}{change:>+9.1%}")
+        if base_rate and rate < base_rate * (1 - threshold):
+            regressions.append(f"{name}: throughput {rate:.1f}/s vs baseline {base_rate:.1f}/s")
+        if base["p50_ms"] and result["p50_ms"] > base["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.2f} ms vs baseline {base['p50_ms']:.2f} ms")
+
+    if current["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + threshold):
+        regressions.append(f"peak RSS {current['peak_rss_mb']:.0f} MB vs baseline {baseline['peak_rss_mb']:.0f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("current", help="Results JSON from run_benchmarks")
+    parser.add_argument("baseline", help="Stored baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_results(current, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Load-test a running api.py instance
+
+    python api.py &
+    python -m benchmarks.load_test --concurrency 8 --requests 200
+    python -m benchmarks.load_test --clip data/training_data/video_00.mp4 --requests 20
+
+Sends random landmark arrays (or a clip) from concurrent clients and reports
+throughput, latency percentiles and how many requests were refused with 503.
+"""
+import argparse
+import io
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import config
+
+def landmark_payload(frames, seed=0):
+    """An .npy body of random landmarks, about 10% of frames without a pose"""
+    rng = np.random.default_rng(seed)
+    track = rng.random((frames, config.N_LANDMARK_VALUES), dtype=np.float32)
+    track[rng.random(frames) < 0.1] = np.nan
+    buffer = io.BytesIO()
+    np.save(buffer, track)
+    return buffer.getvalue(), 'application/octet-stream'
+
+def send(url, body, content_type):
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None  # Connection refused or reset
+    return status, time.perf_counter() - start
+
+def run(base_url, body, content_type, path, concurrency, n_requests):
+    url = base_url.rstrip('/') + path
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: send(url, body, content_type), range(n_requests)))
+    wall = time.perf_counter() - started
+
+    latencies = np.array([latency for status, latency in results if status == 200]) * 1000
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "requests_per_sec": len(latencies) / wall if wall else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the scoring API")
+    parser.add_argument("--url", default=f"http://{config.API_HOST}:{config.API_PORT}")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=100, help="Total requests")
+    parser.add_argument("--frames", type=int, default=300, help="Frames per landmark upload")
+    parser.add_argument("--clip", help="Upload this video to /score/clip instead of landmarks")
+    parser.add_argument("--output", help="Write the results JSON here")
+    args = parser.parse_args()
+
+    if args.clip:
+        with open(args.clip, 'rb') as f:
+            body, content_type, path = f.read(), 'video/mp4', '/score/clip'
+    else:
+        (body, content_type), path = landmark_payload(args.frames), '/score/landmarks'
+
+    results = run(args.url, body, content_type, path, args.concurrency, args.requests)
+    print(f"{results['requests_per_sec']:.1f} req/s  p50 {results['p50_ms']:.0f} ms  "
+          f"p95 {results['p95_ms']:.0f} ms  p99 {results['p99_ms']:.0f} ms  statuses {results['statuses']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Accuracy vs speed of the adaptive pose inference settings on the bundled clips
+
+Run from the repository root:
+
+    python -m benchmarks.pose_report --max-frames 300 --output pose_report.json
+
+Every setting is compared with full-resolution inference at the configured
+model complexity and no cropping or skipping. Accuracy columns are measured
+over frames where both found a pose:
+
+    error     mean landmark distance in normalised image units (visible landmarks)
+    elbow     mean absolute elbow angle difference, degrees
+    agree     fraction of frames where both agree on whether there is a pose
+    reps      rep count difference summed over clips
+"""
+import argparse
+import json
+import time
+import numpy as np
+from benchmarks.run_benchmarks import bundled_clips
+import config
+
+SETTINGS = {
+    "baseline": {},
+    "lite": {"model_complexity": 0},
+    "max_side_640": {"max_side": 640},
+    "max_side_480": {"max_side": 480},
+    "roi": {"roi_crop": True},
+    "motion_skip": {"motion_threshold": 2.0},
+    "max_side_640_roi_skip": {"max_side": 640, "roi_crop": True, "motion_threshold": 2.0},
+    "lite_640_roi_skip": {"model_complexity": 0, "max_side": 640, "roi_crop": True, "motion_threshold": 2.0},
+}
+
+BASELINE = {"model_complexity": config.POSE_MODEL_COMPLEXITY, "max_side": None, "roi_crop": False,
+            "motion_threshold": 0.0}
+
+def extract(settings, clips, max_frames):
+    """Tracks of every clip with one setting, plus the frames per second of extraction"""
+    from data.data_processor import DataProcessor
+    from data.pose_estimator import PoseEstimator
+
+    estimator = PoseEstimator(**{**BASELINE, **settings})
+    processor = DataProcessor(use_cache=False, estimator=estimator)
+    tracks = {}
+    frames = 0
+    started = time.perf_counter()
+    for clip in clips:
+        points, visibility, detected, fps = processor.extract_frame_range(clip, end=max_frames)
+        tracks[clip] = (points, visibility, detected, fps)
+        frames += len(points)
+    seconds = time.perf_counter() - started
+    return tracks, {
+        "frames": frames,
+        "fps": frames / seconds if seconds else 0.0,
+        "skipped_fraction": estimator.skipped / max(estimator.skipped + estimator.inferred, 1),
+    }
+
+def compare(tracks, reference):
+    """Accuracy of ``tracks`` against the ``reference`` tracks of the same clips"""
+    from data.features import joint_angles
+    from data.reps import detect_reps
+
+    errors, elbow_errors, agreement, rep_difference = [], [], [], 0
+    for clip, (points, _, detected, fps) in tracks.items():
+        ref_points, ref_visibility, ref_detected, _ = reference[clip]
+        both = detected & ref_detected
+        agreement.append(detected == ref_detected)
+        visible = ref_visibility[both] > 0.5
+        distance = np.linalg.norm(points[both, :, :2] - ref_points[both, :, :2], axis=-1)
+        errors.append(distance[visible])
+        elbows = ('left_elbow', 'right_elbow')
+        elbow_errors.append(np.abs(joint_angles(points[both], elbows) - joint_angles(ref_points[both], elbows)).ravel())
+        reps = len(detect_reps(points[detected], fps)) if detected.any() else 0
+        ref_reps = len(detect_reps(ref_points[ref_detected], fps)) if ref_detected.any() else 0
+        rep_difference += abs(reps - ref_reps)
+
+    errors, elbow_errors = np.concatenate(errors), np.concatenate(elbow_errors)
+    return {
+        "landmark_error": float(errors.mean()) if len(errors) else 0.0,
+        "elbow_error_deg": float(elbow_errors.mean()) if len(elbow_errors) else 0.0,
+        "detection_agreement": float(np.concatenate(agreement).mean()),
+        "rep_count_difference": rep_difference,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare adaptive pose inference settings")
+    parser.add_argument("--clips", nargs="*", help="Video files (default: the bundled clips)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frames read per clip")
+    parser.add_argument("--settings", nargs="*", choices=list(SETTINGS), help="Settings to run (default: all)")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    clips = args.clips or bundled_clips()
+    if not clips:
+        print("Error: No clips found")
+        return
+    names = ["baseline"] + [name for name in args.settings or SETTINGS if name != "baseline"]
+
+    reference = None
+    report = {}
+    print(f"{'setting':<24}{'fps':>8}{'speedup':>9}{'skipped':>9}{'error':>9}{'elbow':>8}{'agree':>8}{'reps':>6}")
+    for name in names:
+        tracks, speed = extract(SETTINGS[name], clips, args.max_frames)
+        if reference is None:
+            reference, reference_fps = tracks, speed["fps"]
+        result = {"settings": {**BASELINE, **SETTINGS[name]}, **speed, **compare(tracks, reference)}
+        result["speedup"] = speed["fps"] / reference_fps if reference_fps else 0.0
+        report[name] = result
+        print(f"{name:<24}{result['fps']:>8.1f}{result['speedup']:>8.2f}x{result['skipped_fraction']:>9.0%}"
+              f"{result['landmark_error']:>9.4f}{result['elbow_error_deg']:>8.1f}"
+              f"{result['detection_agreement']:>8.1%}{result['rep_count_difference']:>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"clips": clips, "max_frames": args.max_frames, "results": report}, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
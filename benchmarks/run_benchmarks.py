@@ -0,0 +1,174 @@
+"""Benchmark the hot paths on the bundled clips
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks  # Writes benchmarks/results/bench_output.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+
+Reports frames (or windows) per second and latency percentiles per stage,
+plus peak RSS, as JSON. With --baseline the run fails on regressions beyond
+--threshold; --save-baseline stores the run as the new baseline.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+import cv2
+import numpy as np
+from benchmarks.compare import compare_results
+from benchmarks.timing import LatencyRecorder, peak_rss_mb
+import config
+
+CLIP_PATTERNS = ['data/training_data/*.mp4', 'data/videos_reddit_input/*.mp4']
+
+def bundled_clips():
+    return sorted(path for pattern in CLIP_PATTERNS for path in glob.glob(pattern)
+                  if not path.endswith('_analyzed.mp4'))
+
+def read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    while max_frames is None or max_frames > 0:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+        if max_frames is not None:
+            max_frames -= 1
+    cap.release()
+
+def bench_extract_landmarks(processor, clips, max_frames):
+    """Pose extraction per frame; also returns each clip's landmark track for later stages"""
+    recorder = LatencyRecorder()
+    tracks = {}
+    for clip in clips:
+        track = []
+        pose_landmarks = []
+        for frame in read_frames(clip, max_frames):
+            with recorder.time():
+                landmarks, frame_pose = processor.extract_landmarks(frame)
+            if landmarks:
+                track.append(landmarks)
+            pose_landmarks.append(frame_pose)
+        tracks[clip] = (np.array(track, dtype=np.float32).reshape(-1, config.N_LANDMARK_VALUES), pose_landmarks)
+    return recorder, tracks
+
+def bench_windowing(tracks):
+    """Cutting training windows out of a track, as ``DataProcessor.process_video`` does (every frame labelled)"""
+    from data.data_processor import sequences_from_track
+    recorder = LatencyRecorder()
+    for track, _ in tracks.values():
+        everything = np.ones(len(track), dtype=bool)
+        n_windows = max(len(track) - config.SEQUENCE_LENGTH + 1, 0)
+        with recorder.time(items=n_windows):
+            sequences_from_track(track, everything, np.ones(len(track), dtype=np.int64), everything)
+    return recorder
+
+def bench_predict(model, tracks, max_single):
+    """PushupModel.predict one window at a time vs predict_batch over all windows"""
+    from data.features import track_features
+    from data.windows import sliding_windows
+    single = LatencyRecorder()
+    batched = LatencyRecorder()
+    for track, _ in tracks.values():
+        windows = sliding_windows(track_features(track))
+        for window in windows[:max_single]:
+            with single.time():
+                model.predict(window[np.newaxis])
+        if len(windows):
+            with batched.time(items=len(windows)):
+                model.predict_batch(windows)
+    return single, batched
+
+def bench_debug_view(visualizer, clips, tracks, max_frames):
+    """PoseVisualizer.create_debug_view on every frame, with angle and metric overlays"""
+    recorder = LatencyRecorder()
+    angles = {"Left elbow": 90.0, "Right elbow": 90.0, "Hip": 175.0}
+    metrics = {"FPS": 30.0, "Latency": "33 ms"}
+    for clip in clips:
+        _, pose_landmarks = tracks[clip]
+        for frame, frame_pose in zip(read_frames(clip, max_frames), pose_landmarks):
+            with recorder.time():
+                visualizer.create_debug_view(frame, frame_pose, angles, metrics)
+    return recorder
+
+def bench_end_to_end(analyzer, clips):
+    """Headless analyze_video_file on a copy of each clip; items are frames"""
+    recorder = LatencyRecorder()
+    with tempfile.TemporaryDirectory() as workdir:
+        for clip in clips:
+            copy = shutil.copy(clip, workdir)  # Keep _analyzed.mp4 outputs out of the repo
+            cap = cv2.VideoCapture(copy)
+            frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+            with recorder.time(items=frames):
+                analyzer.analyze_video_file(copy, headless=True)
+    return recorder
+
+def run(max_frames, max_single):
+    from app import PushupAnalyzer
+
+    clips = bundled_clips()
+    analyzer = PushupAnalyzer()
+    results = {}
+
+    def record(name, recorder):
+        results[name] = dict(recorder.summary(), peak_rss_mb=peak_rss_mb())
+        print(f"{name:<28}{results[name]['items_per_sec']:>10.1f}/s  p50 {results[name]['p50_ms']:.2f} ms  "
+              f"p99 {results[name]['p99_ms']:.2f} ms")
+
+    recorder, tracks = bench_extract_landmarks(analyzer.processor, clips, max_frames)
+    record("extract_landmarks", recorder)
+    record("process_video_windowing", bench_windowing(tracks))
+    single, batched = bench_predict(analyzer.model, tracks, max_single)
+    record("predict_batch1", single)
+    record("predict_batched", batched)
+    record("create_debug_view", bench_debug_view(analyzer.visualizer, clips, tracks, max_frames))
+    record("analyze_video_file_headless", bench_end_to_end(analyzer, clips))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "clips": clips,
+            "max_frames": max_frames,
+            "inference_backend": analyzer.model.backend,
+        },
+        "benchmarks": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pose extraction, windowing, inference and rendering")
+    parser.add_argument("--output", default="benchmarks/results/bench_output.json",
+                        help="Where to write the results JSON")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frames per clip for per-frame stages")
+    parser.add_argument("--max-single", type=int, default=200, help="Windows per clip for batch-1 prediction")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression as a fraction")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also store this run as the baseline")
+    args = parser.parse_args()
+
+    results = run(args.max_frames, args.max_single)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Peak RSS: {results['peak_rss_mb']:.0f} MB. Results written to {args.output}")
+
+    if args.save_baseline:
+        shutil.copy(args.output, args.save_baseline)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
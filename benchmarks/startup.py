@@ -0,0 +1,99 @@
+"""Startup cost of the entry points, each measured in a fresh interpreter
+
+Run from the repository root:
+
+    python -m benchmarks.startup --repeat 5  # Writes benchmarks/results/startup.json
+    python -m benchmarks.startup --baseline benchmarks/startup_baseline.json
+
+Each scenario is run ``--repeat`` times as a subprocess and timed from launch
+to exit, so interpreter start and imports are included. Import-only scenarios
+also list which heavy libraries ended up loaded. Results use the
+run_benchmarks format, so --baseline compares with ``compare_results``.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+from datetime import datetime
+from benchmarks.compare import compare_results
+from benchmarks.timing import LatencyRecorder
+
+HEAVY_MODULES = ("tensorflow", "mediapipe", "cv2", "scipy", "sklearn", "yt_dlp")
+
+_REPORT_MODULES = (
+    "import json, sys; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+SCENARIOS = {
+    "import_app": ["-c", "import app; " + _REPORT_MODULES],
+    "import_train": ["-c", "import train; " + _REPORT_MODULES],
+    "app_help": ["app.py", "--help"],
+    "train_help": ["train.py", "--help"],
+    "analyzer_init": ["-c", "import app; app.PushupAnalyzer(); " + _REPORT_MODULES],
+    "analyzer_warm_up": ["-c", "import app; app.PushupAnalyzer().warm_up(); " + _REPORT_MODULES],
+}
+
+def run_scenario(args, repeat):
+    """Time ``repeat`` runs of ``python <args>``; returns (recorder, heavy modules loaded)"""
+    recorder = LatencyRecorder()
+    loaded = None
+    for _ in range(repeat):
+        with recorder.time():
+            completed = subprocess.run([sys.executable, *args], capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"python {' '.join(args)} failed:\n{completed.stderr}")
+        if args[0] == "-c":
+            loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    return recorder, loaded
+
+def children_peak_rss_mb():
+    """Largest peak resident set size of any finished child process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run(repeat, scenarios=SCENARIOS):
+    results = {}
+    for name, args in scenarios.items():
+        recorder, loaded = run_scenario(args, repeat)
+        results[name] = dict(recorder.summary(), heavy_modules=loaded)
+        modules = ", ".join(loaded) if loaded else "-" if loaded is not None else ""
+        print(f"{name:<20}p50 {results[name]['p50_ms']:>8.0f} ms  max {max(recorder.samples) * 1000:>8.0f} ms  "
+              f"{modules}")
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": sys.version.split()[0],
+            "repeat": repeat,
+        },
+        "benchmarks": results,
+        "peak_rss_mb": children_peak_rss_mb(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time of app.py and train.py")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only run these")
+    parser.add_argument("--output", default="benchmarks/results/startup.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    scenarios = {name: SCENARIOS[name] for name in args.scenario} if args.scenario else SCENARIOS
+    results = run(args.repeat, scenarios)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
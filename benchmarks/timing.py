@@ -0,0 +1,39 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+
+class LatencyRecorder:
+    def __init__(self):
+        """Collects per-call latencies for one benchmark"""
+        self.samples = []
+        self.items = 0
+
+    @contextmanager
+    def time(self, items=1):
+        """Time the enclosed block; ``items`` is how many frames/windows it handled"""
+        start = time.perf_counter()
+        yield
+        self.samples.append(time.perf_counter() - start)
+        self.items += items
+
+    def summary(self):
+        """Throughput and latency percentiles in the results format"""
+        samples = np.array(self.samples) * 1000
+        total = samples.sum() / 1000
+        return {
+            "calls": len(self.samples),
+            "items": self.items,
+            "items_per_sec": self.items / total if total else 0.0,
+            "mean_ms": float(samples.mean()) if len(samples) else 0.0,
+            "p50_ms": float(np.percentile(samples, 50)) if len(samples) else 0.0,
+            "p90_ms": float(np.percentile(samples, 90)) if len(samples) else 0.0,
+            "p99_ms": float(np.percentile(samples, 99)) if len(samples) else 0.0,
+        }
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
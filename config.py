@@ -1,14 +1,108 @@
 # Configuration settings
 MODEL_PATH = 'models/saved/pushup_model.h5'
+WEIGHTS_PATH = 'models/saved/pushup_model.npz'  # Weights exported for the NumPy backend
+INFERENCE_BACKEND = 'auto'  # 'keras', 'numpy', 'tflite' (quantized), or 'auto' (numpy when WEIGHTS_PATH is up to date)
+BACKEND_TOLERANCE = 1e-4  # Max allowed difference between NumPy and Keras predictions
+QUANTIZATION = 'int8'  # Weights the 'tflite' backend runs: 'int8' (dynamic range) or 'float16'; see models/quantization.py
+QUANTIZATION_MAX_DISAGREEMENT = 0.01  # Most held-out windows (fraction) whose Poor/Fair/Good bucket quantization may change
 DATA_DIR = 'data/training_data'
 SEQUENCE_LENGTH = 30
 MIN_DETECTION_CONFIDENCE = 0.5
 MIN_TRACKING_CONFIDENCE = 0.5
 
+# Pose inference (see data/pose_estimator.py and benchmarks/pose_report.py)
+POSE_MODEL_COMPLEXITY = 1  # MediaPipe model: 0 (lite, fastest), 1 (full) or 2 (heavy, most accurate)
+POSE_INFERENCE_MAX_SIDE = None  # Downscale frames so the longer side is at most this many pixels; None for full resolution
+POSE_ROI_CROP = False  # Run pose on a crop around the previous frame's landmarks
+POSE_ROI_MARGIN = 0.3  # Crop padding as a fraction of the pose's bounding box
+POSE_MOTION_THRESHOLD = 0.0  # Mean grey-level change below which a frame reuses (or, offline, interpolates) landmarks; 0 disables
+POSE_MAX_SKIPPED_FRAMES = 2  # Most consecutive frames that may skip inference
+
+# Video downloads
+DOWNLOAD_WORKERS = 4  # Concurrent downloads
+DOWNLOAD_MANIFEST = 'manifest.json'  # Completed downloads with sizes and hashes, in DATA_DIR
+
+# Landmark cache
+LANDMARK_CACHE_ENABLED = True
+LANDMARK_CACHE_DIR = 'data/landmark_cache'
+LANDMARK_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Least recently used tracks are evicted above this
+TRACK_DTYPE = 'float16'  # Coordinate precision of exported .lmk tracks ('float16' or 'float32')
+
+# Parallel landmark extraction
+EXTRACTION_WORKERS = None  # Worker processes; None uses every CPU core
+EXTRACTION_CHUNK_FRAMES = 1800  # Longer videos are split into chunks of this many frames
+EXTRACTION_WARMUP_FRAMES = 30  # Frames decoded before each chunk so pose tracking converges
+
+# Model input features (see data/features.py)
+N_LANDMARKS = 33
+N_LANDMARK_VALUES = N_LANDMARKS * 3  # Raw x, y, z per landmark, as MediaPipe returns them
+FEATURE_MODE = 'raw'  # 'raw' (the 99 MediaPipe coordinates as they come) or 'engineered'; changing it needs a retrain
+FEATURE_LANDMARKS = (11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28)  # Shoulders, elbows, wrists, hips, knees, ankles
+FEATURE_ANGLES = ('left_elbow', 'right_elbow', 'left_shoulder', 'right_shoulder',
+                  'left_hip', 'right_hip', 'left_knee', 'right_knee')
+FEATURE_VELOCITIES = True  # Add each angle's change since the previous frame
+N_FEATURES = (
+    len(FEATURE_LANDMARKS) * 3 + len(FEATURE_ANGLES) * (2 if FEATURE_VELOCITIES and FEATURE_ANGLES else 1)
+    if FEATURE_MODE == 'engineered' else N_LANDMARK_VALUES
+)  # Model input size per frame
+DISPLAY_ANGLES = ('left_elbow', 'right_elbow', 'left_hip', 'right_hip')  # Drawn on analyzed frames
+DRAW_ANGLES = True
+
 # Model parameters
-N_FEATURES = 99  # 33 landmarks * 3 coordinates
 LSTM_UNITS = 64
 DROPOUT_RATE = 0.2
 LEARNING_RATE = 0.001
 BATCH_SIZE = 32
-EPOCHS = 20
\ No newline at end of file
+EPOCHS = 20
+
+# Incremental training (see models/training_state.py)
+CHECKPOINT_PATH = 'models/saved/checkpoint.h5'  # Model and optimizer state, rewritten after every epoch
+BEST_WEIGHTS_PATH = 'models/saved/best.weights.h5'  # Weights of the run's lowest val_loss epoch, for early stopping
+TRAINING_STATE_PATH = 'models/saved/training_state.json'  # Videos the model has seen and the current run's progress
+EARLY_STOPPING_PATIENCE = 3  # Epochs without a val_loss improvement before training stops; None disables
+FINETUNE_EPOCHS = 5
+FINETUNE_LEARNING_RATE = 1e-4  # Adam learning rate when warm-starting on new videos
+
+# Form feedback
+FORM_THRESHOLDS = (0.3, 0.7)  # Scores below these are Poor / Fair; above the last is Good
+STREAMING_INFERENCE = None  # None (windowed), 'exact' or 'approximate' stateful per-frame LSTM
+
+# Rep detection
+REP_SIGNAL = 'elbow_angle'  # 'elbow_angle' or 'shoulder_height'
+REP_SMOOTHING_SECONDS = 0.2  # Moving-average window applied to the rep signal
+REP_MIN_DEPTH = 35.0  # Degrees the elbow angle must drop and recover for a rep
+REP_MIN_SHOULDER_TRAVEL = 0.3  # Same for shoulder_height, in torso lengths
+REP_MIN_SECONDS = 0.5
+REP_MAX_SECONDS = 8.0
+CLASSIFY_PER_REP = False  # Score each detected rep once (resampled to SEQUENCE_LENGTH) instead of every window
+
+# Live analysis
+LIVE_CLASSIFY_EVERY = 3  # Run the LSTM on every k-th frame; pose still runs on every frame
+
+# File analysis
+HEADLESS = False  # Skip cv2.imshow preview windows (servers, containers)
+PIPELINE_QUEUE_SIZE = 8  # Frames buffered between decode, inference and encode stages
+
+# Offline video scoring
+WINDOW_STRIDE = 1  # Frames between consecutive scored windows
+PREDICT_BATCH_SIZE = 256  # Windows scored per model call
+
+# Instrumentation
+METRICS_ENABLED = False  # Per-stage timers; when False every timer is a shared no-op
+METRICS_OVERLAY = False  # Draw recent per-stage timings on analyzed frames
+METRICS_JSONL_PATH = None  # Append a metrics snapshot to this file every METRICS_INTERVAL seconds
+METRICS_INTERVAL = 10.0
+METRICS_PORT = None  # Serve Prometheus text format at http://127.0.0.1:<port>/metrics
+
+# Multi-stream server
+SERVER_MAX_BATCH = 64  # Most windows per classifier call across all streams
+SERVER_MAX_DELAY_MS = 20  # Longest a ready window waits for others to join its batch
+SERVER_STATUS_INTERVAL = 5.0  # Seconds between per-stream status lines
+
+# HTTP API
+API_HOST = '127.0.0.1'
+API_PORT = 8080
+API_WORKERS = 2  # Processes running pose extraction and the classifier, each with a warm model
+API_MAX_PENDING = 16  # Scoring requests running or queued before new ones get 503
+API_MAX_UPLOAD_MB = 100
+API_READ_TIMEOUT = 30.0  # Seconds allowed to receive one request
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from data.data_collector import VideoCollector
+from data.parallel_extractor import ParallelExtractor
+
+class StageStats:
+    def __init__(self, name: str, unit: str):
+        """Throughput counters for one pipeline stage
+
+        Args:
+            name: Stage name used in the summary
+            unit: What ``amount`` counts, e.g. "MB" or "frames"
+        """
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.amount = 0.0
+        self.intervals = []  # (start, end) wall-clock seconds of each unit of work
+        self._lock = threading.Lock()
+
+    def record(self, intervals, amount: float = 0.0, items: int = 1):
+        """Record finished work
+
+        Args:
+            intervals: (start, end) wall-clock times the work ran, e.g. one per chunk
+            amount: Work done in ``unit``s
+            items: Number of items (videos) completed
+        """
+        with self._lock:
+            self.items += items
+            self.amount += amount
+            self.intervals.extend(intervals)
+
+    def busy_seconds(self) -> float:
+        """Summed duration of all work; exceeds wall time when work ran in parallel"""
+        return sum(end - start for start, end in self.intervals)
+
+    def active_seconds(self) -> float:
+        """Wall time during which at least one unit of work was running"""
+        active = 0.0
+        covered_until = float('-inf')
+        for start, end in sorted(self.intervals):
+            if end > covered_until:
+                active += end - max(start, covered_until)
+                covered_until = end
+        return active
+
+class AcquisitionPipeline:
+    def __init__(self, collector: VideoCollector, extractor: ParallelExtractor):
+        """Download videos and extract their landmarks as overlapping stages
+
+        Each video is handed to landmark extraction as soon as its own download
+        finishes, while the remaining downloads continue. Swap the collector's
+        downloader (e.g. ``LocalFixtureDownloader``) to run offline.
+        """
+        self.collector = collector
+        self.extractor = extractor
+        self.download_stats = StageStats("download", "MB")
+        self.extract_stats = StageStats("extract", "frames")
+
+    def _download(self, url: str) -> Optional[str]:
+        start = time.time()
+        path = self.collector.download_video(url)
+        if path is not None:
+            self.download_stats.record([(start, time.time())], os.path.getsize(path) / 1e6)
+        return path
+
+    def run(self, urls: List[str], segments: Optional[List[List[Dict]]] = None
+            ) -> Tuple[List[Optional[str]], List[Optional[tuple]]]:
+        """Download and extract every URL
+
+        Args:
+            segments: Labelled segments per URL, passed on to ``ParallelExtractor.submit``
+
+        Returns:
+            paths: Video path per URL (None where the download failed)
+            tracks: (points, visibility, detected, fps) per URL (None where the download failed)
+        """
+        started = time.time()
+        paths = [None] * len(urls)
+        pending = {}
+        segments = segments or [None] * len(urls)
+
+        with self.extractor, ThreadPoolExecutor(self.collector.max_workers) as downloads:
+            futures = {downloads.submit(self._download, url): i for i, url in enumerate(urls)}
+            for future in as_completed(futures):
+                i = futures[future]
+                paths[i] = future.result()
+                if paths[i] is not None:
+                    pending[i] = self.extractor.submit(paths[i], segments[i])  # Start extracting right away
+
+            tracks = [None] * len(urls)
+            for i, track in pending.items():
+                tracks[i] = track.result()
+                if track.futures:  # Cache hits and .lmk files cost no extraction
+                    self.extract_stats.record(track.intervals, track.frames_extracted)
+
+        self.print_summary(time.time() - started)
+        return paths, tracks
+
+    def print_summary(self, wall_seconds: float):
+        """Print per-stage throughput and which stage bounded the run"""
+        stages = [self.download_stats, self.extract_stats]
+        print(f"\n{'Stage':<10}{'items':>7}{'amount':>14}{'busy s':>10}{'active s':>10}{'per active s':>16}")
+        for stage in stages:
+            active = stage.active_seconds()
+            rate = stage.amount / active if active else 0.0
+            print(f"{stage.name:<10}{stage.items:>7}{stage.amount:>10.1f} {stage.unit:<4}"
+                  f"{stage.busy_seconds():>9.1f}{active:>10.1f}{rate:>10.1f} {stage.unit}/s")
+        bottleneck = max(stages, key=lambda stage: stage.active_seconds())
+        share = bottleneck.active_seconds() / wall_seconds if wall_seconds else 0.0
+        print(f"Wall time: {wall_seconds:.1f} s. Bottleneck: {bottleneck.name} "
+              f"(active {share:.0%} of wall time)")
@@ -1,52 +1,139 @@
-import yt_dlp
+import hashlib
+import json
 import os
-from typing import List, Dict
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from urllib.parse import urlparse, parse_qs
+from data.landmark_cache import sha256_file
 import config
 
+def video_id(url: str) -> str:
+    """Stable identifier for a video URL, used as its filename
+
+    YouTube watch, short and youtu.be URLs map to the YouTube video ID; any other
+    URL maps to a hash of the URL itself.
+    """
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith('youtu.be'):
+        return parsed.path.lstrip('/').split('/')[0]
+    if 'youtube.com' in host:
+        query = parse_qs(parsed.query)
+        if 'v' in query:
+            return query['v'][0]
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] in ('shorts', 'embed', 'live'):
+            return parts[1]
+    return 'url-' + hashlib.sha256(url.encode()).hexdigest()[:16]
+
+def youtube_downloader(url: str, output_path: str):
+    """Download one video with yt-dlp to exactly output_path"""
+    import yt_dlp  # Imported on first download; only URL-based training needs it
+    ydl_opts = {
+        'format': 'best[ext=mp4]',
+        'outtmpl': output_path,  # Use our custom path
+        'quiet': True,
+        'no_warnings': True
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
+
+class LocalFixtureDownloader:
+    def __init__(self, fixture_dir: str):
+        """Offline stand-in for the YouTube downloader
+
+        "Downloads" a URL by copying ``<video_id>.mp4`` from a local directory.
+        """
+        self.fixture_dir = fixture_dir
+
+    def __call__(self, url: str, output_path: str):
+        shutil.copyfile(os.path.join(self.fixture_dir, video_id(url) + '.mp4'), output_path)
+
 class VideoCollector:
-    def __init__(self, output_dir: str = config.DATA_DIR):
+    def __init__(self, output_dir: str = config.DATA_DIR, downloader=youtube_downloader,
+                 max_workers: int = config.DOWNLOAD_WORKERS):
         """Initialize video collector with output directory
-        
+
+        Videos are saved as ``<video_id>.mp4`` and recorded in a manifest with
+        their size and SHA-256 once complete. Downloads go to a temporary file
+        that is renamed into place, so an interrupted download never looks done.
+
         Args:
             output_dir: Directory to save downloaded videos
+            downloader: Callable (url, output_path) that fetches one video
+            max_workers: Maximum concurrent downloads
         """
         self.output_dir = output_dir
+        self.downloader = downloader
+        self.max_workers = max_workers
+        self.manifest_path = os.path.join(output_dir, config.DOWNLOAD_MANIFEST)
+        self._manifest_lock = threading.Lock()
         os.makedirs(output_dir, exist_ok=True)  # Create directory if it doesn't exist
-    
-    def download_videos(self, video_urls: List[str]) -> List[str]:
-        """Download videos from YouTube URLs
-        
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _record(self, vid: str, entry: Dict):
+        with self._manifest_lock:
+            self.manifest[vid] = entry
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+
+    def is_complete(self, vid: str) -> bool:
+        """True if the video is in the manifest and its file still has the recorded size"""
+        entry = self.manifest.get(vid)
+        if entry is None:
+            return False
+        path = os.path.join(self.output_dir, entry["file"])
+        return os.path.exists(path) and os.path.getsize(path) == entry["size"]
+
+    def download_video(self, url: str) -> Optional[str]:
+        """Download a single video unless it is already complete
+
+        Returns:
+            Path to the video file, or None if the download failed
+        """
+        vid = video_id(url)
+        output_path = os.path.join(self.output_dir, f'{vid}.mp4')
+
+        if self.is_complete(vid):
+            print(f"Video {vid} already exists, skipping download")
+            return output_path
+
+        tmp_path = os.path.join(self.output_dir, f'.{vid}.{uuid.uuid4().hex}.part.mp4')
+        try:
+            print(f"Downloading {url}")
+            self.downloader(url, tmp_path)
+            entry = {"url": url, "file": f'{vid}.mp4', "size": os.path.getsize(tmp_path),
+                     "sha256": sha256_file(tmp_path)}
+            os.replace(tmp_path, output_path)  # Only complete files get the final name
+            self._record(vid, entry)
+            print(f"Successfully downloaded: {output_path}")
+            return output_path
+        except Exception as e:
+            print(f"Error downloading {url}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def download_videos(self, video_urls: List[str]) -> List[Optional[str]]:
+        """Download videos concurrently
+
         Args:
             video_urls: List of YouTube video URLs to download
-            
+
         Returns:
-            List of paths to downloaded video files
+            Paths to the downloaded video files, in the same order as video_urls
+            (None for downloads that failed)
         """
-        video_paths = []
-        
-        for i, url in enumerate(video_urls):
-            # Create unique filename for each video
-            output_path = os.path.join(self.output_dir, f'video_{i:02d}.mp4')
-            
-            if os.path.exists(output_path):
-                print(f"Video {i+1} already exists, skipping download")
-                video_paths.append(output_path)
-                continue
-            
-            ydl_opts = {
-                'format': 'best[ext=mp4]',
-                'outtmpl': output_path,  # Use our custom path
-                'quiet': False,
-                'no_warnings': True
-            }
-            
-            try:
-                print(f"Downloading video {i+1}/{len(video_urls)}")
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
-                    video_paths.append(output_path)
-                print(f"Successfully downloaded: {output_path}")
-            except Exception as e:
-                print(f"Error downloading {url}: {e}")
-        
-        return video_paths
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self.download_video, video_urls))
@@ -1,64 +1,242 @@
-import cv2
-import mediapipe as mp
+import importlib.metadata
 import numpy as np
 from typing import List, Dict, Tuple
+from data.landmark_cache import LandmarkCache
+from data.features import frame_features
+from data.segment_index import SegmentIndex
+from data.track_format import TrackFile, is_track_file
+from data.windows import sliding_windows
 import config
 
+def frame_labels(n_frames: int, fps: float, timestamps: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Label every frame from a list of time segments
+
+    A frame belongs to a segment when start <= frame_time <= end; where segments
+    overlap, the first one listed wins (see ``SegmentIndex``).
+
+    Returns:
+        labels: (n_frames,) int array of segment labels (0 where unlabelled)
+        labelled: (n_frames,) bool mask of frames inside a segment
+    """
+    return SegmentIndex(timestamps).lookup(np.arange(n_frames) / fps)
+
+def window_starts(detected: np.ndarray, labelled: np.ndarray,
+                  sequence_length: int = config.SEQUENCE_LENGTH) -> Tuple[np.ndarray, np.ndarray]:
+    """Locate training windows in a landmark track without building them
+
+    Windows are formed from consecutive labelled frames with a detected pose;
+    frames without a pose are skipped and an unlabelled frame starts a new run.
+
+    Returns:
+        kept: Frame indices of the labelled frames with a detected pose
+        starts: Index into ``kept`` of each window's first frame
+    """
+    kept = np.flatnonzero(detected & labelled)
+    n_windows = len(kept) - sequence_length + 1
+    if n_windows <= 0:
+        return kept, np.empty(0, dtype=np.int64)
+    
+    # Run ids only increase, so a window stays inside one run when its ends match
+    run_ids = np.cumsum(~labelled)[kept]
+    return kept, np.flatnonzero(run_ids[:n_windows] == run_ids[sequence_length - 1:])
+
+def sequences_from_track(track: np.ndarray, detected: np.ndarray, labels: np.ndarray,
+                         labelled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Cut labelled training windows out of a full landmark track
+
+    Each window takes the label of its last frame (see ``window_starts``).
+    Windows hold model input features (see ``data.features``), not raw landmarks.
+
+    Args:
+        track: (T, N_LANDMARK_VALUES) landmarks for every frame
+        detected: (T,) bool mask of frames with a detected pose
+        labels, labelled: Per-frame labels as returned by ``frame_labels``
+    """
+    kept, starts = window_starts(detected, labelled)
+    if len(starts) == 0:
+        return np.empty((0, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32), np.empty(0, dtype=np.int64)
+    features = frame_features(track, detected)
+    sequences = sliding_windows(features[kept], config.SEQUENCE_LENGTH)[starts]
+    return sequences, labels[kept[starts + config.SEQUENCE_LENGTH - 1]]
+
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, use_cache: bool = config.LANDMARK_CACHE_ENABLED, estimator: 'PoseEstimator' = None):
+        """Pose extraction for frames, videos and labelled training windows
+
+        Args:
+            use_cache: Read and write the landmark cache
+            estimator: Pose estimator to use; defaults to one built from the
+                POSE_* settings in config, which is what the cache is keyed on
+        """
+        # MediaPipe and OpenCV load here rather than on import, so labelling and
+        # windowing helpers in this module stay cheap to import
+        import mediapipe as mp
+        from data.pose_estimator import PoseEstimator
+
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
-        )
+        self.estimator = estimator or PoseEstimator()
+        self.pose = self.estimator.pose
+        self.cache = LandmarkCache() if use_cache else None
+    
+    @staticmethod
+    def extractor_params() -> Dict:
+        """Settings that change the extracted landmarks, used to key the landmark cache
+
+        Chunking (see ``ParallelExtractor``) is deliberately not part of the key,
+        so single-pass and chunked extraction share one cache entry per video.
+        Tracking restarts at each chunk after ``EXTRACTION_WARMUP_FRAMES`` of
+        warm-up, so a chunked track can differ slightly in the first frames after
+        a chunk boundary.
+        """
+        return {
+            "mediapipe": importlib.metadata.version("mediapipe"),  # Without importing it
+            "min_detection_confidence": config.MIN_DETECTION_CONFIDENCE,
+            "min_tracking_confidence": config.MIN_TRACKING_CONFIDENCE,
+            "model_complexity": config.POSE_MODEL_COMPLEXITY,
+            "inference_max_side": config.POSE_INFERENCE_MAX_SIDE,
+            "roi_crop": config.POSE_ROI_CROP,
+            "roi_margin": config.POSE_ROI_MARGIN,
+            "motion_threshold": config.POSE_MOTION_THRESHOLD,
+            "max_skipped_frames": config.POSE_MAX_SKIPPED_FRAMES,
+        }
     
-    def extract_landmarks(self, frame) -> Tuple[List[float], mp.solutions.pose.PoseLandmark]:
+    def extract_landmarks(self, frame) -> Tuple[List[float], 'landmark_pb2.NormalizedLandmarkList']:
         """Extract pose landmarks from a frame"""
-        results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        if not results.pose_landmarks:
+        points, visibility, pose_landmarks, _ = self.estimator.estimate(frame)
+        if points is None:
             return None, None
-            
-        landmarks = []
-        for landmark in results.pose_landmarks.landmark:
-            landmarks.extend([landmark.x, landmark.y, landmark.z])
-        return landmarks, results.pose_landmarks
+        if pose_landmarks is None:
+            from data.pose_estimator import landmark_list
+            pose_landmarks = landmark_list(points, visibility)  # Skipped frame, reusing the last pose
+        return points.ravel().tolist(), pose_landmarks
     
-    def process_video(self, video_path: str, timestamps: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
-        """Process video and extract sequences based on timestamps"""
-        sequences = []
-        labels = []
+    def extract_landmark_array(self, frame) -> Tuple[np.ndarray, np.ndarray]:
+        """Extract pose landmarks from a frame as arrays
+
+        Returns:
+            points: (N_LANDMARKS, 3) float32 x, y, z coordinates, or None if no pose was found
+            visibility: (N_LANDMARKS,) float32 visibility scores, or None
+        """
+        points, visibility, _, _ = self.estimator.estimate(frame)
+        return points, visibility
+    
+    def extract_track(self, video_path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Extract landmarks for every frame of a video, reading the landmark cache when enabled
+
+        ``video_path`` may also be a .lmk track file (see ``data.track_format``),
+        which is read instead of running pose extraction.
+
+        Returns:
+            points: (T, N_LANDMARKS, 3) float32 landmarks, zeros where no pose was found
+            visibility: (T, N_LANDMARKS) float32 visibility scores
+            detected: (T,) bool mask of frames with a detected pose
+            fps: Frame rate reported by the video container
+        """
+        if is_track_file(video_path):
+            return TrackFile(video_path).read()
+        if self.cache is not None:
+            cached = self.cache.load(video_path, self.extractor_params())
+            if cached is not None:
+                return cached
         
+        points, visibility, detected, fps = self.extract_frame_range(video_path)
+        if self.cache is not None:
+            self.cache.store(video_path, self.extractor_params(), points, visibility, detected, fps)
+        return points, visibility, detected, fps
+    
+    def extract_frame_range(self, video_path: str, start: int = 0, end: int = None,
+                            warmup: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Extract landmarks for frames [start, end) of a video without using the cache
+
+        Args:
+            video_path: Path to the video file
+            start: First frame to return
+            end: Frame to stop before, or None to read to the end of the video
+            warmup: Frames before ``start`` that are run through pose tracking and
+                discarded, so tracking state has converged by ``start``
+
+        Returns:
+            Same as ``extract_track``, covering only the requested frames
+        """
+        import cv2
+        from data.pose_estimator import interpolate_skipped
+
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = 0
-        current_sequence = []
+        first = max(start - warmup, 0)
+        if first > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+        self.estimator.reset()  # Start tracking fresh so results don't depend on earlier calls
+        
+        points = []
+        visibility = []
+        detected = []
+        inferred = []
+        frame_index = first
         
-        while cap.isOpened():
+        while cap.isOpened() and (end is None or frame_index < end):
             ret, frame = cap.read()
             if not ret:
                 break
-                
-            current_time = frame_count / fps
-            current_label = None
+            frame_index += 1
+            if frame_index <= start:
+                self.estimator.estimate(frame)  # Warm-up only
+                continue
             
-            for timestamp in timestamps:
-                if timestamp["start"] <= current_time <= timestamp["end"]:
-                    current_label = timestamp["label"]
-                    break
-            
-            if current_label is not None:
-                landmarks, _ = self.extract_landmarks(frame)
-                if landmarks:
-                    current_sequence.append(landmarks)
-                    
-                    if len(current_sequence) == config.SEQUENCE_LENGTH:
-                        sequences.append(current_sequence)
-                        labels.append(current_label)
-                        current_sequence = current_sequence[1:]
-            else:
-                current_sequence = []
-            
-            frame_count += 1
+            frame_points, frame_visibility, _, frame_inferred = self.estimator.estimate(frame)
+            detected.append(frame_points is not None)
+            inferred.append(frame_inferred)
+            if frame_points is None:
+                frame_points = np.zeros((config.N_LANDMARKS, 3), dtype=np.float32)
+                frame_visibility = np.zeros(config.N_LANDMARKS, dtype=np.float32)
+            points.append(frame_points)
+            visibility.append(frame_visibility)
         
         cap.release()
-        return np.array(sequences), np.array(labels)
\ No newline at end of file
+        if not points:
+            return (np.zeros((0, config.N_LANDMARKS, 3), dtype=np.float32),
+                    np.zeros((0, config.N_LANDMARKS), dtype=np.float32),
+                    np.zeros(0, dtype=bool), fps)
+        points, visibility, detected = np.stack(points), np.stack(visibility), np.array(detected)
+        # Offline, frames that skipped inference can use the next inferred frame too
+        interpolate_skipped(points, visibility, detected, np.array(inferred))
+        return points, visibility, detected, fps
+    
+    def process_video(self, video_path: str, timestamps: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Extract the labelled training windows of one video
+
+        With the landmark cache on, windows are cut from the cached full-video
+        track. Otherwise only the labelled frame ranges are read: seeked to in a
+        video, or sliced from the memory-mapped file for a .lmk track.
+
+        Returns:
+            sequences: (n_windows, SEQUENCE_LENGTH, N_FEATURES) model inputs
+            labels: Label of each window's last frame
+        """
+        if self.cache is not None and not is_track_file(video_path):
+            points, _, detected, fps = self.extract_track(video_path)
+            labels, labelled = frame_labels(len(points), fps, timestamps)
+            return sequences_from_track(points.reshape(len(points), -1), detected, labels, labelled)
+        
+        if is_track_file(video_path):
+            track = TrackFile(video_path)
+            fps, n_frames, read_range = track.fps, len(track), track.read
+        else:
+            import cv2
+            cap = cv2.VideoCapture(video_path)
+            fps, n_frames = cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+            read_range = lambda start, end: self.extract_frame_range(video_path, start, end)
+        
+        index = SegmentIndex(timestamps)
+        sequences = [np.empty((0, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32)]
+        labels = [np.empty(0, dtype=np.int64)]
+        for first, last in index.frame_ranges(fps, n_frames):
+            points, _, detected, _ = read_range(first, last + 1)
+            range_labels, labelled = index.lookup(np.arange(first, first + len(points)) / fps)
+            range_sequences, range_window_labels = sequences_from_track(
+                points.reshape(len(points), -1), detected, range_labels, labelled
+            )
+            sequences.append(range_sequences)
+            labels.append(range_window_labels)
+        return np.concatenate(sequences), np.concatenate(labels)
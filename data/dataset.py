@@ -0,0 +1,123 @@
+from typing import Iterator, Tuple
+import numpy as np
+from data.data_processor import window_starts
+from data.windows import sliding_windows
+import config
+
+class LandmarkDataset:
+    def __init__(self, sequence_length: int = config.SEQUENCE_LENGTH, n_features: int = config.N_FEATURES):
+        """Training windows stored as per-frame features plus window index arrays
+
+        Each frame's features (see ``data.features.frame_features``) are stored once; a window is just the index of its
+        first frame. Windows are materialised one batch at a time from a strided
+        view, so memory scales with frames rather than frames x sequence length.
+
+        Args:
+            sequence_length: Frames per window
+            n_features: Length of one frame's feature vector
+        """
+        self.sequence_length = sequence_length
+        self.n_features = n_features
+        self._tracks = []
+        self._starts = []
+        self._labels = []
+        self._n_frames = 0
+        self._frames = None
+
+    @classmethod
+    def from_arrays(cls, frames: np.ndarray, starts: np.ndarray, labels: np.ndarray,
+                    sequence_length: int = config.SEQUENCE_LENGTH) -> 'LandmarkDataset':
+        """Dataset over already-kept frames, e.g. in shared memory, without copying them
+
+        Args:
+            frames: (n_frames, n_features) float32 features
+            starts: Index into ``frames`` of each window's first frame
+            labels: Label of each window
+        """
+        dataset = cls(sequence_length, frames.shape[1])
+        dataset._tracks, dataset._starts, dataset._labels = [frames], [starts], [labels]
+        dataset._n_frames = len(frames)
+        dataset._frames, dataset.starts, dataset.labels = frames, starts, labels
+        dataset._windows = sliding_windows(frames, sequence_length)
+        return dataset
+
+    def add_track(self, track: np.ndarray, detected: np.ndarray, labels: np.ndarray, labelled: np.ndarray) -> int:
+        """Add a video's labelled windows
+
+        Only the labelled frames with a detected pose are kept.
+
+        Args:
+            track: (T, n_features) features for every frame
+            detected: (T,) bool mask of frames with a detected pose
+            labels, labelled: Per-frame labels as returned by ``frame_labels``
+
+        Returns:
+            Number of windows added
+        """
+        kept, starts = window_starts(detected, labelled, self.sequence_length)
+        self._tracks.append(np.asarray(track[kept], dtype=np.float32))
+        self._starts.append(starts + self._n_frames)
+        self._labels.append(labels[kept[starts + self.sequence_length - 1]])
+        self._n_frames += len(kept)
+        self._frames = None  # Rebuilt on next access
+        return len(starts)
+
+    def _build(self):
+        if self._frames is None:
+            self._frames = (np.concatenate(self._tracks) if self._tracks
+                            else np.empty((0, self.n_features), dtype=np.float32))
+            self._tracks = [self._frames]  # Keep a single copy of the frames
+            self.starts = np.concatenate(self._starts) if self._starts else np.empty(0, dtype=np.int64)
+            self._starts = [self.starts]
+            self.labels = np.concatenate(self._labels) if self._labels else np.empty(0, dtype=np.int64)
+            self._labels = [self.labels]
+            self._windows = sliding_windows(self._frames, self.sequence_length)
+
+    def __len__(self):
+        return sum(len(starts) for starts in self._starts)
+
+    @property
+    def frames(self) -> np.ndarray:
+        """(n_frames, n_features) landmarks of every kept frame"""
+        self._build()
+        return self._frames
+
+    def windows(self, indices=None) -> np.ndarray:
+        """Materialise windows as a (len(indices), sequence_length, n_features) array
+
+        Only use this for subsets that fit in memory; ``batches`` streams instead.
+        """
+        self._build()
+        indices = np.arange(len(self.starts)) if indices is None else np.asarray(indices)
+        return self._windows[self.starts[indices]]
+
+    def batches(self, indices=None, batch_size: int = config.BATCH_SIZE, shuffle: bool = False,
+                seed: int = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (windows, labels) batches, copying only one batch at a time"""
+        self._build()
+        indices = np.arange(len(self.starts)) if indices is None else np.asarray(indices)
+        if shuffle:
+            indices = np.random.default_rng(seed).permutation(indices)
+        for i in range(0, len(indices), batch_size):
+            batch = indices[i:i + batch_size]
+            yield self._windows[self.starts[batch]], self.labels[batch].astype(np.float32)
+
+    def as_tf_dataset(self, indices=None, batch_size: int = config.BATCH_SIZE, shuffle: bool = False):
+        """Wrap ``batches`` in a tf.data pipeline for Keras ``fit``
+
+        Shuffling draws a new order every epoch.
+        """
+        import tensorflow as tf
+        epoch = [0]
+
+        def generate():
+            epoch[0] += 1
+            yield from self.batches(indices, batch_size, shuffle, seed=epoch[0] if shuffle else None)
+
+        return tf.data.Dataset.from_generator(
+            generate,
+            output_signature=(
+                tf.TensorSpec((None, self.sequence_length, self.n_features), tf.float32),
+                tf.TensorSpec((None,), tf.float32),
+            )
+        ).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,139 @@
+from typing import Dict
+import numpy as np
+import config
+
+# MediaPipe Pose landmark indices
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Joint angle name -> (a, b, c) landmarks; the angle is measured at b
+JOINTS = {
+    "left_elbow": (11, 13, 15),
+    "right_elbow": (12, 14, 16),
+    "left_shoulder": (13, 11, 23),
+    "right_shoulder": (14, 12, 24),
+    "left_hip": (11, 23, 25),
+    "right_hip": (12, 24, 26),
+    "left_knee": (23, 25, 27),
+    "right_knee": (24, 26, 28),
+}
+
+def normalize_pose(points: np.ndarray, landmarks=config.FEATURE_LANDMARKS) -> np.ndarray:
+    """Torso-centred, scale-normalised coordinates of a landmark subset
+
+    Coordinates are shifted so the torso centre (mean of shoulders and hips) is
+    the origin and divided by torso length (mid-shoulder to mid-hip in the image
+    plane), which removes camera distance and framing.
+
+    Args:
+        points: (..., N_LANDMARKS, 3) landmarks
+        landmarks: Indices of the landmarks to keep
+
+    Returns:
+        (..., len(landmarks) * 3) float32 array
+    """
+    points = np.asarray(points, dtype=np.float32)
+    shoulders = (points[..., LEFT_SHOULDER, :] + points[..., RIGHT_SHOULDER, :]) / 2
+    hips = (points[..., LEFT_HIP, :] + points[..., RIGHT_HIP, :]) / 2
+    centre = (shoulders + hips) / 2
+    scale = np.linalg.norm((shoulders - hips)[..., :2], axis=-1)
+    scale = np.maximum(scale, 1e-3)  # Degenerate poses would otherwise divide by ~0
+    normalized = (points[..., list(landmarks), :] - centre[..., np.newaxis, :]) / scale[..., np.newaxis, np.newaxis]
+    return normalized.reshape(points.shape[:-2] + (len(landmarks) * 3,))
+
+def joint_angles(points: np.ndarray, joints=config.FEATURE_ANGLES) -> np.ndarray:
+    """Angles in degrees at each named joint, measured in the image plane
+
+    MediaPipe's z estimate is much noisier than x and y, so angles use x and y only.
+
+    Args:
+        points: (..., N_LANDMARKS, 3) landmarks
+        joints: Names from ``JOINTS``
+
+    Returns:
+        (..., len(joints)) float32 angles in [0, 180]
+    """
+    points = np.asarray(points, dtype=np.float32)[..., :2]
+    a, b, c = (np.array(indices) for indices in zip(*(JOINTS[joint] for joint in joints)))
+    first = points[..., a, :] - points[..., b, :]
+    second = points[..., c, :] - points[..., b, :]
+    cross = first[..., 0] * second[..., 1] - first[..., 1] * second[..., 0]
+    dot = np.sum(first * second, axis=-1)
+    return np.degrees(np.abs(np.arctan2(cross, dot))).astype(np.float32)
+
+def angle_dict(points: np.ndarray, joints=config.DISPLAY_ANGLES) -> Dict[str, float]:
+    """One frame's joint angles by display name, for ``PoseVisualizer.draw_angles``"""
+    angles = joint_angles(np.asarray(points).reshape(config.N_LANDMARKS, 3), joints)
+    return {joint.replace('_', ' ').capitalize(): float(angle) for joint, angle in zip(joints, angles)}
+
+def _static_features(points: np.ndarray) -> np.ndarray:
+    """Per-frame features that don't depend on neighbouring frames"""
+    if config.FEATURE_MODE == 'raw':
+        return np.asarray(points, dtype=np.float32).reshape(points.shape[:-2] + (config.N_LANDMARK_VALUES,))
+    parts = [normalize_pose(points)]
+    if config.FEATURE_ANGLES:
+        parts.append(joint_angles(points) / 180.0)  # Scale to [0, 1] like the coordinates
+    return np.concatenate(parts, axis=-1)
+
+def _with_velocities(static: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Append angle deltas; ``previous`` holds each row's preceding static features"""
+    n_angles = len(config.FEATURE_ANGLES)
+    velocities = static[..., -n_angles:] - previous[..., -n_angles:]
+    return np.concatenate([static, velocities], axis=-1)
+
+def uses_velocities() -> bool:
+    return config.FEATURE_MODE != 'raw' and config.FEATURE_VELOCITIES and len(config.FEATURE_ANGLES) > 0
+
+def track_features(points: np.ndarray) -> np.ndarray:
+    """Model input features for consecutive detected frames
+
+    Args:
+        points: (T, N_LANDMARKS, 3) or (T, N_LANDMARK_VALUES) landmarks of the
+            frames the model sees in order (frames without a pose removed)
+
+    Returns:
+        (T, N_FEATURES) float32; angular velocities are the change since the
+        previous row (zero for the first)
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(len(points), config.N_LANDMARKS, 3)
+    static = _static_features(points)
+    if not uses_velocities():
+        return static
+    previous = np.concatenate([static[:1], static[:-1]])
+    return _with_velocities(static, previous).astype(np.float32)
+
+def frame_features(points: np.ndarray, detected: np.ndarray) -> np.ndarray:
+    """Features for every frame of a video, computed over the detected frames only
+
+    Velocities are taken between consecutive detected frames, matching what the
+    live buffer sees; rows of frames without a pose are zero.
+
+    Args:
+        points: (T, N_LANDMARKS, 3) or (T, N_LANDMARK_VALUES) landmarks
+        detected: (T,) bool mask of frames with a detected pose
+
+    Returns:
+        (T, N_FEATURES) float32
+    """
+    features = np.zeros((len(points), config.N_FEATURES), dtype=np.float32)
+    detected_frames = np.flatnonzero(detected)
+    if len(detected_frames):
+        features[detected_frames] = track_features(np.asarray(points)[detected_frames])
+    return features
+
+class FeatureStream:
+    def __init__(self):
+        """Incremental ``track_features`` for frames arriving one at a time"""
+        self._previous = None
+
+    def reset(self):
+        self._previous = None
+
+    def step(self, landmarks) -> np.ndarray:
+        """Features of one frame with a detected pose, given its N_LANDMARK_VALUES landmarks"""
+        static = _static_features(np.asarray(landmarks, dtype=np.float32).reshape(config.N_LANDMARKS, 3))
+        if not uses_velocities():
+            return static
+        previous = static if self._previous is None else self._previous
+        self._previous = static
+        return _with_velocities(static, previous)
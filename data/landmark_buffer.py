@@ -0,0 +1,47 @@
+import numpy as np
+import config
+
+class LandmarkBuffer:
+    def __init__(self, capacity: int = config.SEQUENCE_LENGTH, n_features: int = config.N_FEATURES):
+        """Fixed-size ring buffer of per-frame landmark vectors
+
+        Every frame is written twice, at ``i`` and ``i + capacity``, so the most
+        recent ``capacity`` frames are always one contiguous slice of the backing
+        array and can be handed to the model without copying.
+
+        Args:
+            capacity: Number of frames kept (the model's sequence length)
+            n_features: Length of one frame's landmark vector
+        """
+        self.capacity = capacity
+        self.n_features = n_features
+        self._data = np.zeros((2 * capacity, n_features), dtype=np.float32)
+        self._head = 0  # Slot the next frame is written to (oldest frame once full)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def is_full(self) -> bool:
+        return self._count == self.capacity
+
+    def append(self, landmarks):
+        """Add one frame's landmarks, overwriting the oldest frame when full"""
+        self._data[self._head] = landmarks
+        self._data[self._head + self.capacity] = landmarks
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def clear(self):
+        """Drop all buffered frames (the backing array is reused)"""
+        self._head = 0
+        self._count = 0
+
+    def window(self) -> np.ndarray:
+        """Return a (1, capacity, n_features) view of the buffer, oldest frame first
+
+        The view aliases the buffer, so it is only valid until the next append.
+        """
+        if not self.is_full():
+            return None
+        return self._data[self._head:self._head + self.capacity][np.newaxis]
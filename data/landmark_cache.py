@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+from data.track_format import TRACK_SUFFIX, TrackFile, write_track
+import config
+
+CACHE_FORMAT_VERSION = 2
+
+def sha256_file(path: str) -> str:
+    """SHA-256 hex digest of a file's contents, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class LandmarkCache:
+    def __init__(self, cache_dir: str = config.LANDMARK_CACHE_DIR,
+                 max_bytes: int = config.LANDMARK_CACHE_MAX_BYTES):
+        """On-disk cache of per-frame landmark tracks, one .lmk track file per video
+
+        Entries are keyed by the video's content hash together with the settings
+        that produced the landmarks (MediaPipe version, confidence thresholds), so
+        renaming a file still hits the cache and changing the extractor misses it.
+
+        Args:
+            cache_dir: Directory holding the cached tracks
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._hashes = {}  # (path, size, mtime) -> content hash, avoids re-hashing
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def file_hash(self, video_path: str) -> str:
+        """SHA-256 of the video file's contents"""
+        stat = os.stat(video_path)
+        memo_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            self._hashes[memo_key] = sha256_file(video_path)
+        return self._hashes[memo_key]
+
+    def key(self, video_path: str, extractor_params: Dict) -> str:
+        """Cache key for a video extracted with the given settings"""
+        params = json.dumps(extractor_params, sort_keys=True)
+        digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}|{params}".encode()).hexdigest()
+        return f"{self.file_hash(video_path)[:32]}_{digest[:16]}"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + TRACK_SUFFIX)
+
+    def load(self, video_path: str, extractor_params: Dict) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, float]]:
+        """Return the cached (points, visibility, detected, fps) for a video, or None"""
+        path = self._entry_path(self.key(video_path, extractor_params))
+        if not os.path.exists(path):
+            return None
+
+        try:
+            result = TrackFile(path).read()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            os.remove(path)
+            return None
+
+        os.utime(path)  # Mark as recently used for eviction
+        return result
+
+    def store(self, video_path: str, extractor_params: Dict, points: np.ndarray,
+              visibility: np.ndarray, detected: np.ndarray, fps: float):
+        """Write a video's landmark track to the cache and enforce the size limit
+
+        Args:
+            points: (T, N_LANDMARKS, 3) landmark coordinates
+            visibility: (T, N_LANDMARKS) visibility scores
+            detected: (T,) bool mask of frames with a detected pose
+            fps: Frame rate of the video
+        """
+        path = self._entry_path(self.key(video_path, extractor_params))
+        source = {"path": os.path.abspath(video_path), "sha256": self.file_hash(video_path),
+                  "extractor": extractor_params}
+        # float32 so a cache hit returns exactly what a fresh extraction would
+        write_track(path, points, visibility, detected, fps, source, dtype='float32')
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((TRACK_SUFFIX, '.npz')):  # .npz entries are from cache format 1
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
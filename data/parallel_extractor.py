@@ -0,0 +1,211 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from data.data_processor import DataProcessor
+from data.landmark_cache import LandmarkCache
+from data.segment_index import SegmentIndex
+from data.track_format import TrackFile, is_track_file
+import config
+
+_worker_processor = None  # Each worker process builds its own Pose graph
+
+def _init_worker():
+    global _worker_processor
+    import cv2
+    cv2.setNumThreads(1)  # Parallelism comes from the pool, not OpenCV's thread pool
+    _worker_processor = DataProcessor(use_cache=False)
+
+def _extract_chunk(task):
+    started = time.time()  # Wall clock, comparable across processes
+    result = _worker_processor.extract_frame_range(*task)
+    return result, (started, time.time())
+
+class PendingTrack:
+    def __init__(self, extractor, video_path, futures, cached=None, layout=None):
+        """Landmark track of one video whose chunks may still be extracting
+
+        Args:
+            layout: For a video extracted only in labelled frame ranges, the
+                (first frame of each chunk, frame count, fps) used to place the
+                chunks in a full-length track; None when chunks cover every frame
+        """
+        self.extractor = extractor
+        self.video_path = video_path
+        self.futures = futures
+        self.intervals = []  # (start, end) wall-clock time of each extracted chunk
+        self.frames_extracted = 0  # Frames run through pose extraction, warm-up excluded; 0 when cached
+        self._track = cached
+        self.layout = layout
+
+    def done(self) -> bool:
+        return self._track is not None or all(future.done() for future in self.futures)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Wait for every chunk and return (points, visibility, detected, fps)"""
+        if self._track is None and self.layout is not None:
+            self._track = self._place_ranges()
+        elif self._track is None:
+            # Futures are kept in chunk order, so this merges in frame order
+            chunks, self.intervals = zip(*(future.result() for future in self.futures))
+            points, visibility, detected, fps = zip(*chunks)
+            self.frames_extracted = sum(len(chunk) for chunk in points)
+            self._track = (np.concatenate(points), np.concatenate(visibility), np.concatenate(detected), fps[0])
+            if self.extractor.cache is not None:
+                self.extractor.cache.store(self.video_path, DataProcessor.extractor_params(), *self._track)
+        return self._track
+
+    def _place_ranges(self):
+        """Full-length track with only the extracted ranges filled in (never cached)"""
+        starts, n_frames, fps = self.layout
+        results = [future.result() for future in self.futures]
+        chunks = [chunk for chunk, _ in results]
+        self.intervals = [interval for _, interval in results]
+        self.frames_extracted = sum(len(chunk[0]) for chunk in chunks)
+        n_frames = max([n_frames] + [start + len(chunk[0]) for start, chunk in zip(starts, chunks)])
+        points = np.zeros((n_frames, config.N_LANDMARKS, 3), dtype=np.float32)
+        visibility = np.zeros((n_frames, config.N_LANDMARKS), dtype=np.float32)
+        detected = np.zeros(n_frames, dtype=bool)
+        for start, (chunk_points, chunk_visibility, chunk_detected, _) in zip(starts, chunks):
+            end = start + len(chunk_points)
+            points[start:end], visibility[start:end], detected[start:end] = \
+                chunk_points, chunk_visibility, chunk_detected
+        return points, visibility, detected, fps
+
+class ParallelExtractor:
+    def __init__(self, workers: int = config.EXTRACTION_WORKERS,
+                 chunk_frames: int = config.EXTRACTION_CHUNK_FRAMES,
+                 warmup_frames: int = config.EXTRACTION_WARMUP_FRAMES,
+                 use_cache: bool = config.LANDMARK_CACHE_ENABLED):
+        """Extract landmark tracks for many videos across a pool of worker processes
+
+        Long videos are split into fixed frame ranges so one video can use several
+        cores. Each range is decoded from ``warmup_frames`` earlier so pose tracking
+        has converged by its first frame. Chunk boundaries depend only on the video
+        and ``chunk_frames``, and results are merged in frame order, so output is
+        reproducible regardless of worker count or scheduling.
+
+        Use as a context manager to keep one pool alive across ``submit`` calls.
+
+        Args:
+            workers: Worker processes (None uses every CPU core, 1 runs in-process)
+            chunk_frames: Maximum frames per task
+            warmup_frames: Frames decoded before each chunk to prime tracking
+            use_cache: Read and fill the landmark cache
+        """
+        self.workers = workers or os.cpu_count()
+        self.chunk_frames = chunk_frames
+        self.warmup_frames = warmup_frames
+        self.cache = LandmarkCache() if use_cache else None
+        self._pool = None
+        self._local_processor = None
+
+    def __enter__(self):
+        if self.workers > 1 and self._pool is None:
+            # spawn, not fork: MediaPipe graphs and their threads don't survive a fork
+            context = multiprocessing.get_context('spawn')
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    @staticmethod
+    def video_info(video_path: str) -> Tuple[int, float]:
+        """Frame count and fps reported by the video container"""
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return frame_count, fps
+
+    def plan_chunks(self, video_path: str, segments: Optional[List[Dict]] = None) -> List[Tuple[str, int, int, int]]:
+        """Split a video into (path, start, end, warmup) extraction tasks
+
+        With ``segments`` (start/end in seconds) only the labelled frame ranges
+        are planned: each is seeked to directly and split into chunks of its own,
+        so unlabelled footage is never decoded past the warm-up frames.
+        """
+        frame_count, fps = self.video_info(video_path)
+        if segments is not None:
+            return [
+                (video_path, start, min(start + self.chunk_frames, last + 1), self.warmup_frames)
+                for first, last in SegmentIndex(segments).frame_ranges(fps, frame_count)
+                for start in range(first, last + 1, self.chunk_frames)
+            ]
+
+        if frame_count <= self.chunk_frames:
+            return [(video_path, 0, None, 0)]  # Unknown or short length: read to the end
+
+        starts = list(range(0, frame_count, self.chunk_frames))
+        # The last chunk reads to the end in case the container's frame count is low
+        ends = starts[1:] + [None]
+        return [(video_path, start, end, self.warmup_frames) for start, end in zip(starts, ends)]
+
+    def submit(self, video_path: str, segments: Optional[List[Dict]] = None) -> PendingTrack:
+        """Start extracting one video and return without waiting for it
+
+        Without a running pool (workers=1, or outside a ``with`` block) the video
+        is extracted in this process before returning. A .lmk track file is read
+        directly instead of extracted.
+
+        Args:
+            segments: Labelled segments (start/end in seconds). When the cache is
+                disabled only their frames are extracted; the rest of the track
+                is left undetected. With the cache on the whole video is
+                extracted so the cached track serves any later labelling.
+        """
+        if is_track_file(video_path):
+            return PendingTrack(self, video_path, [], TrackFile(video_path).read())
+        if self.cache is not None:
+            cached = self.cache.load(video_path, DataProcessor.extractor_params())
+            if cached is not None:
+                return PendingTrack(self, video_path, [], cached)
+
+        layout = None
+        if segments is not None and self.cache is None:
+            tasks = self.plan_chunks(video_path, segments)
+            layout = ([task[1] for task in tasks],) + self.video_info(video_path)
+        else:
+            tasks = self.plan_chunks(video_path)
+        if self._pool is not None:
+            return PendingTrack(self, video_path, [self._pool.submit(_extract_chunk, task) for task in tasks],
+                                layout=layout)
+
+        if self._local_processor is None:
+            self._local_processor = DataProcessor(use_cache=False)
+        futures = []
+        for task in tasks:
+            started = time.time()
+            future = Future()
+            future.set_result((self._local_processor.extract_frame_range(*task), (started, time.time())))
+            futures.append(future)
+        return PendingTrack(self, video_path, futures, layout=layout)
+
+    def extract_tracks(self, video_paths: List[str],
+                       segments: Optional[List[List[Dict]]] = None) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, float]]:
+        """Extract (points, visibility, detected, fps) for each video, in input order
+
+        Args:
+            segments: Labelled segments per video, see ``submit``
+        """
+        owns_pool = self._pool is None
+        self.__enter__()
+        try:
+            segments = segments or [None] * len(video_paths)
+            pending = [self.submit(video_path, video_segments)
+                       for video_path, video_segments in zip(video_paths, segments)]
+            tracks = [track.result() for track in pending]
+        finally:
+            if owns_pool:
+                self.__exit__(None, None, None)
+
+        extracted = sum(1 for track in pending if track.futures)
+        print(f"Extracted landmarks: {extracted} videos, {sum(len(t.futures) for t in pending)} chunks, "
+              f"{self.workers} workers ({len(video_paths) - extracted} cached)")
+        return tracks
@@ -0,0 +1,186 @@
+from typing import Tuple
+import cv2
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+import numpy as np
+import config
+
+_THUMBNAIL_SIZE = (64, 36)  # Frame differencing runs on a grey thumbnail this size
+_MIN_ROI_SIDE = 0.2  # Smallest crop, as a fraction of the frame side
+
+def landmark_list(points: np.ndarray, visibility: np.ndarray = None) -> landmark_pb2.NormalizedLandmarkList:
+    """MediaPipe landmark message from arrays, for drawing"""
+    if visibility is None:
+        visibility = np.ones(len(points), dtype=np.float32)
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=x, y=y, z=z, visibility=v)
+        for (x, y, z), v in zip(points.tolist(), visibility.tolist())
+    ])
+
+def interpolate_skipped(points: np.ndarray, visibility: np.ndarray, detected: np.ndarray, inferred: np.ndarray):
+    """Replace held landmarks of skipped frames with a linear blend of the inferred frames around them
+
+    Skipped frames after the last inferred frame keep their held values. Arrays
+    are updated in place.
+
+    Args:
+        points: (T, N_LANDMARKS, 3) landmarks
+        visibility: (T, N_LANDMARKS) visibility scores
+        detected: (T,) bool mask of frames with a pose
+        inferred: (T,) bool mask of frames where pose inference actually ran
+    """
+    anchors = np.flatnonzero(detected & inferred)
+    skipped = np.flatnonzero(detected & ~inferred)
+    if len(anchors) < 2 or not len(skipped):
+        return
+    right = np.searchsorted(anchors, skipped)
+    between = (right > 0) & (right < len(anchors))
+    skipped, right = skipped[between], right[between]
+    after, before = anchors[right], anchors[right - 1]
+    # Only bridge runs of skipped frames, not gaps where the pose was lost
+    bridged = (after - before - 1) == (np.searchsorted(skipped, after) - np.searchsorted(skipped, before))
+    skipped, before, after = skipped[bridged], before[bridged], after[bridged]
+    weight = ((skipped - before) / (after - before)).astype(np.float32)
+    points[skipped] = points[before] * (1 - weight[:, None, None]) + points[after] * weight[:, None, None]
+    visibility[skipped] = visibility[before] * (1 - weight[:, None]) + visibility[after] * weight[:, None]
+
+class PoseEstimator:
+    def __init__(self, model_complexity: int = config.POSE_MODEL_COMPLEXITY,
+                 max_side: int = config.POSE_INFERENCE_MAX_SIDE, roi_crop: bool = config.POSE_ROI_CROP,
+                 roi_margin: float = config.POSE_ROI_MARGIN, motion_threshold: float = config.POSE_MOTION_THRESHOLD,
+                 max_skipped: int = config.POSE_MAX_SKIPPED_FRAMES):
+        """MediaPipe Pose with optional downscaling, region-of-interest crops and motion-gated skipping
+
+        With every option off this is plain MediaPipe Pose on the full frame.
+        Otherwise each frame is, in order:
+
+        - skipped when it differs from the last inferred frame by less than
+          ``motion_threshold`` mean grey levels, reusing the previous landmarks
+          (at most ``max_skipped`` frames in a row);
+        - cropped to a box around the previous landmarks, kept while the pose
+          stays inside it so MediaPipe's own tracking sees a steady image;
+        - downscaled so its longer side is at most ``max_side`` pixels.
+
+        Landmarks are always returned in full-frame normalised coordinates. A
+        crop that loses the pose is retried on the full frame.
+
+        Args:
+            model_complexity: MediaPipe model, 0 (lite), 1 (full) or 2 (heavy)
+            max_side: Inference resolution cap in pixels, or None for full resolution
+            roi_crop: Crop to the previous frame's pose
+            roi_margin: Crop padding as a fraction of the pose's bounding box
+            motion_threshold: Mean grey-level change below which inference is skipped; 0 disables
+            max_skipped: Most consecutive skipped frames
+        """
+        self.model_complexity = model_complexity
+        self.max_side = max_side
+        self.roi_crop = roi_crop
+        self.roi_margin = roi_margin
+        self.motion_threshold = motion_threshold
+        self.max_skipped = max_skipped
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+        )
+        self.inferred = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self):
+        """Forget tracking state, e.g. before starting a new video"""
+        self.pose.reset()
+        self._last = None  # (points, visibility) of the last frame with a pose
+        self._roi = None  # (x0, y0, x1, y1) normalised crop box
+        self._thumbnail = None
+        self._run = 0
+
+    def estimate(self, frame) -> Tuple[np.ndarray, np.ndarray, landmark_pb2.NormalizedLandmarkList, bool]:
+        """Landmarks of one BGR frame
+
+        Returns:
+            points: (N_LANDMARKS, 3) float32 full-frame coordinates, or None if no pose
+            visibility: (N_LANDMARKS,) float32, or None
+            pose_landmarks: MediaPipe landmark message, or None when no pose was
+                found or inference was skipped (see ``landmark_list``)
+            inferred: False when the previous landmarks were reused
+        """
+        if self.motion_threshold > 0:
+            thumbnail = cv2.cvtColor(cv2.resize(frame, _THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA),
+                                     cv2.COLOR_BGR2GRAY)
+            if (self._last is not None and self._run < self.max_skipped
+                    and cv2.absdiff(thumbnail, self._thumbnail).mean() < self.motion_threshold):
+                self._run += 1
+                self.skipped += 1
+                return self._last[0], self._last[1], None, False
+            self._thumbnail = thumbnail  # Compare against the last inferred frame so slow drift adds up
+        self._run = 0
+        self.inferred += 1
+
+        height, width = frame.shape[:2]
+        box = self._crop_box(width, height)
+        results = self._process(frame, box)
+        if not results.pose_landmarks and box is not None:
+            box = None
+            results = self._process(frame, box)
+        if not results.pose_landmarks:
+            self._last = None
+            self._roi = None
+            return None, None, None, True
+
+        values = np.array(
+            [(landmark.x, landmark.y, landmark.z, landmark.visibility)
+             for landmark in results.pose_landmarks.landmark],
+            dtype=np.float32
+        )
+        if box is not None:
+            # Crop-relative to full-frame coordinates; z shares x's scale
+            x0, y0, x1, y1 = box
+            values[:, 0] = (x0 + values[:, 0] * (x1 - x0)) / width
+            values[:, 1] = (y0 + values[:, 1] * (y1 - y0)) / height
+            values[:, 2] *= (x1 - x0) / width
+            for landmark, (x, y, z) in zip(results.pose_landmarks.landmark, values[:, :3].tolist()):
+                landmark.x, landmark.y, landmark.z = x, y, z
+        points, visibility = values[:, :3], values[:, 3]
+        self._last = (points, visibility)
+        if self.roi_crop:
+            self._update_roi(points, visibility)
+        return points, visibility, results.pose_landmarks, True
+
+    def _process(self, frame, box):
+        if box is not None:
+            x0, y0, x1, y1 = box
+            frame = frame[y0:y1, x0:x1]
+        if self.max_side:
+            scale = self.max_side / max(frame.shape[:2])
+            if scale < 1:
+                size = (max(int(frame.shape[1] * scale), 1), max(int(frame.shape[0] * scale), 1))
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        # Colour conversion runs after cropping and scaling, on the smallest image
+        return self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def _crop_box(self, width, height):
+        """Pixel crop (x0, y0, x1, y1) for this frame, or None for the full frame"""
+        if not self.roi_crop or self._roi is None:
+            return None
+        x0, y0, x1, y1 = self._roi
+        box = (int(x0 * width), int(y0 * height), int(np.ceil(x1 * width)), int(np.ceil(y1 * height)))
+        if box == (0, 0, width, height):
+            return None
+        return box
+
+    def _update_roi(self, points, visibility):
+        visible = visibility > 0.5
+        xy = points[visible, :2] if visible.sum() >= 4 else points[:, :2]
+        low, high = xy.min(axis=0), xy.max(axis=0)
+        margin = np.maximum((high - low) * self.roi_margin, _MIN_ROI_SIDE / 2)
+        if self._roi is not None:
+            # Keep the current crop while the pose sits well inside it and it isn't much too big
+            x0, y0, x1, y1 = self._roi
+            inside = (low - margin / 2 >= (x0, y0)).all() and (high + margin / 2 <= (x1, y1)).all()
+            needed = np.prod(high - low + 2 * margin)
+            if inside and (x1 - x0) * (y1 - y0) <= 2 * needed:
+                return
+        low = np.clip(low - margin, 0.0, 1.0)
+        high = np.clip(high + margin, 0.0, 1.0)
+        self._roi = (float(low[0]), float(low[1]), float(high[0]), float(high[1]))
@@ -0,0 +1,153 @@
+from typing import Dict, Tuple
+import numpy as np
+from data.features import LEFT_HIP, LEFT_SHOULDER, RIGHT_HIP, RIGHT_SHOULDER, joint_angles, track_features
+import config
+
+def rep_signal(points: np.ndarray, signal: str = config.REP_SIGNAL) -> np.ndarray:
+    """Per-frame signal that is high at the top of a push-up and low at the bottom
+
+    Args:
+        points: (T, N_LANDMARKS, 3) landmarks
+        signal: 'elbow_angle' (mean of both elbows, degrees) or 'shoulder_height'
+            (shoulder height in torso lengths; image y grows downwards)
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(len(points), config.N_LANDMARKS, 3)
+    if signal == 'elbow_angle':
+        return joint_angles(points, ('left_elbow', 'right_elbow')).mean(axis=-1)
+    shoulders = (points[:, LEFT_SHOULDER, :2] + points[:, RIGHT_SHOULDER, :2]) / 2
+    hips = (points[:, LEFT_HIP, :2] + points[:, RIGHT_HIP, :2]) / 2
+    torso = np.maximum(np.median(np.linalg.norm(shoulders - hips, axis=-1)), 1e-3)
+    return -shoulders[:, 1] / torso
+
+def smooth(values: np.ndarray, window: int) -> np.ndarray:
+    """Centred moving average with edge padding, same length as the input"""
+    if window <= 1 or len(values) == 0:
+        return np.asarray(values, dtype=np.float32)
+    padded = np.pad(values, (window // 2, window - 1 - window // 2), mode='edge')
+    return np.convolve(padded, np.ones(window) / window, mode='valid').astype(np.float32)
+
+class RepSegments:
+    def __init__(self, start, bottom, end, fps):
+        """Detected reps as parallel index arrays
+
+        Rep i runs from its top at ``start[i]`` down to ``bottom[i]`` and back up
+        to ``end[i]`` (inclusive); consecutive reps share their boundary frame.
+
+        Args:
+            start, bottom, end: Frame indices into the track the reps were found in
+            fps: Frame rate used for durations
+        """
+        self.start = np.asarray(start, dtype=np.int64)
+        self.bottom = np.asarray(bottom, dtype=np.int64)
+        self.end = np.asarray(end, dtype=np.int64)
+        self.fps = fps
+
+    def __len__(self):
+        return len(self.start)
+
+    def in_frames(self, frame_index: np.ndarray) -> 'RepSegments':
+        """Map indices through ``frame_index``, e.g. from detected frames back to video frames"""
+        frame_index = np.asarray(frame_index)
+        return RepSegments(frame_index[self.start], frame_index[self.bottom], frame_index[self.end], self.fps)
+
+    @property
+    def down_seconds(self) -> np.ndarray:
+        return (self.bottom - self.start) / self.fps
+
+    @property
+    def up_seconds(self) -> np.ndarray:
+        return (self.end - self.bottom) / self.fps
+
+    @property
+    def durations(self) -> np.ndarray:
+        return (self.end - self.start) / self.fps
+
+    def summary(self) -> Dict:
+        """Rep count and tempo: mean seconds down/up per rep and reps per minute"""
+        if not len(self):
+            return {"reps": 0, "mean_down_s": 0.0, "mean_up_s": 0.0, "mean_rep_s": 0.0, "reps_per_minute": 0.0}
+        active = (self.end[-1] - self.start[0]) / self.fps
+        return {
+            "reps": len(self),
+            "mean_down_s": float(self.down_seconds.mean()),
+            "mean_up_s": float(self.up_seconds.mean()),
+            "mean_rep_s": float(self.durations.mean()),
+            "reps_per_minute": 60.0 * len(self) / active if active else 0.0,
+        }
+
+def detect_reps(points: np.ndarray, fps: float, signal: str = config.REP_SIGNAL) -> RepSegments:
+    """Find push-up reps in a landmark track
+
+    The rep signal is smoothed, bottoms are found as valleys at least the
+    configured depth below their surroundings, and each rep's start and end are
+    the highest points between its bottom and its neighbours'. Reps that don't
+    come back up by the full depth, or are too short or too long, are dropped.
+
+    Args:
+        points: (T, N_LANDMARKS, 3) landmarks of consecutive frames with a detected pose
+        fps: Frame rate of the track
+        signal: See ``rep_signal``
+    """
+    from scipy.signal import find_peaks  # SciPy is only needed once reps are detected
+
+    min_depth = config.REP_MIN_DEPTH if signal == 'elbow_angle' else config.REP_MIN_SHOULDER_TRAVEL
+    values = smooth(rep_signal(points, signal), int(round(config.REP_SMOOTHING_SECONDS * fps)))
+    bottoms, _ = find_peaks(-values, prominence=min_depth, distance=max(int(config.REP_MIN_SECONDS * fps), 1))
+    if not len(bottoms):
+        return RepSegments([], [], [], fps)
+
+    # Tops between consecutive bottoms; the track's ends bound the first and last rep
+    edges = np.concatenate([[0], bottoms, [len(values) - 1]])
+    tops = np.array([lo + np.argmax(values[lo:hi + 1]) for lo, hi in zip(edges[:-1], edges[1:])])
+    start, end = tops[:-1], tops[1:]
+
+    duration = (end - start) / fps
+    keep = ((values[start] - values[bottoms] >= min_depth) & (values[end] - values[bottoms] >= min_depth)
+            & (duration >= config.REP_MIN_SECONDS) & (duration <= config.REP_MAX_SECONDS))
+    return RepSegments(start[keep], bottoms[keep], end[keep], fps)
+
+def rep_windows(features: np.ndarray, reps: RepSegments, length: int = config.SEQUENCE_LENGTH) -> np.ndarray:
+    """Resample each rep's feature rows to a fixed-length window
+
+    Args:
+        features: (T, n_features) rows of the track the reps were detected in
+        reps: Reps indexing into ``features``
+        length: Frames per window (the classifier's sequence length)
+
+    Returns:
+        (n_reps, length, n_features) float32, linearly interpolated in time
+    """
+    if not len(reps):
+        return np.empty((0, length, features.shape[1]), dtype=np.float32)
+    steps = np.linspace(0.0, 1.0, length)
+    positions = reps.start[:, np.newaxis] + steps * (reps.end - reps.start)[:, np.newaxis]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, reps.end[:, np.newaxis])
+    weight = (positions - lower)[..., np.newaxis].astype(np.float32)
+    return features[lower] * (1 - weight) + features[upper] * weight
+
+def labelled_rep_windows(points: np.ndarray, detected: np.ndarray, fps: float, labels: np.ndarray,
+                         labelled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Training samples for per-rep classification from one video
+
+    Reps are detected over the frames with a pose; a rep is kept when every
+    frame it spans lies in a labelled segment with one label.
+
+    Args:
+        points: (T, N_LANDMARKS, 3) landmarks for every frame
+        detected: (T,) bool mask of frames with a detected pose
+        fps: Frame rate of the video
+        labels, labelled: Per-frame labels as returned by ``frame_labels``
+
+    Returns:
+        windows: (n_reps, SEQUENCE_LENGTH, N_FEATURES) resampled rep features
+        rep_labels: (n_reps,) label of each rep
+    """
+    detected_frames = np.flatnonzero(detected)
+    reps = detect_reps(points[detected_frames], fps)
+    frames = reps.in_frames(detected_frames)
+    # Unlabelled frames and label changes inside a rep both break its run
+    run_ids = np.cumsum(~labelled | np.concatenate([[False], labels[1:] != labels[:-1]]))
+    keep = labelled[frames.start] & (run_ids[frames.start] == run_ids[frames.end])
+    kept = RepSegments(reps.start[keep], reps.bottom[keep], reps.end[keep], fps)
+    return rep_windows(track_features(points[detected_frames]), kept), labels[frames.start[keep]]
@@ -0,0 +1,74 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+class SegmentIndex:
+    def __init__(self, timestamps: List[Dict]):
+        """Sorted interval index mapping times to segment labels
+
+        Segments are closed intervals [start, end]. Where segments overlap, the one
+        listed first wins, matching a linear scan that stops at the first match.
+
+        The sorted segment endpoints split the time axis into "atoms": each
+        endpoint itself and the open gaps between consecutive endpoints. Every
+        time inside one atom is covered by the same segments, so labels are
+        resolved once per atom here and a lookup is a single binary search.
+
+        Args:
+            timestamps: Segments with "start", "end" (seconds) and "label"
+        """
+        self.timestamps = timestamps
+        self.points = np.unique([t for segment in timestamps for t in (segment["start"], segment["end"])]).astype(np.float64)
+
+        # Atom 2k is the point points[k]; atom 2k + 1 is the gap (points[k], points[k + 1])
+        n_atoms = max(2 * len(self.points) - 1, 0)
+        atom_times = np.empty(n_atoms)
+        atom_times[0::2] = self.points
+        atom_times[1::2] = (self.points[:-1] + self.points[1:]) / 2  # Any time inside the gap
+
+        self.atom_labels = np.zeros(n_atoms, dtype=np.int64)
+        self.atom_labelled = np.zeros(n_atoms, dtype=bool)
+        for segment in reversed(timestamps):  # Earlier segments overwrite later ones
+            inside = (segment["start"] <= atom_times) & (atom_times <= segment["end"])
+            self.atom_labels[inside] = segment["label"]
+            self.atom_labelled |= inside
+
+    def lookup(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Labels for an array of times in O(log n) each
+
+        Returns:
+            labels: Segment label per time (0 where unlabelled)
+            labelled: Bool mask of times inside a segment
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.points) == 0:
+            return np.zeros(times.shape, dtype=np.int64), np.zeros(times.shape, dtype=bool)
+
+        k = np.searchsorted(self.points, times)
+        on_point = (k < len(self.points)) & (self.points[np.minimum(k, len(self.points) - 1)] == times)
+        atoms = np.where(on_point, 2 * k, 2 * k - 1)
+        outside = ~on_point & ((k == 0) | (k == len(self.points)))
+        atoms = np.clip(atoms, 0, len(self.atom_labels) - 1)
+
+        labels = np.where(outside, 0, self.atom_labels[atoms])
+        labelled = ~outside & self.atom_labelled[atoms]
+        return labels, labelled
+
+    def frame_ranges(self, fps: float, n_frames: int = None) -> List[Tuple[int, int]]:
+        """Maximal [first, last] frame ranges whose frames all fall inside some segment
+
+        Args:
+            fps: Frame rate used to convert frame numbers to times (frame / fps)
+            n_frames: Total frames in the video, if known
+        """
+        if len(self.points) == 0:
+            return []
+        # No frame after the last segment end can be labelled
+        last_frame = int(np.floor(self.points[-1] * fps)) + 1
+        if n_frames:
+            last_frame = min(last_frame, n_frames - 1)
+        _, labelled = self.lookup(np.arange(last_frame + 1) / fps)
+
+        edges = np.diff(np.concatenate(([0], labelled.astype(np.int8), [0])))
+        firsts = np.flatnonzero(edges == 1)
+        lasts = np.flatnonzero(edges == -1) - 1
+        return list(zip(firsts.tolist(), lasts.tolist()))
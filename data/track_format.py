@@ -0,0 +1,211 @@
+"""Compact binary landmark tracks (.lmk)
+
+Layout, little-endian:
+
+    magic    8 bytes   b'PUSHLMK\\0'
+    version  uint32    TRACK_FORMAT_VERSION
+    length   uint32    byte length of the JSON header that follows
+    header   JSON      n_frames, n_landmarks, fps, source metadata and an index
+                       of the sections below (byte offset, dtype, shape)
+    points      (T, N_LANDMARKS, 3) float16 or float32
+    visibility  (T, N_LANDMARKS)    same dtype as points
+    detected    (ceil(T / 8),)      uint8, np.packbits of the per-frame detection mask
+
+Every section starts on a 64-byte boundary so it can be memory-mapped directly.
+
+    python -m data.track_format export data/training_data/*.mp4 --output-dir data/tracks
+    python -m data.track_format info data/tracks/video_00.lmk
+"""
+import argparse
+import json
+import os
+import struct
+from typing import Dict, Tuple
+import numpy as np
+import config
+
+TRACK_SUFFIX = '.lmk'
+TRACK_FORMAT_VERSION = 1
+MAGIC = b'PUSHLMK\0'
+_PREFIX = struct.Struct('<8sII')
+_ALIGN = 64
+
+def is_track_file(path: str) -> bool:
+    return path.endswith(TRACK_SUFFIX)
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+def write_track(path: str, points: np.ndarray, visibility: np.ndarray, detected: np.ndarray,
+                fps: float, source: Dict = None, dtype: str = config.TRACK_DTYPE):
+    """Write a landmark track atomically
+
+    Args:
+        path: Destination file, conventionally ending in TRACK_SUFFIX
+        points: (T, N_LANDMARKS, 3) landmark coordinates
+        visibility: (T, N_LANDMARKS) visibility scores
+        detected: (T,) bool mask of frames with a detected pose
+        fps: Frame rate of the source video
+        source: JSON-serialisable metadata, e.g. source path, content hash, extractor settings
+        dtype: 'float16' (half the size) or 'float32' (exact) for points and visibility
+    """
+    n_frames, n_landmarks = points.shape[:2]
+    arrays = {
+        "points": np.ascontiguousarray(points, dtype=dtype),
+        "visibility": np.ascontiguousarray(visibility, dtype=dtype),
+        "detected": np.packbits(np.asarray(detected, dtype=bool)),
+    }
+
+    # Offsets depend on the header length, which depends on the offsets; a fixed-width
+    # placeholder pass settles the header size first
+    def header_bytes(offsets):
+        sections = {name: {"offset": offsets[name], "dtype": str(array.dtype), "shape": list(array.shape)}
+                    for name, array in arrays.items()}
+        return json.dumps({
+            "n_frames": n_frames,
+            "n_landmarks": n_landmarks,
+            "fps": float(fps),
+            "source": source or {},
+            "sections": sections,
+        }).encode()
+
+    placeholder = header_bytes({name: 10 ** 15 for name in arrays})
+    offsets = {}
+    offset = _aligned(_PREFIX.size + len(placeholder))
+    for name, array in arrays.items():
+        offsets[name] = offset
+        offset = _aligned(offset + array.nbytes)
+    header = header_bytes(offsets).ljust(len(placeholder))  # JSON allows trailing spaces
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, TRACK_FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(offsets[name])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)  # Readers never see a partially written track
+
+class TrackFile:
+    def __init__(self, path: str):
+        """Read-only view of a .lmk landmark track
+
+        Only the header is read up front; ``points`` and ``visibility`` are
+        memory-mapped, so ``read(start, end)`` touches just the pages holding
+        those frames.
+
+        Raises:
+            ValueError: If the file is not a track or was written by a newer version
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size or prefix[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a landmark track file")
+            _, version, header_length = _PREFIX.unpack(prefix)
+            if version > TRACK_FORMAT_VERSION:
+                raise ValueError(f"{path} uses track format {version}, newer than supported {TRACK_FORMAT_VERSION}")
+            header = json.loads(f.read(header_length))
+
+        self.n_frames = header["n_frames"]
+        self.n_landmarks = header["n_landmarks"]
+        self.fps = header["fps"]
+        self.source = header["source"]
+        self.sections = header["sections"]
+        self._maps = {}
+
+    def __len__(self):
+        return self.n_frames
+
+    def _section(self, name: str) -> np.ndarray:
+        if name not in self._maps:
+            section = self.sections[name]
+            shape = tuple(section["shape"])
+            if 0 in shape:
+                self._maps[name] = np.empty(shape, dtype=section["dtype"])  # mmap can't map zero bytes
+            else:
+                self._maps[name] = np.memmap(self.path, dtype=section["dtype"], mode='r',
+                                             offset=section["offset"], shape=shape)
+        return self._maps[name]
+
+    @property
+    def points(self) -> np.ndarray:
+        """(T, N_LANDMARKS, 3) memory-mapped coordinates in the stored dtype"""
+        return self._section("points")
+
+    @property
+    def visibility(self) -> np.ndarray:
+        """(T, N_LANDMARKS) memory-mapped visibility scores in the stored dtype"""
+        return self._section("visibility")
+
+    def detected(self, start: int = 0, end: int = None) -> np.ndarray:
+        """(end - start,) bool detection mask, unpacking only the bytes covering the range"""
+        start, end, _ = slice(start, end).indices(self.n_frames)
+        if end <= start:
+            return np.zeros(0, dtype=bool)
+        packed = self._section("detected")[start // 8:-(-end // 8)]
+        first = start - start // 8 * 8
+        return np.unpackbits(packed)[first:first + end - start].astype(bool)
+
+    def read(self, start: int = 0, end: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Frames [start, end) in the same form as ``DataProcessor.extract_track``
+
+        Returns:
+            points: (n, N_LANDMARKS, 3) float32
+            visibility: (n, N_LANDMARKS) float32
+            detected: (n,) bool
+            fps: Frame rate of the source video
+        """
+        return (
+            np.array(self.points[start:end], dtype=np.float32),
+            np.array(self.visibility[start:end], dtype=np.float32),
+            self.detected(start, end),
+            self.fps,
+        )
+
+def export_tracks(video_paths, output_dir=None, dtype=config.TRACK_DTYPE):
+    """Extract landmarks for videos and write each as a track next to it (or in ``output_dir``)"""
+    from data.data_processor import DataProcessor
+    from data.landmark_cache import sha256_file
+
+    processor = DataProcessor()
+    written = []
+    for video_path in video_paths:
+        points, visibility, detected, fps = processor.extract_track(video_path)
+        source = {
+            "path": os.path.abspath(video_path),
+            "sha256": sha256_file(video_path),
+            "extractor": DataProcessor.extractor_params(),
+        }
+        name = os.path.splitext(os.path.basename(video_path))[0] + TRACK_SUFFIX
+        track_path = os.path.join(output_dir or os.path.dirname(video_path), name)
+        write_track(track_path, points, visibility, detected, fps, source, dtype)
+        print(f"{video_path} -> {track_path}: {len(points)} frames, {os.path.getsize(track_path) / 1024:.0f} KB")
+        written.append(track_path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect landmark track files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Extract videos to .lmk tracks")
+    export.add_argument("videos", nargs="+")
+    export.add_argument("--output-dir", help="Defaults to each video's directory")
+    export.add_argument("--dtype", default=config.TRACK_DTYPE, choices=["float16", "float32"])
+    info = commands.add_parser("info", help="Print a track's header")
+    info.add_argument("tracks", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        export_tracks(args.videos, args.output_dir, args.dtype)
+    else:
+        for path in args.tracks:
+            track = TrackFile(path)
+            detected = track.detected()
+            print(f"{path}: {track.n_frames} frames at {track.fps:.2f} fps, "
+                  f"{detected.sum()} with a pose, {track.points.dtype}, source {track.source.get('path', '-')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import numpy as np
+import config
+
+def sliding_windows(track: np.ndarray, length: int = config.SEQUENCE_LENGTH, stride: int = 1) -> np.ndarray:
+    """Return every sliding window over a landmark track as a strided view
+
+    Args:
+        track: Array of shape (T, n_features), one row per frame
+        length: Frames per window
+        stride: Frames between the starts of consecutive windows
+
+    Returns:
+        Read-only view of shape (n_windows, length, n_features); no data is copied
+    """
+    if len(track) < length:
+        return np.empty((0, length) + track.shape[1:], dtype=track.dtype)
+    # sliding_window_view appends the window axis last: (T - length + 1, n_features, length)
+    windows = np.lib.stride_tricks.sliding_window_view(track, length, axis=0)
+    return np.moveaxis(windows, -1, 1)[::stride]
+
+def window_end_frames(n_frames: int, length: int = config.SEQUENCE_LENGTH, stride: int = 1) -> np.ndarray:
+    """Index of the last frame of each window produced by ``sliding_windows``"""
+    return np.arange(length - 1, n_frames, stride)
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward over following NaN entries"""
+    valid = ~np.isnan(values)
+    last_valid = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    # Entries before the first valid value map to index 0, which is itself NaN
+    return values[last_valid]
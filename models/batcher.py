@@ -0,0 +1,98 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from utils.metrics import Metrics
+import config
+
+_STOP = object()  # Tells the batching thread to finish
+
+class DynamicBatcher:
+    def __init__(self, model, max_batch: int = config.SERVER_MAX_BATCH,
+                 max_delay: float = config.SERVER_MAX_DELAY_MS / 1000, metrics: Metrics = None):
+        """Collect windows from many callers into batched classifier calls
+
+        A single thread owns the model. It waits for the first pending window,
+        then keeps gathering until ``max_batch`` windows are queued or that first
+        window has waited ``max_delay`` seconds, and scores the lot with one
+        ``predict_batch`` call. Under light load a window is scored after at most
+        ``max_delay`` plus one model call; under heavy load batches fill up
+        before the deadline.
+
+        Use as a context manager to start and stop the batching thread.
+
+        Args:
+            model: Anything with ``predict_batch(sequences, batch_size)``, e.g. ``PushupModel``
+            max_batch: Most windows per model call
+            max_delay: Longest the oldest queued window waits for others to join it
+            metrics: Optional ``Metrics`` receiving "predict_batch" timings and batch counters
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.metrics = metrics or Metrics(enabled=False)
+        self.batches = 0
+        self.windows = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def __enter__(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='dynamic-batcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, window: np.ndarray) -> Future:
+        """Queue one (SEQUENCE_LENGTH, N_FEATURES) window; the Future resolves to its score
+
+        The window is copied, so callers may keep writing to the array they passed.
+        """
+        future = Future()
+        self._queue.put((np.array(window, dtype=np.float32), future, time.perf_counter()))
+        return future
+
+    def mean_batch_size(self) -> float:
+        return self.windows / self.batches if self.batches else 0.0
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = item[2] + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True  # Score what was already queued first
+                    break
+                batch.append(item)
+            self._score(batch)
+
+    def _score(self, batch):
+        windows, futures, _ = zip(*batch)
+        try:
+            with self.metrics.timer("predict_batch"):
+                scores = self.model.predict_batch(np.stack(windows), batch_size=len(windows))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.windows += len(batch)
+        self.metrics.increment("batches")
+        self.metrics.increment("windows", len(batch))
+        for future, score in zip(futures, scores):
+            future.set_result(float(score))
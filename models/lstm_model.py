@@ -1,78 +1,283 @@
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import Sequential, load_model
-    from tensorflow.keras.layers import LSTM, Dense, Dropout
-except ImportError:
-    print("Error importing TensorFlow. Installed version:", tf.__version__)
 import os
+import numpy as np
+from models.numpy_lstm import NumpyLSTMModel, export_weights
+from models.quantization import TFLiteModel, quantized_model_path
+from models.streaming_lstm import StreamingLSTM
 import config
 
+def build_model(lstm_units=config.LSTM_UNITS, dropout_rate=config.DROPOUT_RATE,
+                learning_rate=config.LEARNING_RATE, sequence_length=config.SEQUENCE_LENGTH,
+                n_features=config.N_FEATURES):
+    """Create LSTM model for pose sequence analysis
+
+    Architecture:
+    1. LSTM layer with return sequences (processes time series data)
+    2. Dropout layer to prevent overfitting
+    3. Second LSTM layer
+    4. Dense layer with ReLU activation
+    5. Output layer with sigmoid for binary classification
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential([
+        LSTM(
+            lstm_units,
+            return_sequences=True,  # Return full sequence for next LSTM layer
+            input_shape=(sequence_length, n_features)  # (timesteps, features)
+        ),
+        Dropout(dropout_rate),  # Prevent overfitting
+        LSTM(32),  # Second LSTM layer for deeper feature extraction
+        Dense(16, activation='relu'),  # Dense layer for final feature processing
+        Dense(1, activation='sigmoid')  # Output layer: 1 = good form, 0 = bad form
+    ])
+
+    model.compile(
+        optimizer=Adam(learning_rate),
+        loss='binary_crossentropy',  # Binary classification loss
+        metrics=['accuracy']  # Track accuracy during training
+    )
+    return model
+
 class PushupModel:
-    def __init__(self):
+    def __init__(self, backend=config.INFERENCE_BACKEND, quantization=config.QUANTIZATION, load=True):
+        """Push-up form classifier
+
+        Args:
+            backend: 'keras' loads the full TensorFlow model, 'numpy' runs the
+                exported weights (config.WEIGHTS_PATH) without importing TensorFlow,
+                'tflite' runs the quantized model written by
+                ``python -m models.quantization``, 'auto' picks 'numpy' when the
+                exported weights are up to date
+            quantization: 'int8' or 'float16', the model the 'tflite' backend loads
+            load: False leaves the saved model alone until ``start_fresh``,
+                ``resume_checkpoint`` or ``prepare_finetune`` picks the model to
+                train, so a full retrain works even when the saved model no
+                longer matches the feature settings
+        """
+        if not load:
+            self.backend = 'keras'
+            self.is_trained = False
+            self.model = None
+            return
+        self.backend = self._select_backend(backend)
+        self.is_trained = os.path.exists(config.MODEL_PATH) or self.backend != 'keras'
+        if self.backend == 'numpy':
+            self.model = NumpyLSTMModel.load(config.WEIGHTS_PATH)
+        elif self.backend == 'tflite':
+            self.model = TFLiteModel.load(self._quantized_path(quantization))
+        else:
+            self.model = self._load_keras_model()
+        self._check_input_size()
+
+    @staticmethod
+    def _quantized_path(quantization):
+        path = quantized_model_path(quantization)
+        if not os.path.exists(path) or (
+                os.path.exists(config.MODEL_PATH) and os.path.getmtime(path) < os.path.getmtime(config.MODEL_PATH)):
+            raise FileNotFoundError(
+                f"No up-to-date {quantization} model at {path}; run python -m models.quantization "
+                f"{quantization} <held-out clips>, or set INFERENCE_BACKEND to 'numpy' or 'keras'"
+            )
+        return path
+
+    def _check_input_size(self):
+        input_size = self.model.input_size if self.backend != 'keras' else self.model.input_shape[-1]
+        if input_size != config.N_FEATURES:
+            raise ValueError(
+                f"Saved model expects {input_size} features per frame but the feature settings in "
+                f"config.py give {config.N_FEATURES} (FEATURE_MODE={config.FEATURE_MODE!r}); retrain, or restore "
+                f"the settings it was trained with (FEATURE_MODE='raw' for 99-feature models)"
+            )
+
+    @staticmethod
+    def _select_backend(backend):
+        if backend != 'auto':
+            return backend
+        if not os.path.exists(config.WEIGHTS_PATH):
+            return 'keras'
+        if not os.path.exists(config.MODEL_PATH):
+            return 'numpy'
+        # Only trust the export if it was written after the last training run
+        stale = os.path.getmtime(config.WEIGHTS_PATH) < os.path.getmtime(config.MODEL_PATH)
+        return 'keras' if stale else 'numpy'
+
+    def _load_keras_model(self):
+        # Imported here so the NumPy backend never pays TensorFlow's startup cost
+        from tensorflow.keras.models import load_model
+
         # Either load existing model or create a new one
-        self.model = (
+        return (
             self._create_model()  # Create new if no saved model exists
             if not os.path.exists(config.MODEL_PATH)
             else load_model(config.MODEL_PATH)  # Load existing model if available
         )
-    
+
     def _create_model(self):
-        """Create LSTM model for pose sequence analysis
-        
-        Architecture:
-        1. LSTM layer with return sequences (processes time series data)
-        2. Dropout layer to prevent overfitting
-        3. Second LSTM layer
-        4. Dense layer with ReLU activation
-        5. Output layer with sigmoid for binary classification
-        """
-        model = Sequential([
-            LSTM(
-                config.LSTM_UNITS,
-                return_sequences=True,  # Return full sequence for next LSTM layer
-                input_shape=(config.SEQUENCE_LENGTH, config.N_FEATURES)  # (timesteps, features)
-            ),
-            Dropout(config.DROPOUT_RATE),  # Prevent overfitting
-            LSTM(32),  # Second LSTM layer for deeper feature extraction
-            Dense(16, activation='relu'),  # Dense layer for final feature processing
-            Dense(1, activation='sigmoid')  # Output layer: 1 = good form, 0 = bad form
-        ])
-        
-        model.compile(
-            optimizer='adam',
-            loss='binary_crossentropy',  # Binary classification loss
-            metrics=['accuracy']  # Track accuracy during training
-        )
-        return model
-    
-    def train(self, X_train, y_train, X_val, y_val):
+        """Create LSTM model for pose sequence analysis with the config.py hyperparameters"""
+        return build_model()
+
+    def start_fresh(self):
+        """Replace whatever model was loaded with a newly initialised one"""
+        self.model = self._create_model()
+        self.backend = 'keras'
+
+    def resume_checkpoint(self):
+        """Load the last epoch checkpoint, optimizer state included"""
+        from tensorflow.keras.models import load_model
+        self.model = load_model(config.CHECKPOINT_PATH)
+        self.backend = 'keras'
+        self._check_input_size()
+
+    def prepare_finetune(self, learning_rate=config.FINETUNE_LEARNING_RATE):
+        """Warm start from the saved model with a fresh optimizer at ``learning_rate``"""
+        from tensorflow.keras.models import load_model
+        from tensorflow.keras.optimizers import Adam
+
+        if not os.path.exists(config.MODEL_PATH):
+            raise FileNotFoundError(f"No trained model at {config.MODEL_PATH} to fine-tune; train from scratch first")
+        self.model = load_model(config.MODEL_PATH)
+        self.backend = 'keras'
+        self._check_input_size()
+        self.model.compile(optimizer=Adam(learning_rate), loss='binary_crossentropy', metrics=['accuracy'])
+
+    def train(self, X_train, y_train, X_val, y_val, state=None):
         """Train the model on push-up sequences
-        
+
         Args:
             X_train: Training sequences of pose landmarks
             y_train: Training labels (1 = good form, 0 = bad form)
             X_val: Validation sequences
             y_val: Validation labels
+            state: TrainingState whose current run sets the epochs and is
+                checkpointed after every epoch
         """
-        history = self.model.fit(
+        return self._fit(
             X_train,
             y_train,
             validation_data=(X_val, y_val),
-            epochs=config.EPOCHS,
-            batch_size=config.BATCH_SIZE
+            batch_size=config.BATCH_SIZE,
+            state=state
+        )
+
+    def train_on_dataset(self, dataset, train_indices, val_indices, state=None):
+        """Train on a LandmarkDataset, streaming windows batch by batch
+
+        Args:
+            dataset: LandmarkDataset holding the per-frame landmarks
+            train_indices: Window indices used for training
+            val_indices: Window indices used for validation
+            state: As for ``train``
+        """
+        return self._fit(
+            dataset.as_tf_dataset(train_indices, config.BATCH_SIZE, shuffle=True),
+            validation_data=dataset.as_tf_dataset(val_indices, config.BATCH_SIZE),
+            state=state
         )
-        
-        # Save the trained model
+
+    def _fit(self, *args, state=None, **kwargs):
+        if self.backend != 'keras' or self.model is None:
+            self.model = self._load_keras_model()  # Training needs the full Keras model
+            self.backend = 'keras'
+
+        os.makedirs(os.path.dirname(config.MODEL_PATH), exist_ok=True)
+        if state is None:
+            history = self.model.fit(*args, epochs=config.EPOCHS, **kwargs)
+        else:
+            history = self.model.fit(
+                *args,
+                epochs=state.run["epochs"],
+                initial_epoch=state.run["epoch"],  # Non-zero when resuming
+                callbacks=self._callbacks(state),
+                **kwargs
+            )
+
+        # Save the trained model, plus the weights the NumPy backend runs from
         self.model.save(config.MODEL_PATH)
+        export_weights(self.model, config.WEIGHTS_PATH)
+        if state is not None:
+            state.finish_run()
+        self.is_trained = True
         return history
-    
+
+    @staticmethod
+    def _callbacks(state):
+        """Per-epoch checkpoint (model and optimizer), state update and early stopping
+
+        On resume, early stopping continues from the run's best val_loss, its
+        patience count and the best epoch's weights, so it stops where an
+        uninterrupted run would have.
+        """
+        from tensorflow.keras.callbacks import EarlyStopping, LambdaCallback, ModelCheckpoint
+
+        run = state.run
+        # Both written before the state, so neither lags the recorded epoch
+        callbacks = [ModelCheckpoint(config.CHECKPOINT_PATH)]
+        if config.EARLY_STOPPING_PATIENCE:
+            callbacks.append(ModelCheckpoint(config.BEST_WEIGHTS_PATH, monitor='val_loss', save_best_only=True,
+                                             save_weights_only=True, initial_value_threshold=run["best_val_loss"]))
+        callbacks.append(LambdaCallback(on_epoch_end=lambda epoch, logs: state.epoch_done(epoch + 1, logs or {})))
+        if not config.EARLY_STOPPING_PATIENCE:
+            return callbacks
+
+        early_stopping = EarlyStopping(monitor='val_loss', patience=config.EARLY_STOPPING_PATIENCE,
+                                       restore_best_weights=True)
+
+        def restore_early_stopping(logs=None):
+            # Runs after EarlyStopping.on_train_begin has reset it
+            if run["best_val_loss"] is None:
+                return
+            early_stopping.best = run["best_val_loss"]
+            early_stopping.wait = run.get("wait", 0)
+            if os.path.exists(config.BEST_WEIGHTS_PATH):
+                model = early_stopping.model
+                current = model.get_weights()
+                model.load_weights(config.BEST_WEIGHTS_PATH)
+                early_stopping.best_weights = model.get_weights()
+                model.set_weights(current)
+
+        callbacks += [early_stopping, LambdaCallback(on_train_begin=restore_early_stopping)]
+        return callbacks
+
     def predict(self, sequence):
         """Make prediction on a sequence of poses
-        
+
         Args:
             sequence: List of pose landmarks representing a push-up
-            
+
         Returns:
             Float between 0 and 1 (1 = good form, 0 = bad form)
         """
-        return self.model.predict(sequence)[0][0]
\ No newline at end of file
+        return self.model.predict_on_batch(sequence)[0][0]
+
+    def streaming(self, mode='exact'):
+        """Return a StreamingLSTM that scores this model one frame at a time
+
+        Streaming runs on the NumPy backend; with the 'tflite' backend it uses
+        the float32 export (config.WEIGHTS_PATH) of the same model.
+        """
+        if self.backend == 'numpy':
+            numpy_model = self.model
+        elif self.backend == 'tflite':
+            numpy_model = NumpyLSTMModel.load(config.WEIGHTS_PATH)
+        else:
+            numpy_model = NumpyLSTMModel.from_keras(self.model)
+        return StreamingLSTM(numpy_model, mode)
+
+    def predict_batch(self, sequences, batch_size=config.PREDICT_BATCH_SIZE):
+        """Score many windows with one model call per chunk
+
+        Args:
+            sequences: Array of shape (n_windows, SEQUENCE_LENGTH, N_FEATURES);
+                strided views are fine, only one chunk at a time is copied
+            batch_size: Number of windows per model call
+
+        Returns:
+            Float32 array of n_windows scores (1 = good form, 0 = bad form)
+        """
+        scores = np.empty(len(sequences), dtype=np.float32)
+        for start in range(0, len(sequences), batch_size):
+            chunk = np.ascontiguousarray(sequences[start:start + batch_size], dtype=np.float32)
+            scores[start:start + len(chunk)] = self.model.predict_on_batch(chunk)[:, 0]
+        return scores
@@ -0,0 +1,178 @@
+import json
+import numpy as np
+import config
+
+def _sigmoid(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))  # Same as 1 / (1 + e^-x) without overflow
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+def _linear(x):
+    return x
+
+ACTIVATIONS = {'sigmoid': _sigmoid, 'tanh': np.tanh, 'relu': _relu, 'linear': _linear}
+
+def extract_weights(keras_model):
+    """Read layer specs and float32 weights out of a Keras LSTM classifier
+
+    Supports the layer types used by PushupModel: LSTM, Dense and Dropout
+    (dropout is a no-op at inference and is skipped).
+
+    Returns:
+        layers: List of layer spec dicts
+        arrays: Mapping of array names to weights
+    """
+    layers = []
+    arrays = {}
+    for layer in keras_model.layers:
+        kind = type(layer).__name__
+        layer_config = layer.get_config()
+        if kind == 'Dropout':
+            continue
+        if kind == 'LSTM':
+            kernel, recurrent_kernel, bias = layer.get_weights()
+            name = f'layer{len(layers)}'
+            arrays[f'{name}_kernel'] = kernel.astype(np.float32)
+            arrays[f'{name}_recurrent_kernel'] = recurrent_kernel.astype(np.float32)
+            arrays[f'{name}_bias'] = bias.astype(np.float32)
+            layers.append({
+                'type': 'lstm',
+                'name': name,
+                'return_sequences': layer_config['return_sequences'],
+                'activation': layer_config['activation'],
+                'recurrent_activation': layer_config['recurrent_activation'],
+            })
+        elif kind == 'Dense':
+            kernel, bias = layer.get_weights()
+            name = f'layer{len(layers)}'
+            arrays[f'{name}_kernel'] = kernel.astype(np.float32)
+            arrays[f'{name}_bias'] = bias.astype(np.float32)
+            layers.append({'type': 'dense', 'name': name, 'activation': layer_config['activation']})
+        else:
+            raise ValueError(f"Layer type {kind} is not supported by the NumPy backend")
+    return layers, arrays
+
+def export_weights(keras_model, path=config.WEIGHTS_PATH):
+    """Export a trained Keras LSTM classifier to a compact .npz for NumpyLSTMModel"""
+    layers, arrays = extract_weights(keras_model)
+    with open(path, 'wb') as f:
+        np.savez(f, architecture=np.array(json.dumps(layers)), **arrays)
+    return path
+
+class NumpyLSTMModel:
+    def __init__(self, layers, weights):
+        """Inference-only forward pass of a stacked LSTM/Dense classifier in NumPy
+
+        Mirrors the Keras layers exported by ``export_weights`` (gate order
+        input, forget, cell, output) and exposes the ``predict`` and
+        ``predict_on_batch`` calls PushupModel makes on a Keras model.
+
+        Args:
+            layers: Layer specs as stored in the exported architecture
+            weights: Mapping of array names to float32 weights
+        """
+        self.layers = layers
+        self.weights = weights
+
+    @classmethod
+    def load(cls, path=config.WEIGHTS_PATH):
+        with np.load(path) as data:
+            layers = json.loads(str(data['architecture']))
+            weights = {key: data[key] for key in data.files if key != 'architecture'}
+        return cls(layers, weights)
+
+    @classmethod
+    def from_keras(cls, keras_model):
+        return cls(*extract_weights(keras_model))
+
+    @property
+    def input_size(self):
+        """Features per timestep the first layer expects"""
+        return self.weights[f"{self.layers[0]['name']}_kernel"].shape[0]
+
+    def predict_on_batch(self, x):
+        """Run the model on a batch of shape (batch, timesteps, features)"""
+        x = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            x = self._lstm(x, layer) if layer['type'] == 'lstm' else self.dense(layer, x)
+        return x
+
+    def predict(self, x, batch_size=config.PREDICT_BATCH_SIZE, **kwargs):
+        """Keras-style predict: runs ``predict_on_batch`` over chunks of ``batch_size``"""
+        x = np.asarray(x, dtype=np.float32)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size])
+                               for i in range(0, max(len(x), 1), batch_size)])
+
+    def dense(self, layer, x):
+        """Apply a Dense layer spec to x"""
+        w = self.weights
+        return ACTIVATIONS[layer['activation']](x @ w[layer['name'] + '_kernel'] + w[layer['name'] + '_bias'])
+
+    def project_input(self, layer, x):
+        """Input half of an LSTM layer's gates, x @ W + b, for any number of timesteps"""
+        return x @ self.weights[layer['name'] + '_kernel'] + self.weights[layer['name'] + '_bias']
+
+    def lstm_cell(self, layer, projected, h, c):
+        """Advance an LSTM layer one timestep
+
+        Args:
+            layer: LSTM layer spec
+            projected: (batch, 4 * units) input projection from ``project_input``
+            h, c: (batch, units) hidden and cell state
+
+        Returns:
+            New (h, c)
+        """
+        activation = ACTIVATIONS[layer['activation']]
+        recurrent_activation = ACTIVATIONS[layer['recurrent_activation']]
+        units = h.shape[1]
+        z = projected + h @ self.weights[layer['name'] + '_recurrent_kernel']
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        g = activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * g
+        return o * activation(c), c
+
+    def units(self, layer):
+        return self.weights[layer['name'] + '_recurrent_kernel'].shape[0]
+
+    def _lstm(self, x, layer):
+        units = self.units(layer)
+        batch, timesteps, _ = x.shape
+
+        # Input projections for every timestep in one matmul; only h @ U stays sequential
+        projected = self.project_input(layer, x)
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32) if layer['return_sequences'] else None
+
+        for t in range(timesteps):
+            h, c = self.lstm_cell(layer, projected[:, t], h, c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+def compare_with_keras(keras_model, numpy_model, sequences=None, n_sequences=64, seed=0):
+    """Largest absolute difference between Keras and NumPy predictions
+
+    Args:
+        sequences: Windows to compare on; random landmark-like inputs if None
+    """
+    if sequences is None:
+        rng = np.random.default_rng(seed)
+        sequences = rng.random((n_sequences, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32)
+    expected = keras_model.predict(sequences, verbose=0)
+    actual = numpy_model.predict(sequences)
+    return float(np.max(np.abs(expected - actual)))
+
+if __name__ == "__main__":
+    # Export the saved Keras model and check the NumPy backend reproduces it
+    from tensorflow.keras.models import load_model
+    keras_model = load_model(config.MODEL_PATH)
+    export_weights(keras_model, config.WEIGHTS_PATH)
+    difference = compare_with_keras(keras_model, NumpyLSTMModel.load(config.WEIGHTS_PATH))
+    print(f"Exported {config.WEIGHTS_PATH}; max difference vs Keras: {difference:.2e}")
+    if difference > config.BACKEND_TOLERANCE:
+        raise SystemExit(f"NumPy backend differs from Keras by more than {config.BACKEND_TOLERANCE}")
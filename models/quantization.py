@@ -0,0 +1,200 @@
+"""Quantized TFLite export of the classifier, gated on held-out agreement
+
+    python -m models.quantization int8 held_out/*.lmk
+    python -m models.quantization float16 clip1.mp4 clip2.mp4 --max-disagreement 0.02
+
+Converts the saved Keras model with TFLite post-training quantization: 'int8'
+is dynamic-range quantization (int8 weights, matmuls run in int8 with
+activations quantized on the fly), 'float16' halves the weights. The result is
+written to ``quantized_model_path(precision)`` only if, on the held-out clips,
+the share of windows whose Poor/Fair/Good bucket differs from the float32
+model stays within config.QUANTIZATION_MAX_DISAGREEMENT. Set
+INFERENCE_BACKEND = 'tflite' to run it.
+"""
+import argparse
+import os
+import time
+import numpy as np
+import config
+
+PRECISIONS = ('int8', 'float16')
+
+def quantized_model_path(precision=config.QUANTIZATION, model_path=config.MODEL_PATH):
+    """Where the quantized model lives: models/saved/pushup_model_int8.tflite etc."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown quantization {precision!r}; expected one of {PRECISIONS}")
+    root, _ = os.path.splitext(model_path)
+    return f"{root}_{precision}.tflite"
+
+def _interpreter_class():
+    try:
+        from ai_edge_litert.interpreter import Interpreter  # Standalone runtime, no TensorFlow import
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+def quantize(keras_model, precision):
+    """Convert a Keras classifier to a TFLite flatbuffer with ``precision`` weights"""
+    import tensorflow as tf
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown quantization {precision!r}; expected one of {PRECISIONS}")
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]  # Dynamic range: int8 weights
+    if precision == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+class TFLiteModel:
+    def __init__(self, model_content):
+        """Quantized classifier run by the TFLite interpreter
+
+        Exposes the ``predict``/``predict_on_batch`` calls PushupModel makes on a
+        Keras model. The interpreter is resized whenever the batch size changes,
+        and like a Keras model it must not be called from two threads at once.
+
+        Args:
+            model_content: TFLite flatbuffer, as returned by ``quantize``
+        """
+        self.model_content = model_content
+        self.interpreter = _interpreter_class()(model_content=model_content)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    @property
+    def input_size(self):
+        """Features per timestep the model expects"""
+        return int(self._input['shape'][-1])
+
+    def predict_on_batch(self, x):
+        """Run the model on a batch of shape (batch, timesteps, features)"""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if len(x) != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input['index'], x.shape)
+            self.interpreter.allocate_tensors()
+            self._batch_size = len(x)
+        self.interpreter.set_tensor(self._input['index'], x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output['index']).copy()
+
+    def predict(self, x, batch_size=config.PREDICT_BATCH_SIZE, **kwargs):
+        """Keras-style predict: runs ``predict_on_batch`` over chunks of ``batch_size``"""
+        x = np.asarray(x, dtype=np.float32)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size])
+                               for i in range(0, max(len(x), 1), batch_size)])
+
+def form_buckets(scores, thresholds=config.FORM_THRESHOLDS):
+    """Poor (0), Fair (1) or Good (2) for each score, as ``form_feedback`` assigns them"""
+    return np.digitize(scores, thresholds)
+
+def held_out_windows(paths, stride=config.WINDOW_STRIDE):
+    """Yield the model input windows of each held-out video or .lmk track"""
+    from data.features import frame_features
+    from data.parallel_extractor import ParallelExtractor
+    from data.windows import sliding_windows
+
+    for points, _, detected, _ in ParallelExtractor().extract_tracks(paths):
+        yield sliding_windows(frame_features(points, detected)[detected], config.SEQUENCE_LENGTH, stride)
+
+def compare_precision(reference, candidate, windows, thresholds=config.FORM_THRESHOLDS):
+    """Agreement between two models' scores on batches of windows
+
+    Args:
+        reference: Float32 model the candidate must match
+        candidate: Quantized model
+        windows: Iterable of (n_windows, SEQUENCE_LENGTH, N_FEATURES) arrays
+
+    Returns:
+        Dict with the window count, max and mean absolute score difference and
+        the fraction of windows whose feedback bucket changed
+    """
+    expected = []
+    actual = []
+    for batch in windows:
+        if len(batch):
+            expected.append(reference.predict(batch)[:, 0])
+            actual.append(candidate.predict(batch)[:, 0])
+    if not expected:
+        raise ValueError("No complete windows in the held-out set")
+    expected = np.concatenate(expected)
+    actual = np.concatenate(actual)
+    difference = np.abs(expected - actual)
+    return {
+        "windows": len(expected),
+        "max_abs_diff": float(difference.max()),
+        "mean_abs_diff": float(difference.mean()),
+        "bucket_disagreement": float(np.mean(form_buckets(expected, thresholds) != form_buckets(actual, thresholds))),
+    }
+
+def single_window_latency_ms(model, window, repeats=200):
+    """Median time of one ``predict_on_batch`` call on a single window"""
+    model.predict_on_batch(window)  # Warm up
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_on_batch(window)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples) * 1000)
+
+def export_quantized(keras_model, precision, windows, max_disagreement=config.QUANTIZATION_MAX_DISAGREEMENT,
+                     path=None):
+    """Quantize ``keras_model`` and write it only if it passes the held-out gate
+
+    Args:
+        windows: Iterable of held-out window batches, see ``compare_precision``
+        path: Output path; defaults to ``quantized_model_path(precision)``
+
+    Returns:
+        The comparison report plus single-window latency of both models, with
+        ``path`` set when the quantized model was written and None when rejected
+    """
+    from models.numpy_lstm import NumpyLSTMModel
+
+    reference = NumpyLSTMModel.from_keras(keras_model)
+    candidate = TFLiteModel(quantize(keras_model, precision))
+    windows = [np.asarray(batch, dtype=np.float32) for batch in windows]
+    report = compare_precision(reference, candidate, windows)
+    window = next(batch[:1] for batch in windows if len(batch))
+    report["float32_latency_ms"] = single_window_latency_ms(reference, window)
+    report["quantized_latency_ms"] = single_window_latency_ms(candidate, window)
+    report["path"] = None
+    if report["bucket_disagreement"] <= max_disagreement:
+        report["path"] = path or quantized_model_path(precision)
+        os.makedirs(os.path.dirname(report["path"]) or '.', exist_ok=True)
+        tmp_path = report["path"] + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(candidate.model_content)
+        os.replace(tmp_path, report["path"])
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the trained classifier, gated on held-out agreement")
+    parser.add_argument("precision", choices=PRECISIONS)
+    parser.add_argument("held_out", nargs="+", help="Held-out videos or .lmk tracks not used for training")
+    parser.add_argument("--max-disagreement", type=float, default=config.QUANTIZATION_MAX_DISAGREEMENT)
+    parser.add_argument("--stride", type=int, default=config.WINDOW_STRIDE)
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+    report = export_quantized(load_model(config.MODEL_PATH), args.precision,
+                              held_out_windows(args.held_out, args.stride), args.max_disagreement)
+    print(f"{report['windows']} windows: max diff {report['max_abs_diff']:.2e}, mean diff "
+          f"{report['mean_abs_diff']:.2e}, bucket disagreement {report['bucket_disagreement']:.2%}")
+    print(f"Single window: float32 {report['float32_latency_ms']:.3f} ms, "
+          f"{args.precision} {report['quantized_latency_ms']:.3f} ms")
+    if report["path"] is None:
+        raise SystemExit(f"Not exported: {args.precision} changes the feedback bucket of more than "
+                         f"{args.max_disagreement:.2%} of held-out windows")
+    print(f"Wrote {report['path']} ({os.path.getsize(report['path']) / 1024:.0f} KB, "
+          f"Keras model {os.path.getsize(config.MODEL_PATH) / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from data.windows import sliding_windows
+from models.numpy_lstm import NumpyLSTMModel
+import config
+
+class StreamingLSTM:
+    def __init__(self, model: NumpyLSTMModel, mode='exact', sequence_length=config.SEQUENCE_LENGTH):
+        """Score a landmark stream one frame at a time, keeping LSTM state between frames
+
+        Modes:
+            'exact': keeps a ring of ``sequence_length`` states, each one a window
+                started on a different frame, and advances them all together. Every
+                frame completes exactly one window, so scores equal the windowed
+                model's. Each frame still advances ``sequence_length`` states, the
+                same recurrent arithmetic as one windowed prediction; only the first
+                layer's input projection is shared and the 30 sequential timesteps
+                become one batched step per layer. It saves per-call overhead, not
+                the order of magnitude of LSTM work.
+            'approximate': a single state that is never reset ("windowless").
+                Costs one timestep per frame, ``sequence_length`` times less LSTM
+                work, but each score reflects the whole stream so far rather than
+                the last ``sequence_length`` frames.
+
+        Args:
+            model: NumPy backend model whose layers are LSTMs followed by Dense layers
+            mode: 'exact' or 'approximate'
+            sequence_length: Window length the model was trained on
+        """
+        if mode not in ('exact', 'approximate'):
+            raise ValueError(f"Unknown streaming mode: {mode}")
+        self.model = model
+        self.mode = mode
+        self.sequence_length = sequence_length
+        self.lstm_layers = [layer for layer in model.layers if layer['type'] == 'lstm']
+        self.head_layers = [layer for layer in model.layers if layer['type'] != 'lstm']
+        self.slots = sequence_length if mode == 'exact' else 1
+        self.reset()
+
+    def reset(self):
+        """Forget all state, e.g. when the stream restarts"""
+        self.h = [np.zeros((self.slots, self.model.units(layer)), dtype=np.float32) for layer in self.lstm_layers]
+        self.c = [np.zeros_like(h) for h in self.h]
+        # Slot k starts its first window on frame k; negative ages are slots not yet started
+        self.ages = -np.arange(self.slots)
+        self.frames = 0
+
+    def step(self, landmarks):
+        """Advance the stream by one frame
+
+        Args:
+            landmarks: One frame's N_FEATURES feature vector (see ``data.features``)
+
+        Returns:
+            Score for the window ending at this frame, or None until
+            ``sequence_length`` frames have been seen
+        """
+        x = np.asarray(landmarks, dtype=np.float32).reshape(1, -1)
+        for index, layer in enumerate(self.lstm_layers):
+            # The first layer's input is the same frame for every slot: project it once
+            projected = self.model.project_input(layer, x)
+            self.h[index], self.c[index] = self.model.lstm_cell(layer, projected, self.h[index], self.c[index])
+            x = self.h[index]
+        self.frames += 1
+
+        if self.mode == 'approximate':
+            return self._head(x)[0] if self.frames >= self.sequence_length else None
+
+        # Slots that haven't started yet must stay at the zero state
+        waiting = self.ages < 0
+        for h, c in zip(self.h, self.c):
+            h[waiting] = 0.0
+            c[waiting] = 0.0
+        self.ages += 1
+
+        complete = np.flatnonzero(self.ages == self.sequence_length)
+        if len(complete) == 0:
+            return None
+        slot = complete[0]
+        score = self._head(self.h[-1][slot:slot + 1])[0]
+        # The finished slot starts a new window on the next frame
+        for h, c in zip(self.h, self.c):
+            h[slot] = 0.0
+            c[slot] = 0.0
+        self.ages[slot] = 0
+        return score
+
+    def _head(self, x):
+        for layer in self.head_layers:
+            x = self.model.dense(layer, x)
+        return x[:, 0]
+
+def compare_streaming(model: NumpyLSTMModel, track, thresholds=config.FORM_THRESHOLDS):
+    """Measure how far each streaming mode drifts from the windowed model on a landmark track
+
+    Args:
+        model: NumPy backend model
+        track: (T, N_FEATURES) features of consecutive detected frames
+        thresholds: Score boundaries between the Poor/Fair/Good feedback buckets
+
+    Returns:
+        Dict per mode with the max and mean absolute score difference, the
+        fraction of frames whose feedback bucket matches the windowed model and
+        the mean per-frame latency; 'windowed' holds the latency of scoring one
+        window per frame, as live mode does without streaming
+    """
+    track = np.asarray(track, dtype=np.float32)
+    windows = sliding_windows(track, config.SEQUENCE_LENGTH)
+    expected = model.predict(windows)[:, 0]
+    started = time.perf_counter()
+    for i in range(len(windows)):
+        model.predict_on_batch(windows[i:i + 1])
+    report = {"windowed": {"per_frame_ms": (time.perf_counter() - started) * 1000 / max(len(windows), 1)}}
+    for mode in ('exact', 'approximate'):
+        stream = StreamingLSTM(model, mode)
+        started = time.perf_counter()
+        scores = [stream.step(frame) for frame in track]
+        per_frame_ms = (time.perf_counter() - started) * 1000 / max(len(track), 1)
+        actual = np.array(scores[config.SEQUENCE_LENGTH - 1:], dtype=np.float32)
+        difference = np.abs(actual - expected)
+        report[mode] = {
+            "max_abs_diff": float(difference.max()) if len(difference) else 0.0,
+            "mean_abs_diff": float(difference.mean()) if len(difference) else 0.0,
+            "bucket_agreement": float(np.mean(np.digitize(actual, thresholds) == np.digitize(expected, thresholds)))
+            if len(difference) else 1.0,
+            "per_frame_ms": per_frame_ms,
+        }
+    return report
+
+if __name__ == "__main__":
+    # Compare streaming with windowed scoring on recorded clips
+    import argparse
+    from data.features import frame_features
+    from data.parallel_extractor import ParallelExtractor
+
+    parser = argparse.ArgumentParser(description="Streaming vs windowed LSTM: score agreement and per-frame latency")
+    parser.add_argument("clips", nargs="+", help="Videos or .lmk tracks")
+    parser.add_argument("--weights", default=config.WEIGHTS_PATH, help="Exported NumPy backend weights")
+    args = parser.parse_args()
+
+    numpy_model = NumpyLSTMModel.load(args.weights)
+    print(f"{'clip':<40}{'mode':<13}{'max diff':>10}{'buckets':>10}{'ms/frame':>10}")
+    for clip, (points, _, detected, _) in zip(args.clips, ParallelExtractor().extract_tracks(args.clips)):
+        report = compare_streaming(numpy_model, frame_features(points, detected)[detected])
+        for mode, stats in report.items():
+            if mode == 'windowed':
+                print(f"{clip[-39:]:<40}{mode:<13}{'':>10}{'':>10}{stats['per_frame_ms']:>10.3f}")
+            else:
+                print(f"{clip[-39:]:<40}{mode:<13}{stats['max_abs_diff']:>10.2e}"
+                      f"{stats['bucket_agreement']:>10.1%}{stats['per_frame_ms']:>10.3f}")
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from data.landmark_cache import sha256_file
+import config
+
+def video_key(path: str, segments: List[Dict]) -> str:
+    """Identifies a labelled video by its content and its segments
+
+    Relabelling a video gives it a new key, so fine-tuning picks it up again.
+    """
+    labels = json.dumps(segments, sort_keys=True)
+    return f"{sha256_file(path)[:32]}_{hashlib.sha256(labels.encode()).hexdigest()[:16]}"
+
+class TrainingState:
+    def __init__(self, path: str = config.TRAINING_STATE_PATH):
+        """Record of what the saved model was trained on and of the current run
+
+        Kept as JSON next to the model: the labelled videos the model has seen
+        (by ``video_key``), and the run in progress with the epochs completed so
+        far, so an interrupted run can resume from config.CHECKPOINT_PATH.
+
+        Args:
+            path: JSON file holding the state
+        """
+        self.path = path
+        self.videos = {}  # video_key -> {"path", "added"}
+        self.run = None
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.videos = state["videos"]
+            self.run = state["run"]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"videos": self.videos, "run": self.run}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def unseen(self, keys: List[str]) -> List[bool]:
+        """For each key, True if the saved model has not been trained on it"""
+        return [key not in self.videos for key in keys]
+
+    def pending_run(self) -> Optional[Dict]:
+        """The interrupted run, if it left a checkpoint to resume from"""
+        if self.run and not self.run["completed"] and os.path.exists(config.CHECKPOINT_PATH):
+            return self.run
+        return None
+
+    def start_run(self, mode: str, videos: Dict[str, str], epochs: int, seed: int) -> Dict:
+        """Begin a run over ``videos`` (video_key -> path) and persist it
+
+        Args:
+            mode: 'full' (new model) or 'finetune' (warm start from the saved model)
+            epochs: Epochs to train for, at most
+            seed: Train/validation split seed, reused on resume
+        """
+        self.run = {
+            "mode": mode,
+            "videos": videos,
+            "epochs": epochs,
+            "epoch": 0,
+            "seed": seed,
+            "best_val_loss": None,
+            "wait": 0,  # Epochs since best_val_loss last improved, as EarlyStopping counts them
+            "started": datetime.now().isoformat(timespec='seconds'),
+            "completed": False,
+        }
+        self.save()
+        return self.run
+
+    def epoch_done(self, epoch: int, logs: Dict):
+        """Record that ``epoch`` epochs are complete and checkpointed"""
+        self.run["epoch"] = epoch
+        val_loss = logs.get("val_loss")
+        if val_loss is not None and (self.run["best_val_loss"] is None or val_loss < self.run["best_val_loss"]):
+            self.run["best_val_loss"] = float(val_loss)
+            self.run["wait"] = 0
+        elif val_loss is not None:
+            self.run["wait"] = self.run.get("wait", 0) + 1
+        self.save()
+
+    def finish_run(self):
+        """Mark the run complete and its videos as seen by the saved model"""
+        if self.run["mode"] == 'full':
+            self.videos = {}  # A new model has seen only this run's videos
+        added = datetime.now().isoformat(timespec='seconds')
+        for key, path in self.run["videos"].items():
+            self.videos[key] = {"path": path, "added": added}
+        self.run["completed"] = True
+        self.save()
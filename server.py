@@ -0,0 +1,183 @@
+"""Analyze many video streams at once with one shared classifier
+
+    python server.py data/training_data/video_00.mp4 rtsp://camera-1/stream socket://0.0.0.0:9000
+
+Sources can be video files (played back at their native FPS), camera indices,
+RTSP/HTTP URLs, or socket://host:port to receive JPEG frames from a client
+(see utils.socket_source.send_video).
+"""
+import argparse
+import threading
+import time
+from data.data_processor import DataProcessor
+from data.features import FeatureStream
+from data.landmark_buffer import LandmarkBuffer
+from models.batcher import DynamicBatcher
+from models.lstm_model import PushupModel
+from utils.live_capture import LatestFrameCapture, LatencyTracker
+from utils.metrics import Metrics
+from utils.socket_source import SocketFrameSource
+from app import form_feedback
+import config
+
+SOCKET_SCHEME = 'socket://'
+
+def open_source(source):
+    """Open a stream source as a ``LatestFrameCapture``"""
+    if isinstance(source, str) and source.startswith(SOCKET_SCHEME):
+        # The client paces its own frames
+        return LatestFrameCapture(SocketFrameSource(source[len(SOCKET_SCHEME):]), realtime=False)
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)  # Camera index
+    elif isinstance(source, str) and '://' in source:
+        return LatestFrameCapture(source, realtime=False)  # Live streams arrive in real time already
+    return LatestFrameCapture(source)
+
+class StreamSession:
+    def __init__(self, stream_id, source, batcher, classify_every=config.LIVE_CLASSIFY_EVERY, metrics=None):
+        """Pose extraction and window assembly for one stream
+
+        Runs on its own thread with its own Pose graph (MediaPipe keeps tracking
+        state per instance) and landmark ring buffer. Windows go to the shared
+        ``DynamicBatcher``; at most one window per stream is in flight, so a slow
+        classifier makes streams skip windows rather than queue stale ones.
+
+        Args:
+            stream_id: Name used in status output
+            source: Anything ``open_source`` accepts
+            batcher: Shared ``DynamicBatcher``
+            classify_every: Submit a window every k-th frame with a detected pose
+            metrics: Optional shared ``Metrics``
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.batcher = batcher
+        self.classify_every = classify_every
+        self.metrics = metrics or Metrics(enabled=False)
+        self.buffer = LandmarkBuffer()
+        self.features = FeatureStream()
+        self.latency = LatencyTracker()  # Capture to score
+        self.frames = 0
+        self.dropped = 0
+        self.windows = 0
+        self.score = None
+        self.feedback = None
+        self._pending = None
+        self._thread = threading.Thread(target=self._run, name=f'stream-{stream_id}', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        processor = DataProcessor(use_cache=False)
+        cap = open_source(self.source)
+        try:
+            if not cap.isOpened():
+                print(f"Error: Could not open stream {self.stream_id}: {self.source}")
+                return
+
+            frames_since_classify = 0
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.frames += 1
+                self.dropped = cap.dropped
+
+                with self.metrics.timer("extract_landmarks"):
+                    landmarks, _ = processor.extract_landmarks(frame)
+                if not landmarks:
+                    continue
+
+                with self.metrics.timer("window"):
+                    self.buffer.append(self.features.step(landmarks))
+                frames_since_classify += 1
+                if (self.buffer.is_full() and frames_since_classify >= self.classify_every
+                        and (self._pending is None or self._pending.done())):
+                    frame_time = cap.frame_time
+                    self._pending = self.batcher.submit(self.buffer.window()[0])
+                    self._pending.add_done_callback(lambda future, t=frame_time: self._on_score(future, t))
+                    frames_since_classify = 0
+        finally:
+            cap.release()
+        self.dropped = cap.dropped
+        if self._pending is not None:
+            self._pending.exception()  # Wait for the last score before reporting done
+
+    def _on_score(self, future, frame_time):
+        if future.exception() is not None:
+            print(f"Error: Scoring failed for stream {self.stream_id}: {future.exception()}")
+            return
+        self.score = future.result()
+        self.feedback = form_feedback(self.score)
+        self.windows += 1
+        self.latency.record(frame_time)
+
+class MultiStreamServer:
+    def __init__(self, sources, model=None, classify_every=config.LIVE_CLASSIFY_EVERY):
+        """Serve many streams from one process and one model
+
+        Args:
+            sources: Stream sources, see ``open_source``
+            model: Shared classifier (a ``PushupModel`` is loaded if omitted)
+            classify_every: Per-stream classification interval in frames
+        """
+        self.metrics = Metrics()
+        self.model = model or PushupModel()
+        self.batcher = DynamicBatcher(self.model, metrics=self.metrics)
+        self.sessions = [
+            StreamSession(f"{i}", source, self.batcher, classify_every, self.metrics)
+            for i, source in enumerate(sources)
+        ]
+
+    def run(self, status_interval=config.SERVER_STATUS_INTERVAL):
+        """Process every stream until all have ended or Ctrl+C is pressed"""
+        if not self.model.is_trained:
+            print("Warning: No trained model found; scores come from an untrained network")
+        self.metrics.start_export()
+
+        started = time.time()
+        with self.batcher:
+            for session in self.sessions:
+                session.start()
+            try:
+                while any(session.is_alive() for session in self.sessions):
+                    for session in self.sessions:
+                        session.join(timeout=status_interval / len(self.sessions))
+                    self.print_status()
+            except KeyboardInterrupt:
+                print("Stopping...")
+        self.print_summary(time.time() - started)
+
+    def print_status(self):
+        for session in self.sessions:
+            score = f"{session.score:.2f}" if session.score is not None else "-"
+            print(f"[{session.stream_id}] frames {session.frames}  windows {session.windows}  "
+                  f"score {score}  {session.feedback or 'Waiting for a full window'}")
+
+    def print_summary(self, wall_seconds):
+        print(f"\n{'Stream':<8}{'frames':>8}{'dropped':>9}{'windows':>9}{'mean ms':>9}{'p95 ms':>9}  source")
+        for session in self.sessions:
+            stats = session.latency.summary()
+            print(f"{session.stream_id:<8}{session.frames:>8}{session.dropped:>9}{session.windows:>9}"
+                  f"{stats['mean_ms']:>9.0f}{stats['p95_ms']:>9.0f}  {session.source}")
+        frames = sum(session.frames for session in self.sessions)
+        print(f"Wall time: {wall_seconds:.1f} s, {frames / wall_seconds if wall_seconds else 0:.1f} frames/s total. "
+              f"Classifier: {self.batcher.batches} batches, mean size {self.batcher.mean_batch_size():.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many video streams with one shared model")
+    parser.add_argument("sources", nargs="+", help="Video files, camera indices, stream URLs or socket://host:port")
+    parser.add_argument("--classify-every", type=int, default=config.LIVE_CLASSIFY_EVERY,
+                        help="Classify every k-th frame of each stream")
+    args = parser.parse_args()
+    MultiStreamServer(args.sources, classify_every=args.classify_every).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Hyperparameter sweep over the landmark cache
+
+    python sweep.py videos.json space.json --workers 4 --threads 2 --output leaderboard.json
+    python sweep.py videos.json space.json --random 20 --min-accuracy 0.9
+
+videos.json lists labelled videos as train_model takes them:
+{"videos": [{"path": ..., "segments": [{"start": "0:31", "end": "0:35", "label": 1}, ...]}]}.
+
+space.json maps hyperparameters (lstm_units, dropout_rate, learning_rate,
+batch_size, sequence_length) to a list of values. The grid of every
+combination is trained unless --random N is given, which samples N
+configurations; in random mode a value may also be {"low": a, "high": b} with
+optional "log": true, drawn uniformly (or log-uniformly) from the range.
+
+Landmarks come from the landmark cache (extracted once if missing). Features
+of the labelled frames are put in shared memory once and every worker builds
+its windows over that memory, so candidates with different sequence lengths
+share one copy. Once every candidate has trained, their NumPy-backend latency
+is measured one at a time in the parent, so it isn't skewed by other workers
+still training. The leaderboard ranks configurations that meet --min-accuracy
+by that latency, then the rest by accuracy.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from data.data_processor import frame_labels
+from data.dataset import LandmarkDataset
+from data.features import frame_features
+from data.parallel_extractor import ParallelExtractor
+import config
+
+DEFAULTS = {
+    "lstm_units": config.LSTM_UNITS,
+    "dropout_rate": config.DROPOUT_RATE,
+    "learning_rate": config.LEARNING_RATE,
+    "batch_size": config.BATCH_SIZE,
+    "sequence_length": config.SEQUENCE_LENGTH,
+}
+INTEGER_PARAMS = ("lstm_units", "batch_size", "sequence_length")
+VALIDATION_FRACTION = 0.2
+LATENCY_REPEATS = 200
+
+_shared = None  # Worker-side arrays attached to the parent's shared memory
+_blocks = []
+
+def grid(space):
+    """Every combination of the listed values, missing parameters at their config.py defaults"""
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(DEFAULTS, **dict(zip(names, values)))
+
+def random_configs(space, n, seed=0):
+    """``n`` configurations drawn from value lists or {"low", "high", "log"} ranges"""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        params = dict(DEFAULTS)
+        for name, values in space.items():
+            if isinstance(values, dict):
+                low, high = values["low"], values["high"]
+                if values.get("log"):
+                    value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    value = float(rng.uniform(low, high))
+            else:
+                value = values[rng.integers(len(values))]
+            params[name] = int(round(value)) if name in INTEGER_PARAMS else value
+        yield params
+
+def load_frames(videos):
+    """Features, labels and run ids of every labelled frame with a pose, over all videos
+
+    Run ids increase at every unlabelled frame and between videos, so a window
+    is valid when its first and last frames share one (see ``window_starts``).
+    """
+    from train import parse_timestamp
+
+    tracks = ParallelExtractor().extract_tracks([video["path"] for video in videos])
+    frames, labels, run_ids = [], [], []
+    offset = 0
+    for video, (points, _, detected, fps) in zip(videos, tracks):
+        segments = [dict(segment, start=parse_timestamp(str(segment["start"])),
+                         end=parse_timestamp(str(segment["end"])))
+                    for segment in video["segments"]]
+        frame_label, labelled = frame_labels(len(points), fps, segments)
+        kept = np.flatnonzero(detected & labelled)
+        runs = np.cumsum(~labelled)
+        frames.append(frame_features(points, detected)[kept].astype(np.float32))
+        labels.append(frame_label[kept])
+        run_ids.append(runs[kept] + offset)
+        offset += int(runs[-1]) + 1 if len(runs) else 1
+    return {
+        "frames": np.concatenate(frames),
+        "labels": np.concatenate(labels).astype(np.int64),
+        "run_ids": np.concatenate(run_ids).astype(np.int64),
+    }
+
+def share(arrays):
+    """Copy arrays into shared memory blocks; returns (blocks, specs for ``attach``)"""
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+def attach(specs):
+    """Read-only views of shared arrays created by ``share`` in another process"""
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        try:
+            block = shared_memory.SharedMemory(block_name, track=False)
+        except TypeError:  # Before Python 3.13 every attach registers the block for cleanup
+            block = shared_memory.SharedMemory(block_name)
+            resource_tracker.unregister(block._name, 'shared_memory')
+        _blocks.append(block)  # The views are only valid while the block stays open
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+        arrays[name].flags.writeable = False
+    return arrays
+
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+def _init_worker(specs, threads):
+    global _shared
+    # BLAS thread caps are set in the parent's environment before spawning:
+    # numpy is already imported by the time an initializer runs
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _shared = attach(specs)
+
+def candidate_dataset(sequence_length):
+    """LandmarkDataset of ``sequence_length`` windows over the shared frames"""
+    run_ids = _shared["run_ids"]
+    n_windows = len(run_ids) - sequence_length + 1
+    starts = (np.flatnonzero(run_ids[:n_windows] == run_ids[sequence_length - 1:])
+              if n_windows > 0 else np.empty(0, dtype=np.int64))
+    labels = _shared["labels"][starts + sequence_length - 1]
+    return LandmarkDataset.from_arrays(_shared["frames"], starts, labels, sequence_length)
+
+def train_candidate(params, epochs, seed):
+    """Train one configuration and measure its accuracy
+
+    Returns:
+        (result dict, NumPy-backend weights as returned by ``extract_weights``)
+    """
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+    from models.lstm_model import build_model
+    from models.numpy_lstm import extract_weights
+
+    dataset = candidate_dataset(params["sequence_length"])
+    if len(dataset) < 2:
+        raise ValueError(f"Too few windows of {params['sequence_length']} frames to train on")
+    indices = np.random.default_rng(seed).permutation(len(dataset))
+    n_val = max(1, int(len(indices) * VALIDATION_FRACTION))
+    val_indices, train_indices = indices[:n_val], indices[n_val:]
+
+    tf.keras.utils.set_random_seed(seed)
+    model = build_model(params["lstm_units"], params["dropout_rate"], params["learning_rate"],
+                        params["sequence_length"], dataset.n_features)
+    callbacks = ([EarlyStopping(monitor='val_loss', patience=config.EARLY_STOPPING_PATIENCE,
+                                restore_best_weights=True)]
+                 if config.EARLY_STOPPING_PATIENCE else [])
+    started = time.perf_counter()
+    history = model.fit(
+        dataset.as_tf_dataset(train_indices, params["batch_size"], shuffle=True),
+        validation_data=dataset.as_tf_dataset(val_indices, params["batch_size"]),
+        epochs=epochs,
+        callbacks=callbacks,
+        verbose=0
+    )
+    train_seconds = time.perf_counter() - started
+    val_loss, val_accuracy = model.evaluate(dataset.as_tf_dataset(val_indices, params["batch_size"]), verbose=0)
+    result = dict(
+        params,
+        val_accuracy=float(val_accuracy),
+        val_loss=float(val_loss),
+        epochs=len(history.history["loss"]),
+        train_seconds=train_seconds,
+        n_params=int(model.count_params()),
+    )
+    return result, extract_weights(model)
+
+def measure_latency(weights, window):
+    """p50/p99 single-window latency of the backend the analyzer runs, as in live mode"""
+    from benchmarks.timing import LatencyRecorder
+    from models.numpy_lstm import NumpyLSTMModel
+
+    numpy_model = NumpyLSTMModel(*weights)
+    recorder = LatencyRecorder()
+    for _ in range(LATENCY_REPEATS):
+        with recorder.time():
+            numpy_model.predict_on_batch(window)
+    latency = recorder.summary()
+    return {"latency_p50_ms": latency["p50_ms"], "latency_p99_ms": latency["p99_ms"]}
+
+def rank(results, min_accuracy):
+    """Configurations meeting ``min_accuracy`` fastest first, then the rest by accuracy
+
+    Results whose latency is not measured yet sort last among the passing ones.
+    """
+    passing = sorted((r for r in results if r["val_accuracy"] >= min_accuracy),
+                     key=lambda r: r.get("latency_p50_ms", float("inf")))
+    failing = sorted((r for r in results if r["val_accuracy"] < min_accuracy), key=lambda r: -r["val_accuracy"])
+    return passing + failing
+
+def write_leaderboard(path, results, min_accuracy):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({"min_accuracy": min_accuracy, "results": rank(results, min_accuracy)}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def run_sweep(videos, configs, workers, threads, epochs=config.EPOCHS, seed=0,
+              min_accuracy=0.0, output=None):
+    """Train every configuration across ``workers`` processes and rank them
+
+    Returns:
+        Ranked list of result dicts (hyperparameters plus metrics)
+    """
+    arrays = load_frames(videos)
+    print(f"{len(arrays['frames'])} labelled frames, {arrays['frames'].nbytes / 1024 ** 2:.1f} MB shared")
+    blocks, specs = share(arrays)
+    # Latency doesn't depend on the values, so one window's worth of frames is kept for timing
+    sample = arrays["frames"][:max(params["sequence_length"] for params in configs)].copy()
+    del arrays
+    results, weights = [], []
+    # Spawned workers inherit the environment, so BLAS reads these caps when numpy loads there
+    saved_environ = {variable: os.environ.get(variable) for variable in THREAD_VARIABLES}
+    os.environ.update({variable: str(threads) for variable in THREAD_VARIABLES})
+    try:
+        # spawn, not fork: TensorFlow's thread pools don't survive a fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(specs, threads)) as pool:
+            futures = {pool.submit(train_candidate, params, epochs, seed): params for params in configs}
+            for future in as_completed(futures):
+                params = futures[future]
+                try:
+                    result, candidate_weights = future.result()
+                except Exception as e:
+                    print(f"Failed {params}: {e}")
+                    continue
+                results.append(result)
+                weights.append(candidate_weights)
+                print(f"[{len(results)}/{len(futures)}] {params}: accuracy {result['val_accuracy']:.3f}")
+                if output:
+                    write_leaderboard(output, results, min_accuracy)  # Partial results survive an interrupted sweep
+    finally:
+        for variable, value in saved_environ.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    # Timed one candidate at a time with the pool gone, so nothing competes for the cores
+    for result, candidate_weights in zip(results, weights):
+        window = np.ascontiguousarray(sample[None, :result["sequence_length"]])
+        result.update(measure_latency(candidate_weights, window))
+    if output:
+        write_leaderboard(output, results, min_accuracy)
+    return rank(results, min_accuracy)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep over the landmark cache")
+    parser.add_argument("videos", help="JSON file with labelled videos")
+    parser.add_argument("space", help="JSON file with the search space")
+    parser.add_argument("--random", type=int, metavar="N", help="Sample N configurations instead of the full grid")
+    parser.add_argument("--workers", type=int, help="Training processes (default: cores / threads)")
+    parser.add_argument("--threads", type=int, default=1, help="Compute threads per worker")
+    parser.add_argument("--epochs", type=int, default=config.EPOCHS)
+    parser.add_argument("--seed", type=int, default=0, help="Validation split, initialisation and sampling seed")
+    parser.add_argument("--min-accuracy", type=float, default=0.0, help="Accuracy bar for the latency ranking")
+    parser.add_argument("--output", default="leaderboard.json")
+    args = parser.parse_args()
+
+    with open(args.videos) as f:
+        videos = json.load(f)["videos"]
+    with open(args.space) as f:
+        space = json.load(f)
+    unknown = set(space) - set(DEFAULTS)
+    if unknown:
+        parser.error(f"Unknown hyperparameters {sorted(unknown)}; expected {sorted(DEFAULTS)}")
+    configs = list(random_configs(space, args.random, args.seed) if args.random else grid(space))
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+
+    print(f"Training {len(configs)} configurations on {workers} workers x {args.threads} threads")
+    ranked = run_sweep(videos, configs, workers, args.threads, args.epochs, args.seed, args.min_accuracy, args.output)
+    print(f"\n{'units':>6}{'dropout':>9}{'lr':>9}{'batch':>7}{'seq':>5}{'accuracy':>10}{'p50 ms':>9}")
+    for r in ranked:
+        print(f"{r['lstm_units']:>6}{r['dropout_rate']:>9.2f}{r['learning_rate']:>9.1e}{r['batch_size']:>7}"
+              f"{r['sequence_length']:>5}{r['val_accuracy']:>10.3f}{r['latency_p50_ms']:>9.2f}")
+    print(f"Leaderboard written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+# Tests import the project modules the way the entry points do, from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def make_video(tmp_path):
+    """Factory writing a small .mp4 whose frame i is a flat gray of level 10 * i"""
+    def make(name="clip.mp4", n_frames=20, fps=30.0, size=(64, 48)):
+        cv2 = pytest.importorskip("cv2")
+        np = pytest.importorskip("numpy")
+        path = str(tmp_path / name)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+        for i in range(n_frames):
+            writer.write(np.full((size[1], size[0], 3), i * 10 % 256, dtype=np.uint8))
+        writer.release()
+        return path
+    return make
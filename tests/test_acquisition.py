@@ -0,0 +1,57 @@
+import os
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from data.acquisition import AcquisitionPipeline, StageStats
+from data.data_collector import LocalFixtureDownloader, VideoCollector
+from data.parallel_extractor import ParallelExtractor
+
+def test_active_seconds_merges_overlapping_work():
+    stats = StageStats("extract", "frames")
+    stats.record([(0.0, 2.0), (1.0, 3.0)])
+    stats.record([(5.0, 6.0)])
+
+    assert stats.busy_seconds() == 4.0
+    assert stats.active_seconds() == 4.0
+
+def test_offline_pipeline_keeps_results_aligned_with_urls(tmp_path, make_video):
+    fixture_dir = tmp_path / "fixtures"
+    fixture_dir.mkdir()
+    for vid, n_frames in (("video00001a", 12), ("video00002b", 20)):
+        os.replace(make_video(f"{vid}.mp4", n_frames), fixture_dir / f"{vid}.mp4")
+    urls = [
+        "https://www.youtube.com/watch?v=video00001a",
+        "https://www.youtube.com/watch?v=missing0000",  # No fixture: the download fails
+        "https://youtu.be/video00002b",
+    ]
+    collector = VideoCollector(str(tmp_path / "out"), LocalFixtureDownloader(str(fixture_dir)), max_workers=2)
+    pipeline = AcquisitionPipeline(collector, ParallelExtractor(workers=1, use_cache=False))
+
+    paths, tracks = pipeline.run(urls)
+
+    assert paths[0] == os.path.join(collector.output_dir, "video00001a.mp4")
+    assert paths[1] is None and tracks[1] is None
+    assert paths[2] == os.path.join(collector.output_dir, "video00002b.mp4")
+    points, visibility, detected, fps = tracks[2]
+    assert len(tracks[0][0]) == 12 and len(points) == 20
+    assert len(visibility) == len(detected) == 20
+    assert not detected.any()  # Flat gray frames contain no pose
+    assert fps == pytest.approx(30.0)
+    assert pipeline.download_stats.items == 2
+    assert pipeline.extract_stats.items == 2
+    assert pipeline.extract_stats.amount == 32
+
+def test_extract_stats_count_only_frames_in_requested_ranges(tmp_path, make_video):
+    fixture_dir = tmp_path / "fixtures"
+    fixture_dir.mkdir()
+    os.replace(make_video("video00001a.mp4", 20), fixture_dir / "video00001a.mp4")
+    collector = VideoCollector(str(tmp_path / "out"), LocalFixtureDownloader(str(fixture_dir)), max_workers=1)
+    pipeline = AcquisitionPipeline(collector, ParallelExtractor(workers=1, use_cache=False))
+
+    _, tracks = pipeline.run(["https://youtu.be/video00001a"], [[{"start": 0.1, "end": 0.3, "label": 1}]])
+
+    assert len(tracks[0][0]) == 20  # Full-length track, undetected outside the segment
+    assert pipeline.extract_stats.amount == 7  # Frames 3 to 9
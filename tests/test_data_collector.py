@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import pytest
+
+pytest.importorskip("numpy")  # data.landmark_cache, which provides sha256_file
+
+from data.data_collector import LocalFixtureDownloader, VideoCollector, video_id
+import config
+
+URL = "https://www.youtube.com/watch?v=abc123XYZ_0"
+CONTENT = b"not really an mp4" * 1000
+
+@pytest.fixture
+def fixtures(tmp_path):
+    fixture_dir = tmp_path / "fixtures"
+    fixture_dir.mkdir()
+    (fixture_dir / "abc123XYZ_0.mp4").write_bytes(CONTENT)
+    return str(fixture_dir)
+
+def test_video_id_names_youtube_urls_by_their_id():
+    assert video_id(URL) == "abc123XYZ_0"
+    assert video_id("https://youtu.be/abc123XYZ_0?t=5") == "abc123XYZ_0"
+    assert video_id("https://www.youtube.com/shorts/abc123XYZ_0") == "abc123XYZ_0"
+    assert video_id("https://example.com/a.mp4").startswith("url-")
+
+def test_download_names_file_by_video_id_and_records_manifest(tmp_path, fixtures):
+    collector = VideoCollector(str(tmp_path / "out"), LocalFixtureDownloader(fixtures), max_workers=1)
+    path = collector.download_video(URL)
+
+    assert path == os.path.join(collector.output_dir, "abc123XYZ_0.mp4")
+    with open(path, 'rb') as f:
+        assert f.read() == CONTENT
+    with open(os.path.join(collector.output_dir, config.DOWNLOAD_MANIFEST)) as f:
+        entry = json.load(f)["abc123XYZ_0"]
+    assert entry == {"url": URL, "file": "abc123XYZ_0.mp4", "size": len(CONTENT),
+                     "sha256": hashlib.sha256(CONTENT).hexdigest()}
+
+def test_download_writes_to_temporary_file_then_renames(tmp_path, fixtures):
+    written = []
+    fixture = LocalFixtureDownloader(fixtures)
+
+    def downloader(url, output_path):
+        written.append(output_path)
+        fixture(url, output_path)
+
+    collector = VideoCollector(str(tmp_path / "out"), downloader, max_workers=1)
+    path = collector.download_video(URL)
+
+    assert written[0] != path
+    assert os.path.dirname(written[0]) == collector.output_dir
+    assert not os.path.exists(written[0])
+    assert set(os.listdir(collector.output_dir)) == {"abc123XYZ_0.mp4", config.DOWNLOAD_MANIFEST}
+
+def test_failed_download_leaves_no_file(tmp_path):
+    def downloader(url, output_path):
+        with open(output_path, 'wb') as f:
+            f.write(b"partial")
+        raise ConnectionError("dropped")
+
+    collector = VideoCollector(str(tmp_path / "out"), downloader, max_workers=1)
+
+    assert collector.download_video(URL) is None
+    assert os.listdir(collector.output_dir) == []
+    assert not collector.is_complete("abc123XYZ_0")
+
+def test_complete_download_is_skipped(tmp_path, fixtures):
+    calls = []
+    fixture = LocalFixtureDownloader(fixtures)
+
+    def downloader(url, output_path):
+        calls.append(url)
+        fixture(url, output_path)
+
+    output_dir = str(tmp_path / "out")
+    VideoCollector(output_dir, downloader, max_workers=1).download_video(URL)
+    path = VideoCollector(output_dir, downloader, max_workers=1).download_video(URL)
+
+    assert calls == [URL]
+    assert os.path.getsize(path) == len(CONTENT)
+
+def test_partial_file_is_downloaded_again(tmp_path, fixtures):
+    output_dir = str(tmp_path / "out")
+    collector = VideoCollector(output_dir, LocalFixtureDownloader(fixtures), max_workers=1)
+    path = collector.download_video(URL)
+    with open(path, 'r+b') as f:
+        f.truncate(100)  # Same name, but not the size the manifest recorded
+
+    collector = VideoCollector(output_dir, LocalFixtureDownloader(fixtures), max_workers=1)
+    assert not collector.is_complete("abc123XYZ_0")
+    assert collector.download_video(URL) == path
+    assert os.path.getsize(path) == len(CONTENT)
+
+def test_unrecorded_file_is_downloaded_again(tmp_path, fixtures):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    (output_dir / "abc123XYZ_0.mp4").write_bytes(b"left over from an old run")
+
+    collector = VideoCollector(str(output_dir), LocalFixtureDownloader(fixtures), max_workers=1)
+    path = collector.download_video(URL)
+
+    with open(path, 'rb') as f:
+        assert f.read() == CONTENT
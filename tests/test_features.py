@@ -0,0 +1,78 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from data import features
+import config
+
+N_ENGINEERED = len(config.FEATURE_LANDMARKS) * 3 + len(config.FEATURE_ANGLES) * 2
+
+@pytest.fixture
+def engineered(monkeypatch):
+    monkeypatch.setattr(config, "FEATURE_MODE", "engineered")
+    monkeypatch.setattr(config, "FEATURE_VELOCITIES", True)
+    monkeypatch.setattr(config, "N_FEATURES", N_ENGINEERED)
+
+@pytest.fixture
+def raw(monkeypatch):
+    monkeypatch.setattr(config, "FEATURE_MODE", "raw")
+    monkeypatch.setattr(config, "N_FEATURES", config.N_LANDMARK_VALUES)
+
+def random_points(n_frames, seed=0):
+    return np.random.default_rng(seed).random((n_frames, config.N_LANDMARKS, 3), dtype=np.float32)
+
+def test_raw_features_are_the_landmarks(raw):
+    points = random_points(5)
+    result = features.track_features(points)
+
+    assert result.shape == (5, config.N_LANDMARK_VALUES)
+    np.testing.assert_array_equal(result, points.reshape(5, -1))
+
+def test_engineered_feature_shape(engineered):
+    result = features.track_features(random_points(6))
+
+    assert result.shape == (6, N_ENGINEERED)
+    assert result.dtype == np.float32
+    # The first frame has no predecessor, so its angular velocities are zero
+    np.testing.assert_array_equal(result[0, -len(config.FEATURE_ANGLES):], 0.0)
+
+def test_frame_features_zero_undetected_rows(engineered):
+    points = random_points(6)
+    detected = np.array([True, False, True, True, False, True])
+    result = features.frame_features(points, detected)
+
+    assert result.shape == (6, N_ENGINEERED)
+    np.testing.assert_array_equal(result[~detected], 0.0)
+    # Velocities run between consecutive detected frames, skipping the gaps
+    np.testing.assert_allclose(result[detected], features.track_features(points[detected]), atol=1e-6)
+
+def test_frame_features_with_no_detections(engineered):
+    result = features.frame_features(random_points(4), np.zeros(4, dtype=bool))
+    assert result.shape == (4, N_ENGINEERED) and not result.any()
+
+def test_feature_stream_matches_track_features(engineered):
+    points = random_points(5)
+    stream = features.FeatureStream()
+    streamed = np.stack([stream.step(frame.ravel()) for frame in points])
+    np.testing.assert_allclose(streamed, features.track_features(points), atol=1e-6)
+
+def test_normalize_pose_centres_and_scales_by_torso():
+    points = random_points(1)[0]
+    landmarks = (features.LEFT_SHOULDER, features.RIGHT_SHOULDER, features.LEFT_HIP, features.RIGHT_HIP)
+    normalized = features.normalize_pose(points, landmarks).reshape(4, 3)
+
+    np.testing.assert_allclose(normalized.mean(axis=0), 0.0, atol=1e-5)
+    torso = (normalized[0] + normalized[1]) / 2 - (normalized[2] + normalized[3]) / 2
+    assert np.linalg.norm(torso[:2]) == pytest.approx(1.0, rel=1e-4)
+
+def test_normalize_pose_ignores_camera_distance_and_framing():
+    points = random_points(1)[0]
+    moved = points * 2.5 + np.array([0.3, -0.2, 0.1], dtype=np.float32)
+    np.testing.assert_allclose(features.normalize_pose(moved), features.normalize_pose(points), atol=1e-4)
+
+def test_joint_angles():
+    points = np.zeros((config.N_LANDMARKS, 3), dtype=np.float32)
+    points[11], points[13], points[15] = (0, 0, 0), (1, 0, 0), (2, 0, 0)  # Straight left arm
+    points[12], points[14], points[16] = (0, 0, 0), (1, 0, 0), (1, 1, 0)  # Right elbow bent square
+    angles = features.joint_angles(points, ("left_elbow", "right_elbow"))
+    np.testing.assert_allclose(angles, [180.0, 90.0], atol=1e-4)
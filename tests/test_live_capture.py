@@ -0,0 +1,56 @@
+import time
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.live_capture import LatestFrameCapture
+
+def frame_index(frame):
+    """Recover i from a make_video frame (flat gray of level 10 * i, give or take compression)"""
+    return int(round(frame.mean() / 10))
+
+def read_all(capture, delay=0.0):
+    indices = []
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            return indices
+        indices.append(frame_index(frame))
+        time.sleep(delay)
+
+def test_every_frame_is_either_returned_or_dropped(make_video):
+    capture = LatestFrameCapture(make_video(n_frames=20))
+    indices = read_all(capture)
+    capture.release()
+
+    assert capture.captured == 20
+    assert len(indices) + capture.dropped == 20
+    assert indices == sorted(set(indices))  # Never the same or an older frame twice
+    assert not capture.isOpened()
+
+def test_slow_reader_gets_newest_frame_and_older_ones_are_dropped(make_video):
+    capture = LatestFrameCapture(make_video(n_frames=20, fps=30.0))
+    ret, frame = capture.read()
+    assert ret
+    first = frame_index(frame)
+
+    time.sleep(0.2)  # About 6 frames at the file's native 30 fps
+    ret, frame = capture.read()
+    assert ret
+    assert frame_index(frame) - first >= 3
+    assert capture.dropped >= 2
+
+    indices = read_all(capture, delay=0.1)
+    capture.release()
+    assert indices[-1] == 19  # The last frame is always handed out
+    assert capture.dropped == 20 - 2 - len(indices)
+
+def test_file_is_paced_at_native_frame_rate(make_video):
+    capture = LatestFrameCapture(make_video(n_frames=15, fps=30.0))
+    started = time.perf_counter()
+    read_all(capture)
+    elapsed = time.perf_counter() - started
+    capture.release()
+
+    assert elapsed >= 14 / 30.0 * 0.9
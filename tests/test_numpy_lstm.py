@@ -0,0 +1,23 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("tensorflow")
+
+from models.lstm_model import build_model
+from models.numpy_lstm import NumpyLSTMModel, compare_with_keras, export_weights
+import config
+
+def test_exported_weights_match_keras(tmp_path):
+    keras_model = build_model()
+    path = export_weights(keras_model, str(tmp_path / "weights.npz"))
+    numpy_model = NumpyLSTMModel.load(path)
+
+    assert numpy_model.input_size == config.N_FEATURES
+    assert compare_with_keras(keras_model, numpy_model) <= config.BACKEND_TOLERANCE
+
+def test_predict_batches_match_predict_on_batch(tmp_path):
+    numpy_model = NumpyLSTMModel.load(export_weights(build_model(), str(tmp_path / "weights.npz")))
+    windows = np.random.default_rng(0).random((5, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32)
+
+    np.testing.assert_allclose(numpy_model.predict(windows, batch_size=2), numpy_model.predict_on_batch(windows),
+                               atol=1e-6)
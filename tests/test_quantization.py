@@ -0,0 +1,58 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("tensorflow")
+
+from models.lstm_model import build_model
+from models.quantization import TFLiteModel, compare_precision, export_quantized, form_buckets, quantize
+import config
+
+@pytest.fixture(scope="module")
+def keras_model():
+    return build_model()
+
+@pytest.fixture(scope="module")
+def windows():
+    rng = np.random.default_rng(0)
+    return [rng.random((n, config.SEQUENCE_LENGTH, config.N_FEATURES), dtype=np.float32) for n in (7, 1, 32)]
+
+def test_form_buckets_match_thresholds():
+    low, high = config.FORM_THRESHOLDS
+    scores = np.array([0.0, low - 1e-3, low + 1e-3, high + 1e-3, 1.0])
+    assert form_buckets(scores).tolist() == [0, 0, 1, 2, 2]
+
+@pytest.mark.parametrize("precision", ["int8", "float16"])
+def test_quantized_model_tracks_keras(keras_model, windows, precision):
+    candidate = TFLiteModel(quantize(keras_model, precision))
+
+    assert candidate.input_size == config.N_FEATURES
+    report = compare_precision(keras_model, candidate, windows)
+    assert report["windows"] == 40
+    assert report["max_abs_diff"] < 0.05
+
+def test_gate_writes_model_within_threshold(keras_model, windows, tmp_path):
+    path = str(tmp_path / "model_int8.tflite")
+    report = export_quantized(keras_model, "int8", windows, max_disagreement=1.0, path=path)
+
+    assert report["path"] == path
+    assert TFLiteModel.load(path).predict(windows[0]).shape == (7, 1)
+
+def test_gate_rejects_model_above_threshold(keras_model, windows, tmp_path):
+    path = str(tmp_path / "model_int8.tflite")
+    report = export_quantized(keras_model, "int8", windows, max_disagreement=-1.0, path=path)
+
+    assert report["path"] is None
+    assert not os.path.exists(path)
+
+def test_bucket_disagreement_counts_changed_buckets(windows):
+    class Constant:
+        def __init__(self, score):
+            self.score = score
+
+        def predict(self, batch):
+            return np.full((len(batch), 1), self.score, dtype=np.float32)
+
+    report = compare_precision(Constant(0.9), Constant(0.1), windows)
+    assert report["bucket_disagreement"] == 1.0
+    assert compare_precision(Constant(0.9), Constant(0.95), windows)["bucket_disagreement"] == 0.0
@@ -0,0 +1,72 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from data.reps import detect_reps, labelled_rep_windows, rep_signal
+import config
+
+FPS = 30.0
+PERIOD = 2.0  # Seconds per rep
+
+def elbow_track(n_reps=5, fps=FPS, top=170.0, bottom=80.0):
+    """Landmarks whose elbows swing between ``top`` and ``bottom`` degrees, starting and ending at the top"""
+    t = np.arange(int(n_reps * PERIOD * fps) + 1) / fps
+    angle = np.radians((top + bottom) / 2 + (top - bottom) / 2 * np.cos(2 * np.pi * t / PERIOD))
+    points = np.zeros((len(t), config.N_LANDMARKS, 3), dtype=np.float32)
+    for shoulder, elbow, wrist in ((11, 13, 15), (12, 14, 16)):
+        points[:, shoulder, :2] = (0.2, 0.5)
+        points[:, elbow, :2] = (0.3, 0.5)
+        # The shoulder lies in the -x direction from the elbow, so this puts the wrist ``angle`` away from it
+        points[:, wrist, 0] = 0.3 - 0.1 * np.cos(angle)
+        points[:, wrist, 1] = 0.5 + 0.1 * np.sin(angle)
+    return points
+
+def test_rep_signal_follows_elbow_angle():
+    values = rep_signal(elbow_track(), 'elbow_angle')
+    assert values.max() == pytest.approx(170.0, abs=0.1)
+    assert values.min() == pytest.approx(80.0, abs=0.1)
+
+def test_detect_reps_counts_and_bounds_reps():
+    reps = detect_reps(elbow_track(n_reps=5), FPS, 'elbow_angle')
+    period = int(PERIOD * FPS)
+
+    assert len(reps) == 5
+    np.testing.assert_allclose(reps.start, np.arange(5) * period, atol=1)
+    np.testing.assert_allclose(reps.bottom, np.arange(5) * period + period // 2, atol=1)
+    np.testing.assert_allclose(reps.end, np.arange(1, 6) * period, atol=1)
+    summary = reps.summary()
+    assert summary["reps"] == 5
+    assert summary["mean_rep_s"] == pytest.approx(PERIOD, abs=0.1)
+    assert summary["reps_per_minute"] == pytest.approx(60.0 / PERIOD, rel=0.05)
+
+def test_shallow_movement_is_not_a_rep():
+    reps = detect_reps(elbow_track(top=170.0, bottom=170.0 - config.REP_MIN_DEPTH / 2), FPS, 'elbow_angle')
+    assert len(reps) == 0
+
+def test_empty_track_has_no_reps():
+    reps = detect_reps(np.zeros((0, config.N_LANDMARKS, 3), dtype=np.float32), FPS, 'elbow_angle')
+    assert len(reps) == 0
+    assert reps.summary()["reps"] == 0
+
+def test_labelled_rep_windows_skips_reps_across_label_changes():
+    points = elbow_track(n_reps=5)
+    gap = 10  # Frames without a pose before the push-ups start
+    points = np.concatenate([np.zeros((gap, config.N_LANDMARKS, 3), dtype=np.float32), points])
+    detected = np.arange(len(points)) >= gap
+    labels = np.where(np.arange(len(points)) <= gap + 150, 1, 0)  # Label changes during the third rep
+    labelled = np.ones(len(points), dtype=bool)
+
+    windows, rep_labels = labelled_rep_windows(points, detected, FPS, labels, labelled)
+
+    assert windows.shape == (4, config.SEQUENCE_LENGTH, config.N_FEATURES)
+    assert rep_labels.tolist() == [1, 1, 0, 0]
+
+def test_labelled_rep_windows_on_undetected_track():
+    n_frames = 50
+    windows, rep_labels = labelled_rep_windows(
+        np.zeros((n_frames, config.N_LANDMARKS, 3), dtype=np.float32), np.zeros(n_frames, dtype=bool), FPS,
+        np.ones(n_frames, dtype=np.int64), np.ones(n_frames, dtype=bool))
+
+    assert windows.shape == (0, config.SEQUENCE_LENGTH, config.N_FEATURES)
+    assert len(rep_labels) == 0
@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from data.data_processor import frame_labels
+from data.segment_index import SegmentIndex
+
+def linear_scan(segments, t):
+    """Reference lookup: first listed segment containing t"""
+    for segment in segments:
+        if segment["start"] <= t <= segment["end"]:
+            return segment["label"], True
+    return 0, False
+
+def test_lookup_matches_linear_scan_on_random_segments():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 40, 12) / 4
+    segments = [{"start": float(s), "end": float(s + rng.integers(0, 12) / 4), "label": int(rng.integers(0, 3))}
+                for s in starts]
+    times = np.concatenate([np.arange(0, 15, 0.125), [s["start"] for s in segments], [s["end"] for s in segments]])
+
+    labels, labelled = SegmentIndex(segments).lookup(times)
+
+    expected = [linear_scan(segments, t) for t in times]
+    assert labels.tolist() == [label for label, _ in expected]
+    assert labelled.tolist() == [inside for _, inside in expected]
+
+def test_overlapping_segments_first_listed_wins():
+    segments = [
+        {"start": 2.0, "end": 4.0, "label": 1},
+        {"start": 1.0, "end": 5.0, "label": 0},  # Labelled 0 only where the first segment doesn't reach
+    ]
+    labels, labelled = frame_labels(60, 10.0, segments)
+
+    assert labelled[10:51].all() and not labelled[:10].any() and not labelled[51:].any()
+    assert (labels[20:41] == 1).all()
+    assert (labels[10:20] == 0).all() and (labels[41:51] == 0).all()
+
+def test_segments_are_closed_intervals():
+    labels, labelled = frame_labels(12, 10.0, [{"start": 0.3, "end": 0.5, "label": 1}])
+    assert np.flatnonzero(labelled).tolist() == [3, 4, 5]
+    assert labels.tolist() == [0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0]
+
+def test_no_segments():
+    labels, labelled = frame_labels(5, 30.0, [])
+    assert not labelled.any() and not labels.any()
+    assert SegmentIndex([]).frame_ranges(30.0) == []
+
+def test_frame_ranges_merge_overlapping_adjacent_and_unsorted_segments():
+    segments = [
+        {"start": 5.0, "end": 6.0, "label": 1},  # Listed out of order
+        {"start": 1.0, "end": 2.0, "label": 1},
+        {"start": 1.5, "end": 3.0, "label": 0},  # Overlaps the previous one
+        {"start": 3.1, "end": 3.5, "label": 1},  # Next frame after 3.0 at 10 fps: adjacent, so merged
+        {"start": 8.0, "end": 8.0, "label": 0},  # A single instant
+    ]
+    assert SegmentIndex(segments).frame_ranges(10.0) == [(10, 35), (50, 60), (80, 80)]
+
+def test_frame_ranges_clipped_to_video_length():
+    segments = [{"start": 1.0, "end": 10.0, "label": 1}, {"start": 20.0, "end": 30.0, "label": 1}]
+    assert SegmentIndex(segments).frame_ranges(10.0, n_frames=50) == [(10, 49)]
+
+def test_frame_ranges_skip_segments_between_frames():
+    # No frame time (multiples of 0.1 s) falls inside (0.51, 0.59)
+    assert SegmentIndex([{"start": 0.51, "end": 0.59, "label": 1}]).frame_ranges(10.0) == []
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from data.windows import sliding_windows
+from models.numpy_lstm import NumpyLSTMModel
+from models.streaming_lstm import StreamingLSTM, compare_streaming
+import config
+
+def random_model(seed=0, n_features=8, units=(16, 8)):
+    """NumpyLSTMModel with PushupModel's layer layout and random weights"""
+    rng = np.random.default_rng(seed)
+    layers, weights = [], {}
+    size = n_features
+    for i, n in enumerate(units):
+        name = f"layer{i}"
+        weights[f"{name}_kernel"] = rng.normal(0, 0.3, (size, 4 * n)).astype(np.float32)
+        weights[f"{name}_recurrent_kernel"] = rng.normal(0, 0.3, (n, 4 * n)).astype(np.float32)
+        weights[f"{name}_bias"] = rng.normal(0, 0.1, 4 * n).astype(np.float32)
+        layers.append({'type': 'lstm', 'name': name, 'return_sequences': i < len(units) - 1,
+                       'activation': 'tanh', 'recurrent_activation': 'sigmoid'})
+        size = n
+    for name, (n, activation) in (("layer2", (4, 'relu')), ("layer3", (1, 'sigmoid'))):
+        weights[f"{name}_kernel"] = rng.normal(0, 0.3, (size, n)).astype(np.float32)
+        weights[f"{name}_bias"] = np.zeros(n, dtype=np.float32)
+        layers.append({'type': 'dense', 'name': name, 'activation': activation})
+        size = n
+    return NumpyLSTMModel(layers, weights)
+
+def test_exact_mode_matches_windowed_predict():
+    model = random_model()
+    track = np.random.default_rng(1).random((3 * config.SEQUENCE_LENGTH, 8), dtype=np.float32)
+    expected = model.predict(sliding_windows(track, config.SEQUENCE_LENGTH))[:, 0]
+
+    stream = StreamingLSTM(model, 'exact')
+    scores = [stream.step(frame) for frame in track]
+
+    assert all(score is None for score in scores[:config.SEQUENCE_LENGTH - 1])
+    np.testing.assert_allclose(np.array(scores[config.SEQUENCE_LENGTH - 1:], dtype=np.float32), expected,
+                               atol=config.BACKEND_TOLERANCE)
+
+def test_reset_starts_a_new_stream():
+    model = random_model()
+    track = np.random.default_rng(2).random((config.SEQUENCE_LENGTH + 5, 8), dtype=np.float32)
+    stream = StreamingLSTM(model, 'exact')
+    first = [stream.step(frame) for frame in track]
+    stream.reset()
+
+    assert [stream.step(frame) for frame in track] == first
+
+def test_compare_streaming_reports_agreement_and_latency():
+    track = np.random.default_rng(3).random((2 * config.SEQUENCE_LENGTH, 8), dtype=np.float32)
+    report = compare_streaming(random_model(), track)
+
+    assert report["exact"]["max_abs_diff"] <= config.BACKEND_TOLERANCE
+    assert report["exact"]["bucket_agreement"] == 1.0
+    assert set(report) == {"windowed", "exact", "approximate"}
+    assert all(stats["per_frame_ms"] > 0 for stats in report.values())
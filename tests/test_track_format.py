@@ -0,0 +1,64 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from data.track_format import TrackFile, is_track_file, write_track
+import config
+
+def random_track(n_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.random((n_frames, config.N_LANDMARKS, 3), dtype=np.float32)
+    visibility = rng.random((n_frames, config.N_LANDMARKS), dtype=np.float32)
+    detected = rng.random(n_frames) < 0.7
+    return points, visibility, detected
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 0.0), ("float16", 1e-3)])
+def test_round_trip(tmp_path, dtype, tolerance):
+    points, visibility, detected = random_track(37)
+    path = str(tmp_path / "clip.lmk")
+    write_track(path, points, visibility, detected, 29.97, {"path": "clip.mp4"}, dtype)
+
+    track = TrackFile(path)
+    read_points, read_visibility, read_detected, fps = track.read()
+
+    assert is_track_file(path) and len(track) == 37
+    assert fps == pytest.approx(29.97) and track.source == {"path": "clip.mp4"}
+    assert track.points.dtype == np.dtype(dtype)
+    assert read_points.dtype == np.float32 and read_visibility.dtype == np.float32
+    np.testing.assert_allclose(read_points, points, atol=tolerance)
+    np.testing.assert_allclose(read_visibility, visibility, atol=tolerance)
+    np.testing.assert_array_equal(read_detected, detected)
+    assert not os.path.exists(path + '.tmp')
+
+def test_zero_frames(tmp_path):
+    path = str(tmp_path / "empty.lmk")
+    write_track(path, np.zeros((0, config.N_LANDMARKS, 3)), np.zeros((0, config.N_LANDMARKS)),
+                np.zeros(0, dtype=bool), 30.0)
+
+    points, visibility, detected, fps = TrackFile(path).read()
+    assert points.shape == (0, config.N_LANDMARKS, 3)
+    assert visibility.shape == (0, config.N_LANDMARKS)
+    assert detected.shape == (0,) and fps == 30.0
+
+def test_detected_ranges_off_byte_boundaries(tmp_path):
+    points, visibility, detected = random_track(37, seed=1)
+    path = str(tmp_path / "clip.lmk")
+    write_track(path, points, visibility, detected, 30.0)
+    track = TrackFile(path)
+
+    for start, end in [(0, 37), (3, 5), (5, 19), (7, 8), (8, 16), (13, 37), (30, None), (36, 37), (10, 10)]:
+        np.testing.assert_array_equal(track.detected(start, end), detected[start:end])
+        _, _, read_detected, _ = track.read(start, end)
+        np.testing.assert_array_equal(read_detected, detected[start:end])
+
+def test_sections_are_aligned(tmp_path):
+    path = str(tmp_path / "clip.lmk")
+    write_track(path, *random_track(5), 30.0)
+    assert all(section["offset"] % 64 == 0 for section in TrackFile(path).sections.values())
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "clip.lmk"
+    path.write_bytes(b"not a track")
+    with pytest.raises(ValueError):
+        TrackFile(str(path))
@@ -1,10 +1,20 @@
-from data.data_collector import VideoCollector
-from data.data_processor import DataProcessor
+from data.acquisition import AcquisitionPipeline
+from data.data_collector import VideoCollector, youtube_downloader
+from data.data_processor import frame_labels
+from data.dataset import LandmarkDataset
+from data.features import frame_features
+from data.parallel_extractor import ParallelExtractor
+from data.reps import labelled_rep_windows
 from models.lstm_model import PushupModel
-from sklearn.model_selection import train_test_split
+from models.training_state import TrainingState, video_key
+import argparse
+import copy
+import json
 import config
 import numpy as np
 
+TRAINING_MODES = ('full', 'finetune', 'resume')
+
 def parse_timestamp(time_str):
     """Convert various timestamp formats to seconds
     
@@ -29,7 +39,7 @@ def parse_timestamp(time_str):
     else:
         raise ValueError("Invalid timestamp format. Use seconds (37) or MM:SS (1:40) or HH:MM:SS (1:23:45)")
 
-def train_model(video_data):
+def train_model(video_data, downloader=youtube_downloader, mode='full'):
     """Train the push-up form analysis model
     
     Args:
@@ -37,124 +47,215 @@ def train_model(video_data):
             - urls: List of YouTube URLs
             - segments: List of time segments with labels
                 Each segment has start, end, and label (1 = good form, 0 = bad form)
+            or videos: List of {"path", "segments"}, where path is a local video
+                or a .lmk landmark track (see data.track_format)
+        downloader: Callable (url, output_path) used to fetch videos; pass a
+            LocalFixtureDownloader to build the dataset offline
+        mode: 'full' trains a new model on every video, 'finetune' warm-starts
+            the saved model on the videos it has not been trained on, 'resume'
+            continues an interrupted run from its last epoch checkpoint
+
+    Returns:
+        Keras training history, or None when fine-tuning finds no new videos
     """
     # Convert timestamp strings to seconds
-    for segments in video_data["segments"]:
+    all_segments = (video_data["segments"] if "segments" in video_data
+                    else [video["segments"] for video in video_data["videos"]])
+    for segments in all_segments:
         for segment in segments:
             segment["start"] = parse_timestamp(str(segment["start"]))
             segment["end"] = parse_timestamp(str(segment["end"]))
     
     # Initialize components
-    collector = VideoCollector()
-    processor = DataProcessor()
-    model = PushupModel()
+    collector = VideoCollector(downloader=downloader)
+    extractor = ParallelExtractor()
+    model = PushupModel(load=False)  # start_run loads the model the run starts from
 
-    # Download videos if URLs provided
     if "urls" in video_data:
-        paths = collector.download_videos(video_data["urls"])
+        # Download videos and extract landmarks as overlapping stages
+        paths, tracks = AcquisitionPipeline(collector, extractor).run(video_data["urls"], video_data["segments"])
         video_data["videos"] = [
             {"path": path, "segments": segments}
             for path, segments in zip(paths, video_data["segments"])
+            if path is not None  # Skip failed downloads but keep the rest aligned
         ]
+        tracks = [track for track in tracks if track is not None]
+    else:
+        # Extract landmark tracks for all local videos in parallel
+        tracks = extractor.extract_tracks([video["path"] for video in video_data["videos"]],
+                                          [video["segments"] for video in video_data["videos"]])
     
-    # Process videos and collect training data
-    all_sequences = []
-    all_labels = []
+    state = TrainingState()
+    videos, tracks = start_run(mode, state, model, video_data["videos"], tracks)
+    if not videos:
+        print("No new videos to fine-tune on")
+        return None
     
-    for video in video_data["videos"]:
-        sequences, labels = processor.process_video(
-            video["path"],
-            video["segments"]
-        )
-        # Modified print statements
-        print(f"Video sequences shape: {sequences.shape if isinstance(sequences, np.ndarray) else 'empty'}")
-        print(f"Video labels shape: {labels.shape if isinstance(labels, np.ndarray) else 'empty'}")
-        
-        all_sequences.extend(sequences)
-        all_labels.extend(labels)
+    if config.CLASSIFY_PER_REP:
+        return train_per_rep(model, videos, tracks, state)
     
-    # Convert lists to numpy arrays after collecting all data
-    all_sequences = np.array(all_sequences)
-    all_labels = np.array(all_labels)
+    # Collect training data as per-frame landmarks plus window indices
+    dataset = LandmarkDataset()
+    for video, (points, _, detected, fps) in zip(videos, tracks):
+        frame_label, labelled = frame_labels(len(points), fps, video["segments"])
+        n_windows = dataset.add_track(
+            frame_features(points, detected),
+            detected,
+            frame_label,
+            labelled
+        )
+        print(f"{video['path']}: {n_windows} sequences")
     
     # Print final shapes
     print("\nFinal shapes:")
-    print("All sequences shape:", all_sequences.shape)
-    print("All labels shape:", all_labels.shape)
-    print("Number of sequences:", len(all_sequences))
-    print("Number of labels:", len(all_labels))
-    
-    if len(all_sequences) > 0:
-        print("Single sequence shape:", all_sequences[0].shape)
+    print("Stored frames shape:", dataset.frames.shape)
+    print("Number of sequences:", len(dataset))
+    print("Single sequence shape:", (config.SEQUENCE_LENGTH, config.N_FEATURES))
 
-    # Split data into training and validation sets
-    X_train, X_val, y_train, y_val = train_test_split(
-        all_sequences,
-        all_labels,
-        test_size=0.2  # Use 20% for validation
+    # Split window indices into training and validation sets
+    from sklearn.model_selection import train_test_split
+    train_indices, val_indices = train_test_split(
+        np.arange(len(dataset)),
+        test_size=0.2,  # Use 20% for validation
+        random_state=state.run["seed"]  # Same split when the run is resumed
     )
     
     # Train and return training history
-    history = model.train(X_train, y_train, X_val, y_val)
+    history = model.train_on_dataset(dataset, train_indices, val_indices, state)
     return history
 
-if __name__ == "__main__":
-    # Example video data structure
-    video_data = {
-        "urls": [
-            "https://www.youtube.com/watch?v=WDIpL0pjun0",  
-            "https://www.youtube.com/watch?v=ZYuocE5AMgU",
-            "https://www.youtube.com/watch?v=-T64FLsJnAU",
-            "https://www.youtube.com/watch?v=iIa2-uVHzM0",
-            "https://www.youtube.com/watch?v=IODxDxX7oi4"   
+def start_run(mode, state, model, videos, tracks):
+    """Pick the videos a training run covers, load the model it starts from and record the run
+
+    Returns:
+        The (videos, tracks) to train on, in the order given
+    """
+    keys = [video_key(video["path"], video["segments"]) for video in videos]
+    if mode == 'resume':
+        run = state.pending_run()
+        if run is None:
+            raise ValueError(f"No interrupted run with a checkpoint at {config.CHECKPOINT_PATH} to resume")
+        missing = set(run["videos"]) - set(keys)
+        if missing:
+            raise ValueError(f"{len(missing)} videos of the interrupted run are not in video_data")
+        keep = [key in run["videos"] for key in keys]
+        model.resume_checkpoint()
+        print(f"Resuming {run['mode']} run after epoch {run['epoch']} of {run['epochs']}")
+    elif mode == 'finetune':
+        keep = state.unseen(keys)
+        if not any(keep):
+            return [], []
+        model.prepare_finetune()
+        print(f"Fine-tuning on {sum(keep)} new videos ({len(keys) - sum(keep)} already seen)")
+    elif mode == 'full':
+        keep = [True] * len(keys)
+        model.start_fresh()
+    else:
+        raise ValueError(f"Unknown training mode {mode!r}; expected one of {TRAINING_MODES}")
+    
+    if mode != 'resume':
+        state.start_run(
+            mode,
+            {key: video["path"] for key, video, kept in zip(keys, videos, keep) if kept},
+            config.FINETUNE_EPOCHS if mode == 'finetune' else config.EPOCHS,
+            seed=int(np.random.default_rng().integers(2 ** 31))
+        )
+    return ([video for video, kept in zip(videos, keep) if kept],
+            [track for track, kept in zip(tracks, keep) if kept])
+
+def train_per_rep(model, videos, tracks, state=None):
+    """Train on one resampled window per detected rep (see config.CLASSIFY_PER_REP)"""
+    windows = []
+    labels = []
+    for video, (points, _, detected, fps) in zip(videos, tracks):
+        frame_label, labelled = frame_labels(len(points), fps, video["segments"])
+        rep_windows, rep_labels = labelled_rep_windows(points, detected, fps, frame_label, labelled)
+        windows.append(rep_windows)
+        labels.append(rep_labels)
+        print(f"{video['path']}: {len(rep_windows)} reps")
+    
+    X = np.concatenate(windows)
+    y = np.concatenate(labels)
+    print("\nRep windows shape:", X.shape)
+    
+    from sklearn.model_selection import train_test_split
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=state.run["seed"] if state else None
+    )
+    return model.train(X_train, y_train, X_val, y_val, state)
+
+EXAMPLE_VIDEO_DATA = {
+    "urls": [
+        "https://www.youtube.com/watch?v=WDIpL0pjun0",  
+        "https://www.youtube.com/watch?v=ZYuocE5AMgU",
+        "https://www.youtube.com/watch?v=-T64FLsJnAU",
+        "https://www.youtube.com/watch?v=iIa2-uVHzM0",
+        "https://www.youtube.com/watch?v=IODxDxX7oi4"   
+    ],
+    "segments": [
+        [
+            {"start": "00", "end": "03", "label": 1},  
+            {"start": "04", "end": "06", "label": 1},
+            {"start": "07", "end": "10", "label": 1},  
+            {"start": "10", "end": "13", "label": 1}  
+        ],
+        [
+            {"start": "00", "end": "02", "label": 1},
+            {"start": "1:48", "end": "1:54", "label": 1},
+            {"start": "1:54", "end": "1:59", "label": 1},
+            {"start": "1:59", "end": "2:04", "label": 1}
+        ],
+        [
+            {"start": "1:59", "end": "2:04", "label": 1},
+            {"start": "2:04", "end": "2:10", "label": 1},
+            {"start": "2:52", "end": "2:58", "label": 1},
+            {"start": "3:01", "end": "3:05", "label": 1}
         ],
-        "segments": [
-            [
-                {"start": "00", "end": "03", "label": 1},  
-                {"start": "04", "end": "06", "label": 1},
-                {"start": "07", "end": "10", "label": 1},  
-                {"start": "10", "end": "13", "label": 1}  
-            ],
-            [
-                {"start": "00", "end": "02", "label": 1},
-                {"start": "1:48", "end": "1:54", "label": 1},
-                {"start": "1:54", "end": "1:59", "label": 1},
-                {"start": "1:59", "end": "2:04", "label": 1}
-            ],
-            [
-                {"start": "1:59", "end": "2:04", "label": 1},
-                {"start": "2:04", "end": "2:10", "label": 1},
-                {"start": "2:52", "end": "2:58", "label": 1},
-                {"start": "3:01", "end": "3:05", "label": 1}
-            ],
-            [
-                # Good form segments
-                {"start": "31", "end": "35", "label": 1},
-                {"start": "1:40", "end": "1:43", "label": 1},
-                {"start": "7:30", "end": "7:35", "label": 1},
-                {"start": "8:01", "end": "8:06", "label": 1},
-                # Bad form segments
-                {"start": "48", "end": "59", "label": 0},
-                {"start": "1:00", "end": "1:05", "label": 0},
-                {"start": "2:10", "end": "2:12", "label": 0},
-                {"start": "7:24", "end": "7:27", "label": 0}
-            ],
-            [
-                # Good form segments
-                {"start": "32", "end": "40", "label": 1},
-                {"start": "1:09", "end": "1:12", "label": 1},
-                {"start": "1:55", "end": "2:03", "label": 1},
-                {"start": "2:52", "end": "3:01", "label": 1},
-                {"start": "3:02", "end": "3:12", "label": 1},
-                {"start": "3:13", "end": "3:16", "label": 1},
-                # Bad form segments
-                {"start": "41", "end": "45", "label": 0},
-                {"start": "1:42", "end": "1:53", "label": 0},
-                {"start": "2:06", "end": "2:12", "label": 0},
-                {"start": "2:14", "end": "2:20", "label": 0},
-                {"start": "2:44", "end": "2:51", "label": 0}
-            ]
+        [
+            # Good form segments
+            {"start": "31", "end": "35", "label": 1},
+            {"start": "1:40", "end": "1:43", "label": 1},
+            {"start": "7:30", "end": "7:35", "label": 1},
+            {"start": "8:01", "end": "8:06", "label": 1},
+            # Bad form segments
+            {"start": "48", "end": "59", "label": 0},
+            {"start": "1:00", "end": "1:05", "label": 0},
+            {"start": "2:10", "end": "2:12", "label": 0},
+            {"start": "7:24", "end": "7:27", "label": 0}
+        ],
+        [
+            # Good form segments
+            {"start": "32", "end": "40", "label": 1},
+            {"start": "1:09", "end": "1:12", "label": 1},
+            {"start": "1:55", "end": "2:03", "label": 1},
+            {"start": "2:52", "end": "3:01", "label": 1},
+            {"start": "3:02", "end": "3:12", "label": 1},
+            {"start": "3:13", "end": "3:16", "label": 1},
+            # Bad form segments
+            {"start": "41", "end": "45", "label": 0},
+            {"start": "1:42", "end": "1:53", "label": 0},
+            {"start": "2:06", "end": "2:12", "label": 0},
+            {"start": "2:14", "end": "2:20", "label": 0},
+            {"start": "2:44", "end": "2:51", "label": 0}
         ]
-    }
-    
-    history = train_model(video_data)
\ No newline at end of file
+    ]
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the push-up form classifier")
+    parser.add_argument("--mode", choices=TRAINING_MODES, default='full',
+                        help="full: new model on all videos; finetune: saved model on unseen videos; "
+                             "resume: continue an interrupted run")
+    parser.add_argument("--videos", help="JSON file with {\"urls\", \"segments\"} or {\"videos\": [{\"path\", "
+                                         "\"segments\"}]}; defaults to the example YouTube set")
+    args = parser.parse_args(argv)
+
+    if args.videos:
+        with open(args.videos) as f:
+            video_data = json.load(f)
+    else:
+        video_data = copy.deepcopy(EXAMPLE_VIDEO_DATA)  # train_model rewrites the timestamps in place
+    return train_model(video_data, mode=args.mode)
+
+if __name__ == "__main__":
+    main()
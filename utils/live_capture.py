@@ -0,0 +1,107 @@
+import collections
+import threading
+import time
+import cv2
+import numpy as np
+
+class LatestFrameCapture:
+    def __init__(self, source=0, realtime=None):
+        """Capture wrapper that always hands out the newest frame
+
+        A background thread reads the source as fast as it delivers frames and
+        keeps only the most recent one, so frames never queue up behind slow
+        processing. Frames replaced before anyone read them are counted as dropped.
+        Offers the ``isOpened``/``read``/``release`` subset of ``cv2.VideoCapture``.
+
+        Args:
+            source: Camera index, video file path / stream URL, or an already open
+                capture object such as ``SocketFrameSource``
+            realtime: Pace reads at the source's native FPS. Defaults to True for
+                files so a recorded clip can stand in for a live camera
+        """
+        self.cap = source if hasattr(source, 'read') else cv2.VideoCapture(source)
+        self.realtime = isinstance(source, str) if realtime is None else realtime
+        self.frame_interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+        self.frame_time = None  # time.perf_counter() when the last returned frame was captured
+        self.captured = 0
+        self.dropped = 0
+        self._frame = None
+        self._frame_id = 0
+        self._returned_id = 0
+        self._running = self.cap.isOpened()
+        self._new_frame = threading.Condition()
+        self._thread = threading.Thread(target=self._reader, name='latest-frame-capture', daemon=True)
+        if self._running:
+            self._thread.start()
+
+    def isOpened(self):
+        with self._new_frame:
+            return self._running or self._frame_id > self._returned_id
+
+    def read(self):
+        """Block until a frame newer than the last one returned is available
+
+        Returns:
+            (ret, frame) like ``cv2.VideoCapture.read``; ret is False once the
+            source has ended and every frame was handed out
+        """
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._frame_id > self._returned_id or not self._running)
+            if self._frame_id == self._returned_id:
+                return False, None
+            self._returned_id = self._frame_id
+            frame, self.frame_time = self._frame
+            return True, frame
+
+    def release(self):
+        with self._new_frame:
+            self._running = False
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+
+    def _reader(self):
+        start = time.perf_counter()
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            if self.realtime:
+                # Don't publish a file's frame before a camera would have delivered it
+                delay = start + self.captured * self.frame_interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            with self._new_frame:
+                if self._frame_id > self._returned_id:
+                    self.dropped += 1  # Previous frame was never read
+                self._frame = (frame, time.perf_counter())
+                self._frame_id += 1
+                self.captured += 1
+                self._new_frame.notify_all()
+
+        with self._new_frame:
+            self._running = False
+            self._new_frame.notify_all()
+
+class LatencyTracker:
+    def __init__(self, window=120):
+        """Rolling capture-to-overlay latency statistics over the last ``window`` frames"""
+        self.samples = collections.deque(maxlen=window)
+
+    def record(self, frame_time):
+        """Record the latency of a frame captured at ``frame_time`` (perf_counter seconds)"""
+        latency = time.perf_counter() - frame_time
+        self.samples.append(latency)
+        return latency
+
+    def summary(self):
+        """Mean, p95 and max latency in milliseconds over the window"""
+        if not self.samples:
+            return {"mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        samples = np.array(self.samples) * 1000
+        return {
+            "mean_ms": float(samples.mean()),
+            "p95_ms": float(np.percentile(samples, 95)),
+            "max_ms": float(samples.max()),
+        }
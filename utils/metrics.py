@@ -0,0 +1,164 @@
+import bisect
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+# Histogram bucket upper bounds in seconds, 0.5 ms to 2 s
+BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+_DISABLED_TIMER = contextlib.nullcontext()
+
+class Histogram:
+    def __init__(self):
+        """Fixed-bucket latency histogram with a smoothed recent value for overlays"""
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = 0.0  # Exponential moving average of recent observations
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent = seconds if self.count == 1 else 0.9 * self.recent + 0.1 * seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile, clamped to the last bucket"""
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, BUCKETS[-1])
+        return BUCKETS[-1]
+
+class _StageTimer:
+    __slots__ = ('histogram', 'lock', 'start')
+
+    def __init__(self, histogram, lock):
+        self.histogram = histogram
+        self.lock = lock
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        with self.lock:
+            self.histogram.observe(elapsed)
+
+class Metrics:
+    def __init__(self, enabled: bool = config.METRICS_ENABLED):
+        """Per-stage timers and counters for the analyzer
+
+        When disabled, ``timer`` hands back one shared no-op context manager and
+        ``increment`` returns immediately, so instrumented code costs nothing extra.
+
+        Args:
+            enabled: Record measurements
+        """
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._exporters = []
+
+    def timer(self, stage: str):
+        """Context manager that records how long the enclosed block took under ``stage``"""
+        if not self.enabled:
+            return _DISABLED_TIMER
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return _StageTimer(histogram, self._lock)
+
+    def increment(self, counter: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def overlay(self):
+        """Recent per-stage timings formatted for PoseVisualizer.draw_performance_metrics"""
+        with self._lock:
+            return {stage: f"{histogram.recent * 1000:.1f} ms" for stage, histogram in self.histograms.items()}
+
+    def snapshot(self):
+        """Cumulative counters and per-stage latency summaries as a JSON-serialisable dict"""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "mean_ms": histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                    "p50_ms": histogram.quantile(0.5) * 1000,
+                    "p95_ms": histogram.quantile(0.95) * 1000,
+                }
+                for stage, histogram in self.histograms.items()
+            }
+            return {"time": time.time(), "stages": stages, "counters": dict(self.counters)}
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = ["# TYPE pushup_stage_seconds histogram"]
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'pushup_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'pushup_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'pushup_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in self.counters.items():
+                lines.append(f"# TYPE pushup_{counter}_total counter")
+                lines.append(f"pushup_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def start_export(self, jsonl_path=config.METRICS_JSONL_PATH, interval=config.METRICS_INTERVAL,
+                     port=config.METRICS_PORT):
+        """Start the configured exporters on daemon threads
+
+        Args:
+            jsonl_path: Append a ``snapshot`` line to this file every ``interval`` seconds
+            interval: Seconds between JSON-lines snapshots
+            port: Serve ``prometheus_text`` at http://127.0.0.1:<port>/metrics
+        """
+        if not self.enabled:
+            return
+        if jsonl_path:
+            thread = threading.Thread(target=self._dump_jsonl, args=(jsonl_path, interval),
+                                      name='metrics-jsonl', daemon=True)
+            thread.start()
+            self._exporters.append(thread)
+        if port:
+            server = ThreadingHTTPServer(('127.0.0.1', port), _metrics_handler(self))
+            thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+            thread.start()
+            self._exporters.append(server)
+
+    def _dump_jsonl(self, path, interval):
+        while True:
+            time.sleep(interval)
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+
+def _metrics_handler(metrics):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would otherwise flood the console
+    return MetricsHandler
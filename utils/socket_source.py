@@ -0,0 +1,95 @@
+import socket
+import struct
+import time
+import cv2
+import numpy as np
+
+_HEADER = struct.Struct('>I')  # Big-endian byte length of the JPEG that follows
+
+class SocketFrameSource:
+    def __init__(self, address: str):
+        """Receive frames from one client over TCP, e.g. a camera box or a test script
+
+        Listens on ``host:port`` and accepts a single connection. The client sends
+        each frame as a 4-byte big-endian length followed by that many bytes of
+        JPEG (see ``send_video``). Offers the ``isOpened``/``read``/``get``/``release``
+        subset of ``cv2.VideoCapture``, so it can be wrapped in ``LatestFrameCapture``.
+
+        Args:
+            address: "host:port" to listen on
+        """
+        host, port = address.rsplit(':', 1)
+        self._listener = socket.create_server((host, int(port)))
+        self._conn = None
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def get(self, prop):
+        return 0.0  # Frame rate and size are whatever the client sends
+
+    def read(self):
+        """Block for the next frame; returns (False, None) once the client disconnects"""
+        if not self._opened:
+            return False, None
+        try:
+            if self._conn is None:
+                self._conn, _ = self._listener.accept()
+            header = self._recv_exactly(_HEADER.size)
+            payload = self._recv_exactly(_HEADER.unpack(header)[0]) if header else None
+        except OSError:
+            payload = None
+        if not payload:
+            self.release()
+            return False, None
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+    def release(self):
+        self._opened = False
+        for sock in (self._conn, self._listener):
+            if sock is not None:
+                sock.close()
+
+    def _recv_exactly(self, n):
+        data = bytearray()
+        while len(data) < n:
+            chunk = self._conn.recv(n - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return bytes(data)
+
+def send_video(video_path: str, address: str, realtime: bool = True, quality: int = 90):
+    """Stream a video file to a ``SocketFrameSource`` as a stand-in client
+
+    Args:
+        video_path: Video to send
+        address: "host:port" the source listens on
+        realtime: Pace frames at the video's native FPS
+        quality: JPEG quality of each frame
+
+    Returns:
+        Number of frames sent
+    """
+    cap = cv2.VideoCapture(video_path)
+    interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    host, port = address.rsplit(':', 1)
+    sent = 0
+    with socket.create_connection((host, int(port))) as conn:
+        start = time.perf_counter()
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if realtime:
+                delay = start + sent * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok:
+                conn.sendall(_HEADER.pack(len(jpeg)) + jpeg.tobytes())
+                sent += 1
+    cap.release()
+    return sent
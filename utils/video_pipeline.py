@@ -0,0 +1,111 @@
+import queue
+import threading
+import cv2
+from utils.metrics import Metrics
+import config
+
+_END = object()  # Marks the end of the stream on a queue
+
+class VideoPipeline:
+    def __init__(self, video_path, output_path, queue_size=config.PIPELINE_QUEUE_SIZE, metrics=None):
+        """Decode -> process -> encode pipeline with each I/O stage on its own thread
+
+        A decoder thread reads frames into a bounded queue, the caller's thread
+        processes them in order, and an encoder thread writes the results. Bounded
+        queues give backpressure: a slow stage stalls the one feeding it instead of
+        buffering the whole video in memory. Frames are written exactly once and in
+        decode order.
+
+        Args:
+            video_path: Input video file
+            output_path: Where the processed video is written
+            queue_size: Maximum frames waiting between two stages
+            metrics: Optional ``Metrics`` receiving "decode" and "encode" timings
+        """
+        self.cap = cv2.VideoCapture(video_path)
+        frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+        self.out = cv2.VideoWriter(output_path,
+                                   cv2.VideoWriter_fourcc(*'mp4v'),
+                                   self.fps, (frame_width, frame_height))
+
+        self._decoded = queue.Queue(maxsize=queue_size)
+        self._encoded = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self.metrics = metrics or Metrics(enabled=False)
+
+    def run(self, process_frame, display=None):
+        """Run the pipeline to the end of the video
+
+        Args:
+            process_frame: Called on the calling thread for every frame, in order;
+                returns the frame to write
+            display: Optional callable run on the calling thread after each frame
+                (OpenCV GUI calls must stay on one thread); returning False stops early
+
+        Returns:
+            Number of frames written
+        """
+        decoder = threading.Thread(target=self._decode, name='pipeline-decode', daemon=True)
+        encoder = threading.Thread(target=self._encode, name='pipeline-encode', daemon=True)
+        decoder.start()
+        encoder.start()
+
+        frames = 0
+        try:
+            while True:
+                frame = self._decoded.get()
+                if frame is _END:
+                    break
+                frame = process_frame(frame)
+                self._encoded.put(frame)
+                frames += 1
+                if display is not None and display(frame) is False:
+                    break
+        finally:
+            self._stop.set()
+            self._encoded.put(_END)  # Encoder writes everything queued before this
+            decoder.join()
+            encoder.join()
+            self.cap.release()
+            self.out.release()
+
+        if self._error is not None:
+            raise self._error
+        return frames
+
+    def _decode(self):
+        try:
+            while not self._stop.is_set():
+                with self.metrics.timer("decode"):
+                    ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self._put_unless_stopped(frame)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put_unless_stopped(_END)
+
+    def _put_unless_stopped(self, item):
+        # The consumer stops reading once it has stopped, so never block forever
+        while not self._stop.is_set():
+            try:
+                self._decoded.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _encode(self):
+        while True:
+            frame = self._encoded.get()
+            if frame is _END:
+                break
+            if self._error is None:
+                try:
+                    with self.metrics.timer("encode"):
+                        self.out.write(frame)
+                except Exception as e:
+                    self._error = e  # Keep draining so the producer never blocks
@@ -1,106 +1,164 @@
+from functools import lru_cache
 import cv2
 import mediapipe as mp
 import numpy as np
 
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_SCALE = 0.7
+TEXT_THICKNESS = 2
+TEXT_PADDING = 10
+LINE_HEIGHT = 30
+PANEL_WIDTH_STEP = 32  # Panel widths are rounded up to this, so changing values rarely resize it
+VISIBILITY_THRESHOLD = 0.5  # Same cut-off MediaPipe's drawer uses
+
+@lru_cache(maxsize=4096)
+def text_size(text, scale=TEXT_SCALE, thickness=TEXT_THICKNESS):
+    """Cached ``cv2.getTextSize``: ((width, height), baseline)"""
+    return cv2.getTextSize(text, FONT, scale, thickness)
+
 class PoseVisualizer:
     def __init__(self):
         """Initialize visualization settings"""
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_pose = mp.solutions.pose
-        
         # Define colors (BGR format)
         self.text_color = (0, 0, 255)  # Red
         self.landmark_color = (0, 255, 0)  # Green
         self.connection_color = (255, 255, 255)  # White
-        
-        # Drawing specs for pose landmarks
-        self.landmark_drawing_spec = self.mp_drawing.DrawingSpec(
-            color=self.landmark_color,
-            thickness=2,
-            circle_radius=2
-        )
-        self.connection_drawing_spec = self.mp_drawing.DrawingSpec(
-            color=self.connection_color,
-            thickness=2
-        )
+        self.landmark_radius = 2
+        self.line_thickness = 2
+
+        # (n_connections, 2) landmark index pairs, gathered in one step per frame
+        self.connections = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS), dtype=np.intp)
+        self._panels = {}  # (labels, origin, width) -> cached RGBA background layer
 
     def draw_pose_landmarks(self, frame, pose_landmarks):
-        """Draw pose landmarks and connections on frame"""
-        self.mp_drawing.draw_landmarks(
-            frame,
-            pose_landmarks,
-            self.mp_pose.POSE_CONNECTIONS,
-            landmark_drawing_spec=self.landmark_drawing_spec,
-            connection_drawing_spec=self.connection_drawing_spec
-        )
+        """Draw MediaPipe pose landmarks and connections on frame (in place)"""
+        values = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark],
+                          dtype=np.float32)
+        visible = ~np.array([lm.HasField('visibility') for lm in pose_landmarks.landmark]) | \
+            (values[:, 3] >= VISIBILITY_THRESHOLD)
+        return self.draw_landmark_array(frame, values[:, :3], visible)
+
+    def draw_landmark_array(self, frame, landmarks, visible=None):
+        """Draw pose landmarks stored as a flat (x, y, z) * 33 array on frame (in place)
+
+        Coordinates are scaled to pixels in one step; all connections go to one
+        ``cv2.polylines`` call, and all landmark dots to another as zero-length
+        segments, whose round caps draw a filled dot. Landmarks outside the
+        frame or masked out by ``visible`` are skipped, along with their connections.
+        """
+        height, width = frame.shape[:2]
+        xy = np.asarray(landmarks, dtype=np.float32).reshape(-1, 3)[:, :2]
+        drawn = np.all((xy >= 0) & (xy <= 1), axis=1)
+        if visible is not None:
+            drawn &= visible
+        pixels = np.minimum(xy * (width, height), (width - 1, height - 1)).astype(np.int32)
+
+        connections = self.connections[drawn[self.connections].all(axis=1)]
+        if len(connections):
+            cv2.polylines(frame, list(pixels[connections]), False,
+                          self.connection_color, self.line_thickness)
+        points = pixels[drawn]
+        if len(points):
+            # Same outer size as cv2.circle(radius, thickness): a dot 2 * radius + thickness across
+            cv2.polylines(frame, list(np.repeat(points[:, np.newaxis], 2, axis=1)), False,
+                          self.landmark_color, 2 * self.landmark_radius + self.line_thickness)
         return frame
 
     def draw_feedback(self, frame, feedback_text, position=(30, 30)):
         """Draw feedback text on frame"""
+        (text_width, text_height), _ = text_size(feedback_text)
+
         # Add background rectangle for better text visibility
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        scale = 0.7
-        thickness = 2
-        
-        # Get text size
-        (text_width, text_height), _ = cv2.getTextSize(
-            feedback_text, font, scale, thickness
-        )
-        
-        # Draw background rectangle
-        padding = 10
         cv2.rectangle(
             frame,
-            (position[0] - padding, position[1] - text_height - padding),
-            (position[0] + text_width + padding, position[1] + padding),
+            (position[0] - TEXT_PADDING, position[1] - text_height - TEXT_PADDING),
+            (position[0] + text_width + TEXT_PADDING, position[1] + TEXT_PADDING),
             (0, 0, 0),
             -1
         )
-        
-        # Draw text
-        cv2.putText(
-            frame,
-            feedback_text,
-            position,
-            font,
-            scale,
-            self.text_color,
-            thickness
-        )
+        cv2.putText(frame, feedback_text, position, FONT, TEXT_SCALE, self.text_color, TEXT_THICKNESS)
         return frame
 
+    def draw_labels(self, frame, labels, values, position):
+        """Draw ``label: value`` lines on one cached background panel
+
+        The panel covers every line and is composited from a cached layer, so
+        only the text itself is rasterised per frame.
+        """
+        lines = [f"{label}: {value}" for label, value in zip(labels, values)]
+        if not lines:
+            return frame
+        text_width = max(text_size(line)[0][0] for line in lines)
+        panel_width = -(-text_width // PANEL_WIDTH_STEP) * PANEL_WIDTH_STEP
+        self._composite(frame, self._panel(tuple(labels), tuple(position), panel_width))
+
+        y_position = position[1]
+        for line in lines:
+            cv2.putText(frame, line, (position[0], y_position), FONT, TEXT_SCALE,
+                        self.text_color, TEXT_THICKNESS)
+            y_position += LINE_HEIGHT
+        return frame
+
+    def _panel(self, labels, position, text_width):
+        """Cached (origin, RGBA layer) background for a block of label lines"""
+        key = (labels, position, text_width)
+        if key not in self._panels:
+            text_height = max(text_size(label)[0][1] for label in labels)
+            left = position[0] - TEXT_PADDING
+            top = position[1] - text_height - TEXT_PADDING
+            bottom = position[1] + (len(labels) - 1) * LINE_HEIGHT + TEXT_PADDING
+            layer = np.zeros((bottom - top, text_width + 2 * TEXT_PADDING, 4), dtype=np.uint8)
+            layer[..., 3] = 255  # Opaque black, like the per-line rectangles it replaces
+            self._panels[key] = ((left, top), layer)
+        return self._panels[key]
+
+    @staticmethod
+    def _composite(frame, panel):
+        """Alpha-blend a cached RGBA layer onto frame, clipped to the frame"""
+        (left, top), layer = panel
+        height, width = frame.shape[:2]
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + layer.shape[1], width), min(top + layer.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        region = frame[y0:y1, x0:x1]
+        layer = layer[y0 - top:y1 - top, x0 - left:x1 - left]
+        alpha = layer[..., 3]
+        if alpha.min() == 255:
+            region[:] = layer[..., :3]
+        else:
+            weight = alpha[..., np.newaxis].astype(np.float32) / 255.0
+            region[:] = (layer[..., :3] * weight + region * (1.0 - weight)).astype(np.uint8)
+
     def draw_angles(self, frame, angles_dict, start_y=100):
         """Draw angle measurements on frame"""
-        y_position = start_y
-        for joint, angle in angles_dict.items():
-            text = f"{joint}: {angle:.1f}°"
-            self.draw_feedback(frame, text, (30, y_position))
-            y_position += 30
-        return frame
+        return self.draw_labels(frame, angles_dict.keys(),
+                                [f"{angle:.1f}°" for angle in angles_dict.values()], (30, start_y))
 
     def draw_performance_metrics(self, frame, metrics, position=(30, 200)):
         """Draw performance metrics on frame"""
-        y_position = position[1]
-        for metric, value in metrics.items():
-            text = f"{metric}: {value}"
-            self.draw_feedback(frame, text, (position[0], y_position))
-            y_position += 30
-        return frame
+        return self.draw_labels(frame, metrics.keys(), metrics.values(), position)
+
+    def create_debug_view(self, frame, pose_landmarks, angles=None, metrics=None, copy=False):
+        """Draw all visualization elements on frame
+
+        Draws in place unless ``copy`` is set. ``pose_landmarks`` may be a
+        MediaPipe landmark list or a flat (x, y, z) * 33 array.
+        """
+        debug_frame = frame.copy() if copy else frame
 
-    def create_debug_view(self, frame, pose_landmarks, angles=None, metrics=None):
-        """Create a debug view with all visualization elements"""
-        debug_frame = frame.copy()
-        
         # Draw pose landmarks
-        if pose_landmarks:
+        if isinstance(pose_landmarks, np.ndarray):
+            self.draw_landmark_array(debug_frame, pose_landmarks)
+        elif pose_landmarks:
             self.draw_pose_landmarks(debug_frame, pose_landmarks)
-        
+
         # Draw angles if provided
         if angles:
             self.draw_angles(debug_frame, angles)
-        
+
         # Draw metrics if provided
         if metrics:
             self.draw_performance_metrics(debug_frame, metrics)
-            
-        return debug_frame
\ No newline at end of file
+
+        return debug_frame